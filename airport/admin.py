@@ -8,7 +8,11 @@ from airport.models import (
     Route,
     Flight,
     Order,
-    Ticket
+    Ticket,
+    SeatHold,
+    HeldSeat,
+    IdempotencyKey,
+    OrderRequest,
 )
 
 
@@ -20,3 +24,7 @@ admin.site.register(Route)
 admin.site.register(Flight)
 admin.site.register(Order)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(HeldSeat)
+admin.site.register(IdempotencyKey)
+admin.site.register(OrderRequest)
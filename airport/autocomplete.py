@@ -0,0 +1,107 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from typing import Iterable
+
+from airport.indexes import GenerationCachedIndex
+from airport.models import Airport
+
+WORD_START = re.compile(r"\b\w")
+
+# Ranks of a match, best first
+NAME_PREFIX, NAME_WORD, CITY_PREFIX, CITY_WORD = range(4)
+# Searches remembered by an index, short queries matching most keys
+# are the slow ones and the ones every user types first
+MAX_REMEMBERED = 4096
+
+
+def fold(text: str) -> str:
+    """Lowercase text without accents, so "Zürich" matches "zur" """
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text.casefold())
+        if not unicodedata.combining(char)
+    )
+
+
+class AirportIndex:
+    """
+    Sorted prefix index of airports: one key per word start of the name
+    and closest big city, so a lookup is a binary search followed by a
+    scan of the matching keys only. Results are remembered until the
+    index is rebuilt.
+    """
+
+    def __init__(self, airports: Iterable[tuple[int, str, str]]) -> None:
+        self.airports, self.names, self.results = {}, {}, {}
+        keys = []
+
+        for pk, name, city in airports:
+            self.airports[pk] = {
+                "id": pk,
+                "name": name,
+                "closest_big_city": city,
+            }
+            self.names[pk] = fold(name)
+            for text, first, other in (
+                (name, NAME_PREFIX, NAME_WORD),
+                (city, CITY_PREFIX, CITY_WORD),
+            ):
+                folded = fold(text)
+                for match in WORD_START.finditer(folded):
+                    start = match.start()
+                    rank = first if start == 0 else other
+                    keys.append((folded[start:], rank, pk))
+
+        keys.sort()
+        self.keys = keys
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Airports with a name or city word starting with query, the name
+        prefixes first, then name words, city prefixes and city words,
+        alphabetically within a rank
+        """
+        query = fold(query).strip()
+        if not query:
+            return []
+
+        results = self.results.get((query, limit))
+        if results is None:
+            if len(self.results) >= MAX_REMEMBERED:
+                self.results.clear()
+            results = self.results[query, limit] = self.rank(query, limit)
+        return results
+
+    def rank(self, query: str, limit: int) -> list[dict]:
+        best = {}
+        index = bisect.bisect_left(self.keys, (query,))
+        while index < len(self.keys):
+            key, rank, pk = self.keys[index]
+            if not key.startswith(query):
+                break
+            if rank < best.get(pk, CITY_WORD + 1):
+                best[pk] = rank
+            index += 1
+
+        ranked = heapq.nsmallest(
+            limit, best, key=lambda pk: (best[pk], self.names[pk], pk)
+        )
+        return [self.airports[pk] for pk in ranked]
+
+
+class CachedAirportIndex(GenerationCachedIndex):
+    """Airport index of the process, rebuilt when airports change"""
+
+    models = (Airport,)
+
+    def build(self) -> AirportIndex:
+        return AirportIndex(
+            Airport.objects.order_by().values_list(
+                "id", "name", "closest_big_city"
+            )
+        )
+
+
+airport_index = CachedAirportIndex()
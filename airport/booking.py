@@ -0,0 +1,265 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from airport import stamps
+from airport.models import Flight, HeldSeat, Order, SeatHold, Ticket
+from airport.seat_map import SeatMap
+
+Seat = tuple[int, int, int]
+
+
+class SeatsUnavailable(Exception):
+    """Seats are sold or held by another user"""
+
+    def __init__(self, seats: Iterable[Seat]) -> None:
+        self.seats = sorted(seats)
+        super().__init__(self.messages)
+
+    @property
+    def messages(self) -> list[str]:
+        return [
+            f"Seat (row: {row}, seat: {seat}) of flight "
+            f"{flight_id} is already taken"
+            for flight_id, row, seat in self.seats
+        ]
+
+
+class HoldExpired(Exception):
+    """Seat hold expired before being confirmed"""
+
+
+class HoldLimitExceeded(Exception):
+    """Seat hold over SEAT_HOLD_MAX_SEATS or SEAT_HOLD_MAX_PER_FLIGHT"""
+
+
+class NotEnoughSeats(Exception):
+    """Fewer free seats left on a flight than a party needs"""
+
+
+def seats_query(seats: Iterable[Seat]) -> Q:
+    query = Q()
+    for flight_id, row, seat in seats:
+        query |= Q(flight_id=flight_id, row=row, seat=seat)
+    return query
+
+
+def lock_flights(flight_ids: Iterable[int]) -> list[Flight]:
+    """
+    Lock flight rows in id order, so concurrent bookings of several
+    flights queue instead of deadlocking. Their airplanes are loaded
+    along for checking seats.
+    """
+    return list(
+        Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(pk__in=set(flight_ids))
+        .order_by("pk")
+    )
+
+
+def release_expired_holds(
+    flight_ids: Iterable[int], now: datetime | None = None
+) -> int:
+    return SeatHold.objects.filter(
+        flight_id__in=set(flight_ids),
+        expires_at__lte=now or timezone.now(),
+    ).delete()[0]
+
+
+def find_held_seats(
+    seats: list[Seat], now: datetime
+) -> dict[Seat, tuple[int, int]]:
+    """Return held seat id and holder id of the live holds of seats"""
+    if not seats:
+        return {}
+    return {
+        (flight_id, row, seat): (held_id, user_id)
+        for held_id, flight_id, row, seat, user_id in (
+            HeldSeat.objects.filter(
+                seats_query(seats), hold__expires_at__gt=now
+            )
+            .order_by()
+            .values_list("id", "flight_id", "row", "seat", "hold__user_id")
+        )
+    }
+
+
+def find_sold_seats(seats: list[Seat]) -> set[Seat]:
+    if not seats:
+        return set()
+    return set(
+        Ticket.objects.filter(seats_query(seats))
+        .order_by()
+        .values_list("flight_id", "row", "seat")
+    )
+
+
+@transaction.atomic(savepoint=False)
+def book_seats(order: Order, tickets: list[Ticket]) -> list[Ticket]:
+    """
+    Insert the tickets of an order under locks of their flights.
+    Seats held by another user are unavailable, seats held by the order
+    user are released as they get sold. Called inside a transaction, a
+    failure leaves it to be rolled back, so the order is never kept
+    without its tickets.
+    """
+    seats = [(ticket.flight_id, ticket.row, ticket.seat) for ticket in tickets]
+    now = timezone.now()
+
+    lock_flights(flight_id for flight_id, _, _ in seats)
+
+    held = find_held_seats(seats, now)
+    unavailable = find_sold_seats(seats) | {
+        seat for seat, (_, user_id) in held.items()
+        if user_id != order.user_id
+    }
+    if unavailable:
+        raise SeatsUnavailable(unavailable)
+
+    if held:
+        HeldSeat.objects.filter(
+            pk__in=[held_id for held_id, _ in held.values()]
+        ).delete()
+
+    Ticket.objects.bulk_create(tickets)
+
+    taken = defaultdict(list)
+    for flight_id, row, seat in seats:
+        taken[flight_id].append((row, seat))
+    for flight_id, flight_seats in taken.items():
+        Flight.update_seat_map(flight_id, taken=flight_seats)
+
+    stamps.bump(Ticket)
+    return tickets
+
+
+@transaction.atomic
+def hold_seats(
+    user,
+    flight: Flight,
+    seats: Iterable[tuple[int, int]],
+    ttl: int | None = None,
+) -> SeatHold:
+    """
+    Reserve seats of a flight for ttl seconds, SEAT_HOLD_TTL by default.
+    Expired holds of the flight are released first. A hold may reserve
+    up to SEAT_HOLD_MAX_SEATS seats, and a user keep up to
+    SEAT_HOLD_MAX_PER_FLIGHT live holds on a flight.
+    """
+    seats = [(flight.id, row, seat) for row, seat in seats]
+    now = timezone.now()
+
+    if len(seats) > settings.SEAT_HOLD_MAX_SEATS:
+        raise HoldLimitExceeded(
+            f"A hold can reserve at most "
+            f"{settings.SEAT_HOLD_MAX_SEATS} seats"
+        )
+
+    lock_flights([flight.id])
+    release_expired_holds([flight.id], now)
+
+    if (
+        SeatHold.objects.filter(flight=flight, user=user).count()
+        >= settings.SEAT_HOLD_MAX_PER_FLIGHT
+    ):
+        raise HoldLimitExceeded(
+            f"At most {settings.SEAT_HOLD_MAX_PER_FLIGHT} seat holds "
+            f"per flight can be kept at once"
+        )
+
+    unavailable = find_sold_seats(seats) | set(find_held_seats(seats, now))
+    if unavailable:
+        raise SeatsUnavailable(unavailable)
+
+    hold = SeatHold.objects.create(
+        flight=flight,
+        user=user,
+        expires_at=now + timedelta(
+            seconds=settings.SEAT_HOLD_TTL if ttl is None else ttl
+        ),
+    )
+    HeldSeat.objects.bulk_create(
+        HeldSeat(hold=hold, flight_id=flight_id, row=row, seat=seat)
+        for flight_id, row, seat in seats
+    )
+    return hold
+
+
+def get_occupancy(flight: Flight, now: datetime | None = None) -> SeatMap:
+    """Seat map of a flight with the seats of live holds taken as well"""
+    seat_map = flight.get_seat_map()
+    for row, seat in HeldSeat.objects.filter(
+        flight=flight, hold__expires_at__gt=now or timezone.now()
+    ).values_list("row", "seat"):
+        seat_map.take(row, seat)
+    return seat_map
+
+
+def assign_seats(
+    flight: Flight, party_size: int, now: datetime | None = None
+) -> list[tuple[int, int]]:
+    """
+    Best (row, seat) list for a party on a flight: adjacent seats of a
+    row when possible, else the tightest split. Raises NotEnoughSeats.
+    """
+    seats = get_occupancy(flight, now).assign(party_size)
+    if not seats:
+        raise NotEnoughSeats(
+            f"Fewer than {party_size} seats are left on flight {flight.id}"
+        )
+    return seats
+
+
+@transaction.atomic
+def book_assigned_seats(user, flight: Flight, party_size: int) -> Order:
+    """
+    Assign seats for a party under the lock of the flight and book them
+    as an order of user, so no other booking can come in between
+    """
+    now = timezone.now()
+
+    locked = lock_flights([flight.id])
+    if not locked:
+        raise NotEnoughSeats(f"Flight {flight.id} does not exist anymore")
+    flight.seat_map = locked[0].seat_map
+    release_expired_holds([flight.id], now)
+    seats = assign_seats(flight, party_size, now)
+
+    order = Order.objects.create(user=user)
+    book_seats(
+        order,
+        [
+            Ticket(order=order, flight=flight, row=row, seat=seat)
+            for row, seat in seats
+        ],
+    )
+    return order
+
+
+@transaction.atomic
+def confirm_hold(hold: SeatHold) -> Order:
+    """Turn a live seat hold into an order with a ticket per held seat"""
+    lock_flights([hold.flight_id])
+
+    hold = SeatHold.objects.filter(pk=hold.pk).first()
+    if hold is None or hold.expires_at <= timezone.now():
+        raise HoldExpired("Seat hold has expired")
+
+    order = Order.objects.create(user_id=hold.user_id)
+    book_seats(
+        order,
+        [
+            Ticket(order=order, flight_id=flight_id, row=row, seat=seat)
+            for flight_id, row, seat in hold.seats.values_list(
+                "flight_id", "row", "seat"
+            )
+        ],
+    )
+    hold.delete()
+    return order
@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from airport import stamps
+
+MIN_LAST_MODIFIED_AGE = timedelta(seconds=1)
+
+
+def cache_response(method):
+    """Serve the decorated read action through CachedReadMixin"""
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs) -> Response:
+        return self.cached_response(
+            lambda: method(self, request, *args, **kwargs)
+        )
+
+    return wrapper
+
+
+class CachedReadMixin:
+    """
+    Conditional and cached read actions.
+
+    The validator of a response is made of the view, its arguments and
+    permission classes, the scheme and host the absolute URLs of the
+    response are built with, the query params and the change stamps of
+    cache_models. It is sent as a strong ETag, used as the cache key of
+    the response data and answers If-None-Match / If-Modified-Since
+    with 304 before any query or serialization of the response itself.
+
+    Every write to one of cache_models bumps its stamp after commit,
+    so later requests get a new validator and never see stale data.
+    """
+
+    cache_models = ()
+
+    def get_validators(self) -> tuple[str, int | None]:
+        """
+        Return the validator and the last modification timestamp, None
+        while the newest change is less than a second old: Last-Modified
+        has a one-second resolution, so a change later in that second
+        would not move it (RFC 7232, section 2.2.2)
+        """
+        model_stamps = stamps.get_stamps(*self.cache_models)
+        identity = json.dumps(
+            [
+                f"{type(self).__module__}.{type(self).__qualname__}",
+                self.action,
+                self.kwargs,
+                sorted(self.request.query_params.lists()),
+                self.request.scheme,
+                self.request.get_host(),
+                self.request.accepted_renderer.format,
+                [perm.__name__ for perm in self.permission_classes],
+                sorted(model_stamps.items()),
+            ],
+            default=str,
+        )
+        changes = [
+            changed_at
+            for _, changed_at in model_stamps.values()
+            if changed_at is not None
+        ]
+        last_modified = None
+        if changes and timezone.now() - max(changes) >= MIN_LAST_MODIFIED_AGE:
+            last_modified = int(max(changes).timestamp())
+
+        return hashlib.sha256(identity.encode()).hexdigest(), last_modified
+
+    def cached_response(self, handler) -> Response:
+        validator, last_modified = self.get_validators()
+        etag = quote_etag(validator)
+
+        not_modified = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        key = f"airport:response:{validator}"
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        data = cache.get(key) if timeout else None
+
+        if data is not None:
+            response = Response(data, status=status.HTTP_200_OK)
+        else:
+            response = handler()
+            if timeout and response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout)
+
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+
+        return response
+
+    @cache_response
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,174 @@
+from collections import defaultdict
+from typing import Iterable, NamedTuple
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from airport import stamps
+from airport.models import (
+    Flight,
+    HeldSeat,
+    Order,
+    OrderRequest,
+    SeatHold,
+    Ticket,
+)
+from airport.sql import table
+
+
+class CancellationResult(NamedTuple):
+    flights: int
+    orders: int
+    tickets: int
+
+
+def orders_left_empty_sql(tickets: str) -> str:
+    """
+    CTEs deleting the orders of the tickets CTE, or of the first %s id
+    array, left without other tickets, and detaching their order
+    requests but those of the second %s flight id array, which are
+    deleted by the statement already
+    """
+    order, ticket = table(Order), table(Ticket)
+    return (
+        f"orders AS ("
+        f"DELETE FROM {order} o "
+        f"WHERE (o.id IN (SELECT order_id FROM {tickets}) "
+        f"OR o.id = ANY(%s)) "
+        f"AND NOT EXISTS (SELECT 1 FROM {ticket} t WHERE t.order_id = o.id "
+        f"AND t.id NOT IN (SELECT id FROM {tickets})) "
+        f"RETURNING o.id), "
+        f"detached AS ("
+        f"UPDATE {table(OrderRequest)} SET order_id = NULL "
+        f"WHERE order_id IN (SELECT id FROM orders) "
+        f"AND NOT flight_id = ANY(%s))"
+    )
+
+
+def select_tickets(
+    flights: Iterable[int] = (),
+    orders: Iterable[int] = (),
+    row_from: int | None = None,
+    row_to: int | None = None,
+    seat_from: int | None = None,
+    seat_to: int | None = None,
+) -> QuerySet:
+    """Tickets of flights and orders within inclusive row and seat ranges"""
+    tickets = Ticket.objects.all()
+    filters = {
+        "flight_id__in": list(flights),
+        "order_id__in": list(orders),
+        "row__gte": row_from,
+        "row__lte": row_to,
+        "seat__gte": seat_from,
+        "seat__lte": seat_to,
+    }
+    for lookup, value in filters.items():
+        if value:
+            tickets = tickets.filter(**{lookup: value})
+    return tickets
+
+
+@transaction.atomic
+def cancel_tickets(
+    tickets: QuerySet, order_ids: Iterable[int] = ()
+) -> CancellationResult:
+    """
+    Delete the tickets of a queryset in a single statement, with the
+    orders left without tickets and the given orders, instead of loading
+    them into the deletion collector. Seat maps and sold tickets counters
+    of their flights are updated in one more statement, under the flight
+    locks.
+    """
+    tickets = tickets.order_by()
+    flights = {
+        flight.id: flight
+        for flight in Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(pk__in=tickets.values("flight_id"))
+        .order_by("pk")
+    }
+
+    sql, params = tickets.values("id").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH tickets AS ("
+            f"DELETE FROM {table(Ticket)} WHERE id IN ({sql}) "
+            f'RETURNING id, flight_id, "row", seat, order_id), '
+            f"{orders_left_empty_sql('tickets')} "
+            f"SELECT (SELECT count(*) FROM orders), "
+            f'array_agg(ARRAY[flight_id, "row", seat]) FROM tickets',
+            [*params, list(order_ids), []],
+        )
+        orders, deleted = cursor.fetchone()
+    deleted = deleted or []
+
+    released = defaultdict(list)
+    for flight_id, row, seat in deleted:
+        released[flight_id].append((row, seat))
+
+    for flight_id, seats in released.items():
+        flight = flights[flight_id]
+        seat_map = flight.get_seat_map()
+        for row, seat in seats:
+            try:
+                seat_map.release(row, seat)
+            except IndexError:
+                continue
+        flight.seat_map = seat_map.to_bytes()
+        flight.tickets_sold = max(flight.tickets_sold - len(seats), 0)
+
+    Flight.objects.bulk_update(
+        [flights[flight_id] for flight_id in released],
+        ["seat_map", "tickets_sold"],
+    )
+
+    result = CancellationResult(0, orders, len(deleted))
+    if result.tickets or result.orders:
+        stamps.bump(Ticket, Order)
+    return result
+
+
+def cancel_orders(order_ids: Iterable[int]) -> CancellationResult:
+    """Delete orders with their tickets in set-based statements"""
+    order_ids = list(order_ids)
+    return cancel_tickets(
+        Ticket.objects.filter(order_id__in=order_ids), order_ids
+    )
+
+
+@transaction.atomic
+def cancel_flights(flight_ids: Iterable[int]) -> CancellationResult:
+    """
+    Delete flights in a single statement, with their tickets, crew
+    links, seat holds and order requests, and the orders left without
+    tickets, whatever the number of sold seats
+    """
+    flight_ids = list(flight_ids)
+    crew = Flight.crew.through
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH flights AS ("
+            f"DELETE FROM {table(Flight)} WHERE id = ANY(%s) RETURNING id), "
+            f"tickets AS ("
+            f"DELETE FROM {table(Ticket)} WHERE flight_id = ANY(%s) "
+            f"RETURNING id, order_id), "
+            f"held_seats AS ("
+            f"DELETE FROM {table(HeldSeat)} WHERE flight_id = ANY(%s)), "
+            f"holds AS ("
+            f"DELETE FROM {table(SeatHold)} WHERE flight_id = ANY(%s)), "
+            f"requests AS ("
+            f"DELETE FROM {table(OrderRequest)} WHERE flight_id = ANY(%s)), "
+            f"crew AS ("
+            f"DELETE FROM {table(crew)} WHERE flight_id = ANY(%s)), "
+            f"{orders_left_empty_sql('tickets')} "
+            f"SELECT (SELECT count(*) FROM flights), "
+            f"(SELECT count(*) FROM orders), (SELECT count(*) FROM tickets)",
+            [flight_ids] * 6 + [[], flight_ids],
+        )
+        result = CancellationResult(*cursor.fetchone())
+
+    if result.flights:
+        stamps.bump(Flight, Ticket, Order)
+    return result
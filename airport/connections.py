@@ -0,0 +1,177 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from airport import stamps
+from airport.models import Flight, Route
+
+DEFAULT_MIN_CONNECTION = timedelta(minutes=45)
+RESULTS_CACHE_TIMEOUT = 60 * 10
+
+
+class Leg(NamedTuple):
+    flight: int
+    source: int
+    destination: int
+    departure_time: datetime
+    arrival_time: datetime
+
+
+class ConnectionIndex:
+    """
+    Departures of every airport sorted by departure time.
+
+    Built once from a single query and searched in memory, so a
+    connection search never issues queries per hop.
+    """
+
+    def __init__(self, legs: list[Leg]) -> None:
+        self.departures = defaultdict(list)
+        for leg in sorted(legs, key=lambda leg: leg.departure_time):
+            self.departures[leg.source].append(leg)
+
+        self.departure_times = {
+            airport: [leg.departure_time for leg in airport_legs]
+            for airport, airport_legs in self.departures.items()
+        }
+
+    @classmethod
+    def build(cls) -> "ConnectionIndex":
+        return cls(
+            [
+                Leg(*values)
+                for values in Flight.objects.order_by().values_list(
+                    "id",
+                    "route__source_id",
+                    "route__destination_id",
+                    "departure_time",
+                    "arrival_time",
+                )
+            ]
+        )
+
+    def _departures_after(self, airport: int, moment: datetime) -> list:
+        times = self.departure_times.get(airport, [])
+        return self.departures[airport][bisect_left(times, moment):]
+
+    def search(
+        self,
+        source: int,
+        destination: int,
+        departure: datetime,
+        max_connections: int = 1,
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+    ) -> list[list[Leg]]:
+        """
+        Earliest arrival itineraries from source to destination.
+
+        Runs one round per extra leg and keeps, for every number of
+        legs, the itinerary arriving earliest at the destination if it
+        arrives earlier than every itinerary with fewer legs.
+
+        Only the earliest arrival at every airport is kept, which is
+        exact because layovers are unbounded: a later arrival can only
+        catch the departures an earlier one catches too.
+        """
+        best_arrival = {}
+        rounds = [{source: (departure, None)}]
+        itineraries = []
+
+        for legs_count in range(1, max_connections + 2):
+            reached = {}
+            for airport, (arrival, _) in rounds[-1].items():
+                ready = arrival
+                if legs_count > 1:
+                    ready += min_connection
+                # Leaving after the best arrival can't arrive earlier
+                latest = best_arrival.get(destination)
+
+                for leg in self._departures_after(airport, ready):
+                    if latest is not None and leg.departure_time >= latest:
+                        break
+                    if leg.destination == source:
+                        continue
+
+                    if any(
+                        bound is not None and leg.arrival_time >= bound
+                        for bound in (
+                            best_arrival.get(leg.destination),
+                            best_arrival.get(destination),
+                        )
+                    ):
+                        continue
+
+                    current = reached.get(leg.destination)
+                    if current is None or leg.arrival_time < current[0]:
+                        reached[leg.destination] = (leg.arrival_time, leg)
+
+            if not reached:
+                break
+
+            for airport, (arrival, _) in reached.items():
+                best_arrival[airport] = arrival
+            rounds.append(reached)
+
+            if destination in reached:
+                itineraries.append(self._unwind(rounds, destination))
+
+        return itineraries
+
+    @staticmethod
+    def _unwind(rounds: list[dict], destination: int) -> list[Leg]:
+        legs, airport = [], destination
+        for reached in reversed(rounds[1:]):
+            leg = reached[airport][1]
+            legs.append(leg)
+            airport = leg.source
+        return legs[::-1]
+
+
+_index_lock = threading.Lock()
+_index = (None, None)
+
+
+def get_connection_index() -> tuple[str, ConnectionIndex]:
+    """
+    Return the generation and the index, rebuilt when flights or
+    routes have changed
+    """
+    global _index
+
+    generation = stamps.generation_key(Flight, Route)
+    if _index[0] == generation:
+        return _index
+
+    with _index_lock:
+        if _index[0] != generation:
+            _index = (generation, ConnectionIndex.build())
+        return _index
+
+
+def search_connections(
+    source: int,
+    destination: int,
+    departure: datetime,
+    max_connections: int = 1,
+    min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+) -> list[list[Leg]]:
+    """Cached connection search invalidated by flight and route changes"""
+    generation, index = get_connection_index()
+    key = (
+        f"airport:connections:{generation}:{source}:{destination}:"
+        f"{departure.isoformat()}:{max_connections}:"
+        f"{int(min_connection.total_seconds())}"
+    )
+
+    itineraries = cache.get(key)
+    if itineraries is None:
+        itineraries = index.search(
+            source, destination, departure, max_connections, min_connection
+        )
+        cache.set(key, itineraries, RESULTS_CACHE_TIMEOUT)
+
+    return itineraries
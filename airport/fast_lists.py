@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from airport.fieldsets import EXPAND_QUERY_PARAM, FIELDS_QUERY_PARAM
+
+Accessor = Callable[[dict], Any]
+
+
+def column(name: str) -> Accessor:
+    return itemgetter(name)
+
+
+def datetime_column(name: str) -> Accessor:
+    """
+    Accessor formatting a datetime column the way DRF DateTimeField
+    does with the default settings, falling back to the field itself
+    for any other datetime format
+    """
+    output_format = api_settings.DATETIME_FORMAT
+
+    if (
+        not settings.USE_TZ
+        or output_format is None
+        or output_format.lower() != ISO_8601
+    ):
+        field = serializers.DateTimeField()
+        return lambda row: field.to_representation(row[name])
+
+    current_timezone = timezone.get_current_timezone()
+
+    def get(row: dict) -> str | None:
+        value = row[name]
+        if not value:
+            return None
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return get
+
+
+class ValuesSerializer(ABC):
+    """
+    Read only list serializer building rows from values() instead of
+    model instances. Subclasses list the columns to read and one
+    accessor per output field, their output must stay identical to the
+    model serializer they stand for.
+    """
+
+    columns = ()
+
+    @abstractmethod
+    def get_accessors(self) -> dict[str, Accessor]:
+        """Accessor of every output field, built per serialization"""
+
+    def get_rows(self, queryset: QuerySet) -> QuerySet:
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values(*self.columns)
+        )
+
+    def add_related(self, rows: list[dict]) -> None:
+        """Hook adding many to many columns to the fetched rows"""
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        rows = list(rows)
+        self.add_related(rows)
+        accessors = tuple(self.get_accessors().items())
+
+        return [
+            {name: get(row) for name, get in accessors}
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """
+    List action serializing with fast_list_serializer_class when
+    settings.FAST_LIST_SERIALIZERS is on. Requests using ?fields= or
+    ?expand= keep the model serializer.
+    """
+
+    fast_list_serializer_class = None
+
+    def use_fast_list(self, request) -> bool:
+        return (
+            getattr(settings, "FAST_LIST_SERIALIZERS", False)
+            and self.fast_list_serializer_class is not None
+            and FIELDS_QUERY_PARAM not in request.query_params
+            and EXPAND_QUERY_PARAM not in request.query_params
+        )
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if not self.use_fast_list(request):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_list_serializer_class()
+        rows = serializer.get_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+
+        return Response(serializer.serialize(rows))
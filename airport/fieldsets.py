@@ -0,0 +1,87 @@
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+SPARSE_ACTIONS = ("list", "retrieve")
+
+
+def parse_names(request, param: str) -> set[str] | None:
+    value = request.query_params.get(param) if request else None
+    if not value:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer keeping only the fields listed in ?fields= and replacing
+    the fields listed in ?expand= by their expandable_fields nested
+    representation. Applies to the top level serializer only.
+    """
+
+    expandable_fields = {}
+
+    def is_root_serializer(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self) -> dict:
+        fields = super().get_fields()
+        request = self.context.get("request")
+
+        if request is None or not self.is_root_serializer():
+            return fields
+
+        for name in parse_names(request, EXPAND_QUERY_PARAM) or ():
+            if name in self.expandable_fields and name in fields:
+                fields[name] = self.expandable_fields[name]()
+
+        requested = parse_names(request, FIELDS_QUERY_PARAM)
+        if requested is not None:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested
+            }
+
+        return fields
+
+
+class SparseQuerysetMixin:
+    """
+    View applying the select_related, prefetch_related and annotate
+    calls of field_relations only for the fields a read action returns.
+    The relations of a field also cover its expanded representation.
+    """
+
+    field_relations = {}
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+
+        fields = None
+        if self.action in SPARSE_ACTIONS:
+            fields = parse_names(self.request, FIELDS_QUERY_PARAM)
+
+        relations = [
+            relation
+            for name, relation in self.field_relations.items()
+            if fields is None or name in fields
+        ]
+
+        for relation in relations:
+            if relation.get("select_related"):
+                queryset = queryset.select_related(
+                    *relation["select_related"]
+                )
+            if relation.get("prefetch_related"):
+                queryset = queryset.prefetch_related(
+                    *relation["prefetch_related"]
+                )
+            if relation.get("annotate"):
+                queryset = queryset.annotate(**relation["annotate"])
+
+        return queryset
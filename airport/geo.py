@@ -0,0 +1,232 @@
+import heapq
+import math
+from typing import Iterable, NamedTuple
+
+from django.db import connection, transaction
+
+from airport import stamps
+from airport.indexes import GenerationCachedIndex
+from airport.models import KILOMETERS_PER_UNIT, Airport, Route
+from airport.sql import table
+
+# Mean Earth radius of the IUGG
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vector(latitude: float, longitude: float) -> tuple[float, ...]:
+    """Point of the unit sphere at a latitude and longitude in degrees"""
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(phi) * math.cos(lam),
+        math.cos(phi) * math.sin(lam),
+        math.sin(phi),
+    )
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
+
+def great_circle_km(
+    source: tuple[float, float], destination: tuple[float, float]
+) -> float:
+    """Distance between two (latitude, longitude) points"""
+    return chord_to_km(
+        math.dist(unit_vector(*source), unit_vector(*destination))
+    )
+
+
+class AirportTree:
+    """
+    k-d tree of airports as points of the unit sphere. The straight
+    line distance between two such points grows with their great-circle
+    distance, so nearest points are nearest airports, across the
+    antimeridian and the poles too.
+
+    The tree is implicit: the node of a slice of the sorted points is
+    its middle point, splitting the slice on x, y and z in turn.
+    """
+
+    def __init__(
+        self, airports: Iterable[tuple[int, str, str, float, float]]
+    ) -> None:
+        nodes = [
+            (
+                unit_vector(latitude, longitude),
+                {
+                    "id": pk,
+                    "name": name,
+                    "closest_big_city": city,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                },
+            )
+            for pk, name, city, latitude, longitude in airports
+        ]
+
+        stack = [(0, len(nodes), 0)]
+        while stack:
+            low, high, axis = stack.pop()
+            if high - low < 2:
+                continue
+            nodes[low:high] = sorted(
+                nodes[low:high], key=lambda node: node[0][axis]
+            )
+            middle = (low + high) // 2
+            stack.append((low, middle, (axis + 1) % 3))
+            stack.append((middle + 1, high, (axis + 1) % 3))
+
+        self.points = [point for point, _ in nodes]
+        self.airports = [airport for _, airport in nodes]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int = 10,
+        radius_km: float | None = None,
+    ) -> list[dict]:
+        """
+        Up to limit airports closest to a point, nearest first, within
+        radius_km of it if given, with their distance in kilometers
+        """
+        target = unit_vector(latitude, longitude)
+        # Squared chords, the greatest possible one is 4
+        bound = 4.0 if radius_km is None else km_to_chord(radius_km) ** 2
+        found = []  # max-heap of (-squared chord, -index)
+
+        stack = [(0, len(self.points), 0, 0.0)]
+        while stack:
+            low, high, axis, plane = stack.pop()
+            worst = -found[0][0] if len(found) == limit else bound
+            if low >= high or plane > worst:
+                continue
+
+            middle = (low + high) // 2
+            point = self.points[middle]
+            squared = (
+                (point[0] - target[0]) ** 2
+                + (point[1] - target[1]) ** 2
+                + (point[2] - target[2]) ** 2
+            )
+            if squared <= worst:
+                if len(found) == limit:
+                    heapq.heapreplace(found, (-squared, -middle))
+                else:
+                    heapq.heappush(found, (-squared, -middle))
+
+            offset = target[axis] - point[axis]
+            below, above = (low, middle), (middle + 1, high)
+            near, far = (below, above) if offset < 0 else (above, below)
+            following = (axis + 1) % 3
+            stack.append((*far, following, offset * offset))
+            stack.append((*near, following, 0.0))
+
+        return [
+            {
+                **self.airports[-index],
+                "distance": round(chord_to_km(math.sqrt(-squared)), 3),
+            }
+            for squared, index in sorted(found, reverse=True)
+        ]
+
+
+class CachedAirportTree(GenerationCachedIndex):
+    """Airport tree of the process over the airports with coordinates"""
+
+    models = (Airport,)
+
+    def build(self) -> AirportTree:
+        return AirportTree(
+            Airport.objects.order_by()
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list(
+                "id", "name", "closest_big_city", "latitude", "longitude"
+            )
+        )
+
+
+airport_tree = CachedAirportTree()
+
+
+class RouteDistance(NamedTuple):
+    route: int
+    distance: int
+    computed: int
+    unit: str
+
+
+def computed_distances_sql() -> tuple[str, list]:
+    """
+    CTE of the great-circle distance in the route's unit of every route
+    between airports with coordinates, computed by the database in one
+    pass with the haversine formula
+    """
+    units = ", ".join("(%s, %s)" for _ in KILOMETERS_PER_UNIT)
+    params = [
+        value for unit in KILOMETERS_PER_UNIT.items() for value in unit
+    ]
+    haversine = (
+        "POWER(SIN(RADIANS(d.latitude - s.latitude) / 2), 2) "
+        "+ COS(RADIANS(s.latitude)) * COS(RADIANS(d.latitude)) "
+        "* POWER(SIN(RADIANS(d.longitude - s.longitude) / 2), 2)"
+    )
+    sql = (
+        f"computed AS ("
+        f"SELECT r.id, r.distance, r.type_of_measurement AS unit, u.factor, "
+        f"ROUND(2 * {EARTH_RADIUS_KM} * ASIN(SQRT(LEAST(1, {haversine}))) "
+        f"/ u.factor)::integer AS computed "
+        f"FROM {table(Route)} r "
+        f"JOIN {table(Airport)} s ON s.id = r.source_id "
+        f"JOIN {table(Airport)} d ON d.id = r.destination_id "
+        f"JOIN (VALUES {units}) AS u(unit, factor) "
+        f"ON u.unit = r.type_of_measurement "
+        f"WHERE s.latitude IS NOT NULL AND s.longitude IS NOT NULL "
+        f"AND d.latitude IS NOT NULL AND d.longitude IS NOT NULL)"
+    )
+    return sql, params
+
+
+def check_route_distances(tolerance: float = 1.0) -> list[RouteDistance]:
+    """
+    Routes whose distance differs from the great-circle distance of
+    their airports by more than tolerance percent
+    """
+    computed, params = computed_distances_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH {computed} "
+            f"SELECT id, distance, computed, unit FROM computed "
+            f"WHERE ABS(distance - computed) > %s * computed / 100.0 "
+            f"ORDER BY id",
+            [*params, tolerance],
+        )
+        return [RouteDistance(*row) for row in cursor.fetchall()]
+
+
+@transaction.atomic
+def fill_route_distances() -> int:
+    """
+    Set the distance of every route between airports with coordinates
+    to their great-circle distance in one statement, returning the
+    number of routes changed
+    """
+    computed, params = computed_distances_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH {computed} "
+            f"UPDATE {table(Route)} r SET distance = c.computed, "
+            f"distance_km = ROUND((c.computed * c.factor)::numeric, 3) "
+            f"FROM computed c "
+            f"WHERE r.id = c.id AND r.distance <> c.computed",
+            params,
+        )
+        changed = cursor.rowcount
+
+    if changed:
+        stamps.bump(Route)
+    return changed
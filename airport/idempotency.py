@@ -0,0 +1,125 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def get_fingerprint(request) -> str:
+    """Hash of the method, path and body of a request"""
+    payload = json.dumps(
+        [request.method, request.path, request.data],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Create action accepting an Idempotency-Key header.
+
+    The first request with a key stores its fingerprint and its response
+    in the transaction creating the object, so a request that fails or
+    dies midway leaves no key behind. Repeats of the same request get
+    the stored response back after a single lookup, without running the
+    action again, until IDEMPOTENCY_KEY_TTL seconds have passed. A repeat
+    arriving while the first request still runs waits on the key's
+    unique index and replays its response. A key reused for another
+    request is rejected with 422.
+    """
+
+    def create(self, request, *args, **kwargs) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_HEADER: f"Must be 1 to {MAX_KEY_LENGTH} "
+                                        f"characters long"
+                }
+            )
+
+        fingerprint = get_fingerprint(request)
+        now = timezone.now()
+
+        record = IdempotencyKey.objects.filter(
+            user=request.user, key=key, expires_at__gt=now
+        ).first()
+        if record is not None:
+            return self.replay(record, fingerprint)
+
+        with transaction.atomic():
+            return self.create_once(
+                request, key, fingerprint, now, *args, **kwargs
+            )
+
+    def create_once(
+        self,
+        request,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        *args,
+        **kwargs,
+    ) -> Response:
+        expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        record, created = IdempotencyKey.objects.get_or_create(
+            user=request.user,
+            key=key,
+            defaults={"fingerprint": fingerprint, "expires_at": expires_at},
+        )
+
+        if not created and record.expires_at <= now:
+            created = IdempotencyKey.objects.filter(
+                pk=record.pk, expires_at__lte=now
+            ).update(
+                fingerprint=fingerprint,
+                status_code=None,
+                response=None,
+                expires_at=expires_at,
+            )
+            if not created:
+                record = IdempotencyKey.objects.get(pk=record.pk)
+
+        if not created:
+            return self.replay(record, fingerprint)
+
+        response = super().create(request, *args, **kwargs)
+
+        if status.is_success(response.status_code):
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code, response=response.data
+            )
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+
+        return response
+
+    def replay(self, record: IdempotencyKey, fingerprint: str) -> Response:
+        if record.fingerprint != fingerprint:
+            return Response(
+                {
+                    IDEMPOTENCY_HEADER: "Already used for another request"
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        return Response(
+            record.response,
+            status=record.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
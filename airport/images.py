@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from airport import stamps
+from airport.models import Airport
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_SIZE = "original"
+# Bounding box, Pillow format and file extension of every variant
+IMAGE_VARIANTS = {
+    "thumbnail": ((160, 160), "JPEG", "jpg"),
+    "medium": ((640, 640), "JPEG", "jpg"),
+    "webp": ((1280, 1280), "WEBP", "webp"),
+}
+IMAGE_SIZES = (ORIGINAL_SIZE, *IMAGE_VARIANTS)
+
+
+def image_storage():
+    return Airport._meta.get_field("image").storage
+
+
+def render_variant(
+    image: Image.Image, box: tuple[int, int], image_format: str
+) -> bytes:
+    variant = image.copy()
+    variant.thumbnail(box)
+    if image_format == "JPEG" and variant.mode not in ("RGB", "L"):
+        variant = variant.convert("RGB")
+
+    buffer = BytesIO()
+    variant.save(buffer, format=image_format, quality=82)
+    return buffer.getvalue()
+
+
+def build_variants(airport_id: int, original: str) -> dict[str, str]:
+    """
+    Render and store the variants of an airport image, then record them
+    on the airport unless its image was replaced in the meantime
+    """
+    storage = image_storage()
+    with storage.open(original) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+
+    root, _ = os.path.splitext(original)
+    names = {
+        size: storage.save(
+            f"{root}-{size}.{extension}",
+            ContentFile(render_variant(image, box, image_format)),
+        )
+        for size, (box, image_format, extension) in IMAGE_VARIANTS.items()
+    }
+
+    if Airport.objects.filter(pk=airport_id, image=original).update(
+        image_variants=names
+    ):
+        stamps.bump(Airport)
+    else:
+        delete_files(names.values())
+    return names
+
+
+def delete_files(names: Iterable[str]) -> None:
+    storage = image_storage()
+    for name in names:
+        storage.delete(name)
+
+
+def replace_variants(
+    airport_id: int, original: str, stale: list[str]
+) -> None:
+    delete_files(stale)
+    build_variants(airport_id, original)
+
+
+class VariantPool:
+    """
+    Bounded pool of IMAGE_VARIANT_WORKERS threads, started on first use,
+    each closing its database connection after a task. With no workers
+    tasks run inline. A failing task is logged in both modes, it runs
+    after the upload has committed.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def submit(self, task: Callable, *args) -> None:
+        if settings.IMAGE_VARIANT_WORKERS <= 0:
+            self.run(task, *args)
+            return
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.IMAGE_VARIANT_WORKERS,
+                    thread_name_prefix="image-variants",
+                )
+        self.executor.submit(self.run_in_thread, task, *args)
+
+    @staticmethod
+    def run(task: Callable, *args) -> None:
+        try:
+            task(*args)
+        except Exception:
+            logger.exception("Building image variants failed")
+
+    @classmethod
+    def run_in_thread(cls, task: Callable, *args) -> None:
+        try:
+            cls.run(task, *args)
+        finally:
+            connection.close()
+
+
+variant_pool = VariantPool()
+
+
+def schedule_variants(airport: Airport, stale: Iterable[str] = ()) -> None:
+    """Build the variants of the airport image once the upload commits"""
+    if not airport.image:
+        return
+
+    args = (airport.pk, airport.image.name, list(stale))
+    transaction.on_commit(lambda: variant_pool.submit(replace_variants, *args))
@@ -0,0 +1,39 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any
+
+from django.db.models import Model
+
+from airport import stamps
+
+
+class GenerationCachedIndex(ABC):
+    """
+    In-memory index of the process, rebuilt on the first get() after
+    the change stamp of one of its models moves or a local write
+    resets it
+    """
+
+    models: tuple[type[Model], ...] = ()
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.index = None
+        self.generation = None
+
+    @abstractmethod
+    def build(self) -> Any:
+        """Index built from the current rows of the models"""
+
+    def get(self) -> Any:
+        generation = stamps.generation_key(*self.models)
+
+        with self.lock:
+            if self.index is None or self.generation != generation:
+                self.index = self.build()
+                self.generation = generation
+            return self.index
+
+    def reset(self) -> None:
+        with self.lock:
+            self.index = None
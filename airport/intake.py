@@ -0,0 +1,187 @@
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from airport import stamps
+from airport.booking import (
+    SeatsUnavailable,
+    find_held_seats,
+    find_sold_seats,
+    lock_flights,
+)
+from airport.models import Flight, HeldSeat, Order, OrderRequest, Ticket
+
+SYNC_INTAKE = "sync"
+QUEUED_INTAKE = "queued"
+DEFAULT_BATCH_SIZE = 50
+
+
+class BatchResult(NamedTuple):
+    confirmed: int
+    rejected: int
+
+    @property
+    def processed(self) -> int:
+        return self.confirmed + self.rejected
+
+
+def enqueue_order(user, tickets: list[dict]) -> OrderRequest:
+    """Queue validated tickets of an order for the intake worker"""
+    return OrderRequest.objects.create(
+        user=user,
+        flight=tickets[0]["flight"],
+        tickets=[
+            {
+                "flight": ticket["flight"].id,
+                "row": ticket["row"],
+                "seat": ticket["seat"],
+            }
+            for ticket in tickets
+        ],
+    )
+
+
+def process_batch(batch_size: int = DEFAULT_BATCH_SIZE) -> BatchResult:
+    """
+    Commit up to batch_size pending order requests of one flight in a
+    single transaction, taking the flight locks once for the batch.
+
+    Requests are taken in arrival order and skip the ones another
+    worker has locked, so several workers can drain the queue. A
+    request asking for a seat sold, held by another user or taken by an
+    earlier request of the batch is rejected, the others become orders.
+    """
+    with transaction.atomic():
+        pending = (
+            OrderRequest.objects.select_for_update(skip_locked=True)
+            .filter(status=OrderRequest.Status.PENDING)
+            .order_by("id")
+        )
+        head = pending.first()
+        if head is None:
+            return BatchResult(0, 0)
+
+        batch = list(pending.filter(flight_id=head.flight_id)[:batch_size])
+        wanted = {
+            request.pk: [
+                (ticket["flight"], ticket["row"], ticket["seat"])
+                for ticket in request.tickets
+            ]
+            for request in batch
+        }
+        all_seats = [seat for seats in wanted.values() for seat in seats]
+
+        flights = {
+            flight.id: flight
+            for flight in lock_flights(
+                flight_id for flight_id, _, _ in all_seats
+            )
+        }
+        now = timezone.now()
+        taken = find_sold_seats(all_seats)
+        held = find_held_seats(all_seats, now)
+
+        accepted = []
+        for request in batch:
+            seats = wanted[request.pk]
+            request.processed_at = now
+
+            if any(flight_id not in flights for flight_id, _, _ in seats):
+                request.status = OrderRequest.Status.REJECTED
+                request.errors = ["Flight does not exist anymore"]
+                continue
+
+            # The airplane of the flight may have changed since queueing
+            try:
+                for flight_id, row, seat in seats:
+                    Ticket.validate_ticket(row, seat, flights[flight_id])
+            except ValidationError as error:
+                request.status = OrderRequest.Status.REJECTED
+                request.errors = error.messages
+                continue
+
+            unavailable = {
+                seat
+                for seat in seats
+                if seat in taken
+                or (seat in held and held[seat][1] != request.user_id)
+            }
+            if unavailable:
+                request.status = OrderRequest.Status.REJECTED
+                request.errors = SeatsUnavailable(unavailable).messages
+                continue
+
+            taken.update(seats)
+            accepted.append(request)
+
+        orders = Order.objects.bulk_create(
+            Order(user_id=request.user_id) for request in accepted
+        )
+
+        released = [
+            held[seat][0]
+            for request in accepted
+            for seat in wanted[request.pk]
+            if seat in held
+        ]
+        if released:
+            HeldSeat.objects.filter(pk__in=released).delete()
+
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight_id=flight_id, row=row, seat=seat)
+            for request, order in zip(accepted, orders)
+            for flight_id, row, seat in wanted[request.pk]
+        )
+
+        sold = defaultdict(list)
+        for request, order in zip(accepted, orders):
+            request.status = OrderRequest.Status.CONFIRMED
+            request.order = order
+            for flight_id, row, seat in wanted[request.pk]:
+                sold[flight_id].append((row, seat))
+        for flight_id, seats in sold.items():
+            Flight.update_seat_map(flight_id, taken=seats)
+
+        OrderRequest.objects.bulk_update(
+            batch, ["status", "order", "errors", "processed_at"]
+        )
+        if orders:
+            stamps.bump(Order, Ticket)
+
+    return BatchResult(len(accepted), len(batch) - len(accepted))
+
+
+class QueuedOrderIntakeMixin:
+    """
+    Create action queueing the order when settings.ORDER_INTAKE is
+    "queued". It answers 202 with the order request, which clients poll
+    until the intake worker confirms or rejects it.
+    """
+
+    order_request_serializer_class = None
+
+    def create(self, request, *args, **kwargs) -> Response:
+        if settings.ORDER_INTAKE != QUEUED_INTAKE:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        order_request = enqueue_order(
+            request.user, serializer.validated_data["tickets"]
+        )
+        location = reverse(
+            "airport:orderrequest-detail", args=[order_request.pk]
+        )
+        return Response(
+            self.order_request_serializer_class(order_request).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": request.build_absolute_uri(location)},
+        )
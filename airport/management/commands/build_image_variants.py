@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+
+from airport.images import replace_variants
+from airport.models import Airport
+
+
+class Command(BaseCommand):
+    """Django command to build resized variants of airport images"""
+
+    help = "Build thumbnail, medium and WebP variants of airport images"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild variants of airports that already have them",
+        )
+
+    def handle(self, *args, **options) -> None:
+        airports = Airport.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            airports = airports.filter(image_variants={})
+
+        built = 0
+        for airport_id, image, variants in airports.values_list(
+            "id", "image", "image_variants"
+        ):
+            replace_variants(airport_id, image, list(variants.values()))
+            built += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Built image variants of {built} airports")
+        )
@@ -0,0 +1,72 @@
+from django.core.management import BaseCommand, CommandError
+
+from airport.cancellation import cancel_flights, cancel_tickets, select_tickets
+
+
+def seat_range(value: str) -> tuple[int, int]:
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+class Command(BaseCommand):
+    """Django command to cancel tickets or whole flights in bulk"""
+
+    help = (
+        "Delete tickets of flights or orders, optionally within row and "
+        "seat ranges, or whole flights, in set-based statements"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--flight",
+            type=int,
+            action="append",
+            default=[],
+            help="Id of a flight, can be repeated",
+        )
+        parser.add_argument(
+            "--order",
+            type=int,
+            action="append",
+            default=[],
+            help="Id of an order, can be repeated",
+        )
+        parser.add_argument(
+            "--rows", type=seat_range, help="Inclusive rows, ex. 10-14"
+        )
+        parser.add_argument(
+            "--seats", type=seat_range, help="Inclusive seats, ex. 1-3"
+        )
+        parser.add_argument(
+            "--whole-flights",
+            action="store_true",
+            help="Delete the flights themselves with all their tickets",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["whole_flights"]:
+            if not options["flight"]:
+                raise CommandError("--whole-flights requires --flight")
+            result = cancel_flights(options["flight"])
+        else:
+            if not options["flight"] and not options["order"]:
+                raise CommandError("Select tickets by --flight or --order")
+            row_from, row_to = options["rows"] or (None, None)
+            seat_from, seat_to = options["seats"] or (None, None)
+            result = cancel_tickets(
+                select_tickets(
+                    options["flight"],
+                    options["order"],
+                    row_from,
+                    row_to,
+                    seat_from,
+                    seat_to,
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cancelled {result.flights} flights, {result.tickets} "
+                f"tickets and {result.orders} orders"
+            )
+        )
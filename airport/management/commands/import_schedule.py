@@ -0,0 +1,49 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from airport.schedules import DEFAULT_BATCH_SIZE, import_schedules
+from airport.serializers import FlightScheduleSerializer
+
+
+class Command(BaseCommand):
+    """Django command to create flights from a file of weekly schedules"""
+
+    help = (
+        "Import a JSON list of schedules: "
+        '[{"route": 1, "airplane": 1, "crew": [1, 2], "weekdays": [1, 5], '
+        '"departure_time": "08:00", "arrival_time": "10:30", '
+        '"valid_from": "2024-04-01", "valid_to": "2024-10-26"}]'
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="Path to the JSON schedule file")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows per INSERT statement",
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            with open(options["path"]) as schedule_file:
+                data = json.load(schedule_file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read schedules: {error}")
+
+        serializer = FlightScheduleSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            raise CommandError(f"Invalid schedules: {serializer.errors}")
+
+        result = import_schedules(
+            serializer.validated_data, batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            f"Created {result.created} flights, skipped {result.skipped} "
+            f"existing, linked {result.crew_links} crew members in "
+            f"{result.seconds:.2f}s ({result.flights_per_second:.0f} "
+            f"flights/s)"
+        )
+        self.stdout.write(self.style.SUCCESS("Schedules imported!"))
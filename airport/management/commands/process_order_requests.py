@@ -0,0 +1,53 @@
+import time
+
+from django.core.management import BaseCommand
+
+from airport.intake import DEFAULT_BATCH_SIZE, process_batch
+
+
+class Command(BaseCommand):
+    """Django command to commit queued orders in batches"""
+
+    help = "Confirm or reject queued order requests, a batch per flight"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Maximum number of order requests per transaction",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.2,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Stop when the queue is empty instead of polling",
+        )
+
+    def handle(self, *args, **options) -> None:
+        confirmed = rejected = 0
+
+        try:
+            while True:
+                result = process_batch(options["batch_size"])
+                confirmed += result.confirmed
+                rejected += result.rejected
+
+                if not result.processed:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Confirmed {confirmed} and rejected {rejected} "
+                f"order requests!"
+            )
+        )
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from airport.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """Django command to delete expired idempotency keys of orders"""
+
+    help = "Delete idempotency keys whose stored response has expired"
+
+    def handle(self, *args, **options) -> None:
+        deleted, _ = IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired keys!")
+        )
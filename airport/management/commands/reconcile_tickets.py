@@ -0,0 +1,44 @@
+from django.core.management import BaseCommand
+
+from airport import stamps
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    """Django command to recompute denormalized flight ticket data"""
+
+    help = "Recompute sold tickets counters and seat maps of flights"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--seat-maps",
+            action="store_true",
+            help="Rebuild seat maps in addition to the counters",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of flights per seat map rebuild batch",
+        )
+
+    def handle(self, *args, **options) -> None:
+        updated = Flight.recount_tickets()
+        stamps.bump(Flight)
+        self.stdout.write(f"Recounted sold tickets of {updated} flights")
+
+        if options["seat_maps"]:
+            flight_ids = list(
+                Flight.objects.order_by("id").values_list("id", flat=True)
+            )
+            batch_size = options["batch_size"]
+            for start in range(0, len(flight_ids), batch_size):
+                Flight.rebuild_seat_maps(
+                    flight_ids[start:start + batch_size]
+                )
+            stamps.bump(Flight)
+            self.stdout.write(
+                f"Rebuilt seat maps of {len(flight_ids)} flights"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Flights reconciled!"))
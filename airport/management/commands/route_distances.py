@@ -0,0 +1,46 @@
+from django.core.management import BaseCommand, CommandError
+
+from airport.geo import check_route_distances, fill_route_distances
+
+
+class Command(BaseCommand):
+    """Django command to check or fill route distances from coordinates"""
+
+    help = (
+        "Compare the distance of every route between airports with "
+        "coordinates to their great-circle distance, or set it with --fill"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--fill",
+            action="store_true",
+            help="Overwrite route distances with great-circle distances",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=1.0,
+            help="Percent a checked distance may be off, 1 by default",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["fill"]:
+            changed = fill_route_distances()
+            self.stdout.write(
+                self.style.SUCCESS(f"Updated the distance of {changed} routes")
+            )
+            return
+
+        mismatches = check_route_distances(options["tolerance"])
+        for route in mismatches:
+            self.stdout.write(
+                f"Route {route.route}: {route.distance} {route.unit}, "
+                f"great-circle {route.computed} {route.unit}"
+            )
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} routes are more than "
+                f"{options['tolerance']:g}% off, fix them with --fill"
+            )
+        self.stdout.write(self.style.SUCCESS("All route distances match"))
@@ -0,0 +1,254 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from airport.booking import (
+    HoldExpired,
+    SeatsUnavailable,
+    book_seats,
+    confirm_hold,
+    hold_seats,
+)
+from airport.intake import DEFAULT_BATCH_SIZE, enqueue_order, process_batch
+from airport.models import Flight, Order, OrderRequest, Ticket
+
+BUYER_EMAIL = "buyer{}@stress.test"
+MODES = ("holds", "orders", "queued")
+
+
+def buy_with_order(user, flight: Flight, seats: list[tuple]) -> None:
+    with transaction.atomic():
+        order = Order.objects.create(user=user)
+        book_seats(
+            order,
+            [
+                Ticket(order=order, flight=flight, row=row, seat=seat)
+                for row, seat in seats
+            ],
+        )
+
+
+def buy_with_hold(user, flight: Flight, seats: list[tuple]) -> None:
+    confirm_hold(hold_seats(user, flight, seats))
+
+
+def buy_with_queue(user, flight: Flight, seats: list[tuple]) -> None:
+    enqueue_order(
+        user,
+        [{"flight": flight, "row": row, "seat": seat} for row, seat in seats],
+    )
+
+
+BUYERS = {
+    "holds": buy_with_hold,
+    "orders": buy_with_order,
+    "queued": buy_with_queue,
+}
+
+
+class Command(BaseCommand):
+    """Django command to measure seat booking under concurrent buyers"""
+
+    help = (
+        "Run parallel buyers competing for the seats of a flight and "
+        "report bookings per second and conflict rate"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("flight", type=int, help="Id of the flight")
+        parser.add_argument(
+            "--buyers",
+            type=int,
+            default=300,
+            help="Number of buyers, each buying one group of seats",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=50,
+            help="Number of threads, each with its own connection",
+        )
+        parser.add_argument(
+            "--seats",
+            type=int,
+            default=2,
+            help="Number of adjacent seats every buyer wants",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=MODES,
+            default=MODES[0],
+            help="Buy through a seat hold, directly with an order or "
+                 "through the queue of order requests",
+        )
+        parser.add_argument(
+            "--intake-workers",
+            type=int,
+            default=2,
+            help="Number of threads committing queued orders",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Maximum number of queued orders per transaction",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the orders of the buyers instead of deleting them",
+        )
+
+    def handle(self, *args, **options) -> None:
+        for option in ("buyers", "workers"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1")
+
+        flight = (
+            Flight.objects.select_related("airplane")
+            .filter(pk=options["flight"])
+            .first()
+        )
+        if flight is None:
+            raise CommandError(f"Flight {options['flight']} does not exist")
+
+        seats_in_row = flight.airplane.seats_in_row
+        if not 1 <= options["seats"] <= seats_in_row:
+            raise CommandError(
+                f"--seats must be in range: (1, {seats_in_row})"
+            )
+
+        buyers = self.get_buyers(options["buyers"])
+        wishes = self.get_wishes(buyers, flight, options)
+        options["workers"] = max(1, min(options["workers"], len(wishes)))
+
+        started = time.perf_counter()
+        outcomes = self.run_buyers(flight, wishes, options)
+        seconds = time.perf_counter() - started
+
+        if options["mode"] == "queued":
+            requests = OrderRequest.objects.filter(user__in=buyers)
+            del outcomes["queued"]
+            outcomes["booked"] += requests.filter(
+                status=OrderRequest.Status.CONFIRMED
+            ).count()
+            outcomes["conflicts"] += requests.filter(
+                status=OrderRequest.Status.REJECTED
+            ).count()
+
+        self.report(outcomes, seconds, options)
+
+        if not options["keep"]:
+            Order.objects.filter(user__in=buyers).delete()
+            OrderRequest.objects.filter(user__in=buyers).delete()
+
+        if set(outcomes) - {"booked", "conflicts"}:
+            raise CommandError("Some buyers failed with unexpected errors")
+
+    def get_wishes(self, buyers: list, flight: Flight, options) -> list:
+        """Pick adjacent seats of a random row for every buyer"""
+        airplane = flight.airplane
+        rnd = random.Random(options["seed"])
+        wishes = []
+
+        for buyer in buyers:
+            row = rnd.randint(1, airplane.rows)
+            first = rnd.randint(
+                1, airplane.seats_in_row - options["seats"] + 1
+            )
+            seats = range(first, first + options["seats"])
+            wishes.append((buyer, [(row, seat) for seat in seats]))
+
+        return wishes
+
+    def run_buyers(self, flight: Flight, wishes: list, options) -> Counter:
+        """
+        Start all buyer threads at once, plus the intake workers in
+        queued mode, and count the outcome of every buyer
+        """
+        buy = BUYERS[options["mode"]]
+        queued = options["mode"] == "queued"
+        workers = options["workers"]
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+        buying_done = threading.Event()
+
+        def run(share: list) -> None:
+            barrier.wait()
+            try:
+                for buyer, seats in share:
+                    try:
+                        buy(buyer, flight, seats)
+                        outcome = "queued" if queued else "booked"
+                    except (SeatsUnavailable, HoldExpired):
+                        outcome = "conflicts"
+                    except Exception as error:
+                        outcome = type(error).__name__
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        def commit_queue() -> None:
+            try:
+                while True:
+                    result = process_batch(options["batch_size"])
+                    if not result.processed:
+                        if buying_done.is_set():
+                            break
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run, args=(wishes[index::workers],))
+            for index in range(workers)
+        ]
+        intake_threads = [
+            threading.Thread(target=commit_queue)
+            for _ in range(options["intake_workers"] if queued else 0)
+        ]
+        for thread in threads + intake_threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        buying_done.set()
+        for thread in intake_threads:
+            thread.join()
+
+        return outcomes
+
+    def get_buyers(self, count: int) -> list:
+        user_model = get_user_model()
+        emails = [BUYER_EMAIL.format(index) for index in range(count)]
+        user_model.objects.bulk_create(
+            (
+                user_model(email=email, password=make_password(None))
+                for email in emails
+            ),
+            ignore_conflicts=True,
+        )
+        return list(user_model.objects.filter(email__in=emails))
+
+    def report(self, outcomes: Counter, seconds: float, options) -> None:
+        total = sum(outcomes.values())
+        booked = outcomes["booked"]
+        self.stdout.write(
+            f"{total} buyers on {options['workers']} workers "
+            f"({options['mode']}) in {seconds:.2f}s "
+            f"({total / seconds:.1f} buyers/s): "
+            f"{booked} bookings ({booked / seconds:.1f} bookings/s), "
+            f"{outcomes['conflicts']} conflicts "
+            f"({outcomes['conflicts'] / total:.1%} conflict rate)"
+        )
+        for outcome, count in sorted(outcomes.items()):
+            if outcome not in ("booked", "conflicts"):
+                self.stdout.write(f"{count} buyers failed with {outcome}")
@@ -0,0 +1,159 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+# Uploads are named with a fresh UUID (see airport_image_file_path), so a
+# URL holding one never changes content and can be cached for a year
+UUID_NAME = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    First and last byte of a single byte range, or None for a header
+    that can't be honoured with one range, which is served in full.
+    Raises ValueError when the range starts past the end of the file.
+    """
+    match = BYTE_RANGE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    first = int(start) if start else max(size - int(end), 0)
+    if first >= size:
+        raise ValueError("Range not satisfiable")
+    if not start or not end:
+        return first, size - 1
+    if int(end) < first:
+        return None
+    return first, min(int(end), size - 1)
+
+
+class FileRange:
+    """
+    File opened at the start of a byte range reading no further than its
+    end. fileno() lets servers sendfile() the range straight from the
+    file, they stop at the response Content-Length.
+    """
+
+    def __init__(self, file, start: int, length: int) -> None:
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def set_cache_headers(response: HttpResponse, path: str) -> None:
+    if UUID_NAME.search(os.path.basename(path)):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+
+
+def hand_off(path: str, full_path: str) -> HttpResponse:
+    """Empty response telling the front server which file to send"""
+    content_type, _ = mimetypes.guess_type(path)
+    response = HttpResponse(
+        content_type=content_type or "application/octet-stream"
+    )
+    if settings.MEDIA_SERVING == "x-accel-redirect":
+        response["X-Accel-Redirect"] = quote(
+            settings.MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + path
+        )
+    else:
+        response["X-Sendfile"] = full_path
+    set_cache_headers(response, path)
+    return response
+
+
+def file_response(
+    request, full_path: str, size: int, etag: str
+) -> HttpResponse:
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and if_range in (None, etag):
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1))
+        response.status_code = 206
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path: str) -> HttpResponse:
+    """
+    Serve a file of MEDIA_ROOT, or hand it off to the front server
+    according to MEDIA_SERVING.
+
+    Files sent by Django answer conditional and single byte range
+    requests, and are streamed through the server's file wrapper so
+    they can be sent with sendfile().
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+    if settings.MEDIA_SERVING != "django":
+        return hand_off(path, full_path)
+
+    try:
+        file_stat = os.stat(full_path)
+    except OSError:
+        raise Http404("File not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("File not found")
+
+    etag = f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+    last_modified = int(file_stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+    if response is None:
+        response = file_response(request, full_path, file_stat.st_size, etag)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    set_cache_headers(response, path)
+    return response
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.6 on 2026-10-17 05:52
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from airport.seat_map import SeatMap
+
+
+def fill_seat_maps(apps, schema_editor) -> None:
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    seats = defaultdict(list)
+    for flight_id, row, seat in Ticket.objects.values_list(
+        "flight_id", "row", "seat"
+    ):
+        seats[flight_id].append((row, seat))
+
+    flights = list(Flight.objects.select_related("airplane"))
+    for flight in flights:
+        flight.seat_map = SeatMap.from_seats(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            seats[flight.id],
+        ).to_bytes()
+    Flight.objects.bulk_update(flights, ["seat_map"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0007_airport_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seat_map",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.6 on 2026-10-17 05:54
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_sold(apps, schema_editor) -> None:
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    sold = (
+        Ticket.objects.filter(flight=models.OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=models.Count("id"))
+        .values("count")
+    )
+    Flight.objects.update(tickets_sold=Coalesce(models.Subquery(sold), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0008_flight_seat_map"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
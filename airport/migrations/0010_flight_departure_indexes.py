@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-17 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0009_flight_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time", "id"], name="flight_departure_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-17 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0010_flight_departure_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeStamp",
+            fields=[
+                (
+                    "label",
+                    models.CharField(max_length=128, primary_key=True, serialize=False),
+                ),
+                ("generation", models.PositiveBigIntegerField(default=0)),
+                ("changed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.6 on 2026-10-17 08:12
+
+from django.db import migrations
+
+# Indexes on the UPPER() expressions Django compares for icontains
+TRIGRAM_INDEXES = {
+    "airport_name_trgm_idx": "name",
+    "airport_city_trgm_idx": "closest_big_city",
+}
+
+
+def has_pg_trgm(connection) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor) -> None:
+    if not has_pg_trgm(schema_editor.connection):
+        return
+
+    Airport = apps.get_model("airport", "Airport")
+    table = schema_editor.quote_name(Airport._meta.db_table)
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (UPPER({schema_editor.quote_name(column)}) "
+            f"gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0014_orderrequest"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
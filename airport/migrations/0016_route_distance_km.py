@@ -0,0 +1,31 @@
+# Generated by Django 4.2.6 on 2026-10-17 06:37
+
+import airport.models
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def fill_distance_km(apps, schema_editor) -> None:
+    Route = apps.get_model("airport", "Route")
+
+    for unit, factor in airport.models.KILOMETERS_PER_UNIT.items():
+        Route.objects.filter(type_of_measurement=unit).update(
+            distance_km=Round(models.F("distance") * factor, 3)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0015_airport_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="route",
+            name="distance_km",
+            field=airport.models.KilometersField(
+                db_index=True, default=0, editable=False
+            ),
+        ),
+        migrations.RunPython(fill_distance_km, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0016_route_distance_km"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airport",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.6 on 2026-10-17 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0018_airport_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="order_user_created_id_idx",
+            ),
+        ),
+    ]
@@ -1,13 +1,30 @@
 import os
 import uuid
+from collections import defaultdict
+from typing import Iterable
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 
+from airport.seat_map import SeatMap
 from airport_api_service import settings
 
 
+class ChangeStamp(models.Model):
+    """Generation counter and last change time of a model's rows"""
+
+    label = models.CharField(max_length=128, primary_key=True)
+    generation = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.label} ({self.generation})"
+
+
 class AirplaneType(models.Model):
     name = models.CharField(max_length=128)
 
@@ -57,11 +74,47 @@ class Airport(models.Model):
     name = models.CharField(max_length=128)
     closest_big_city = models.CharField(max_length=128)
     image = models.ImageField(null=True, upload_to=airport_image_file_path)
+    image_variants = models.JSONField(default=dict, editable=False)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+
+    def get_image_name(self, size: str) -> str:
+        """Storage name of an image variant, the original until it exists"""
+        return self.image_variants.get(size) or self.image.name
 
     def __str__(self) -> str:
         return self.name
 
 
+KILOMETERS_PER_UNIT = {"km": 1.0, "ml": 1.609344}
+
+
+def to_kilometers(distance: int, unit: str) -> float:
+    return round(distance * KILOMETERS_PER_UNIT[unit], 3)
+
+
+class KilometersField(models.FloatField):
+    """
+    Route distance in kilometers, computed from distance and
+    type_of_measurement whenever a route is saved or bulk created
+    """
+
+    def pre_save(self, model_instance, add: bool) -> float:
+        value = to_kilometers(
+            model_instance.distance, model_instance.type_of_measurement
+        )
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Route(models.Model):
     class MeasurementChoices(models.TextChoices):
         KILOMETERS = "km", "Kilometers"
@@ -79,6 +132,7 @@ class Route(models.Model):
         choices=MeasurementChoices.choices,
         default=MeasurementChoices.KILOMETERS
     )
+    distance_km = KilometersField(default=0, editable=False, db_index=True)
 
     class Meta:
         ordering = ["source", "destination"]
@@ -91,6 +145,19 @@ class Route(models.Model):
         return self.source_destination
 
 
+class FlightQuerySet(models.QuerySet):
+    @staticmethod
+    def tickets_available() -> models.Expression:
+        """Seats of the airplane minus sold tickets of the flight"""
+        return (
+            models.F("airplane__rows") * models.F("airplane__seats_in_row")
+            - models.F("tickets_sold")
+        )
+
+    def with_tickets_available(self) -> "FlightQuerySet":
+        return self.annotate(tickets_available=self.tickets_available())
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route, on_delete=models.CASCADE, related_name="flights"
@@ -101,9 +168,120 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = FlightQuerySet.as_manager()
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_id_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+        ]
+
+    def get_seat_map(self) -> SeatMap:
+        return SeatMap(
+            self.airplane.rows, self.airplane.seats_in_row, self.seat_map
+        )
+
+    @classmethod
+    def update_seat_map(
+        cls,
+        flight_id: int,
+        taken: Iterable[tuple] = (),
+        released: Iterable[tuple] = (),
+    ) -> None:
+        """
+        Mark seats as taken or released and adjust the sold tickets counter
+        under a lock on the flight row
+        """
+        taken, released = list(taken), list(released)
+
+        with transaction.atomic():
+            flight = (
+                cls.objects.select_for_update(of=("self",))
+                .select_related("airplane")
+                .filter(pk=flight_id)
+                .first()
+            )
+            if flight is None:
+                return
+
+            seat_map = flight.get_seat_map()
+            for row, seat in released:
+                seat_map.release(row, seat)
+            for row, seat in taken:
+                seat_map.take(row, seat)
+
+            cls.objects.filter(pk=flight_id).update(
+                seat_map=seat_map.to_bytes(),
+                tickets_sold=(
+                    models.F("tickets_sold") + len(taken) - len(released)
+                ),
+            )
+
+    @classmethod
+    def rebuild_seat_maps(cls, flight_ids: Iterable[int]) -> int:
+        """
+        Recompute seat maps and counters of the given flights, reading
+        their tickets under a lock on the flight rows so no booking
+        commits in between
+        """
+        flight_ids = list(flight_ids)
+        if not flight_ids:
+            return 0
+
+        with transaction.atomic():
+            flights = list(
+                cls.objects.select_for_update(of=("self",))
+                .filter(pk__in=flight_ids)
+                .select_related("airplane")
+                .only("id", "airplane__rows", "airplane__seats_in_row")
+                .order_by("pk")
+            )
+            seats = defaultdict(list)
+            for flight_id, row, seat in Ticket.objects.filter(
+                flight__in=flights
+            ).values_list("flight_id", "row", "seat"):
+                seats[flight_id].append((row, seat))
+
+            for flight in flights:
+                seat_map = SeatMap(
+                    flight.airplane.rows, flight.airplane.seats_in_row
+                )
+                for row, seat in seats[flight.id]:
+                    try:
+                        seat_map.take(row, seat)
+                    except IndexError:
+                        continue
+                flight.seat_map = seat_map.to_bytes()
+                flight.tickets_sold = len(seats[flight.id])
+
+            cls.objects.bulk_update(
+                flights, ["seat_map", "tickets_sold"], batch_size=500
+            )
+        return len(flights)
+
+    @classmethod
+    def recount_tickets(cls) -> int:
+        """Recompute sold tickets counters of all flights in one statement"""
+        sold = (
+            Ticket.objects.filter(flight=models.OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return cls.objects.update(
+            tickets_sold=Coalesce(models.Subquery(sold), 0)
+        )
 
     def __str__(self) -> str:
         return f"{self.departure_time}-{self.arrival_time}"
@@ -122,6 +300,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="order_user_created_id_idx",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -176,3 +360,104 @@ class Ticket(models.Model):
 
     def __str__(self) -> str:
         return f"{str(self.flight)} (row: {self.row}, seat: {self.seat})"
+
+
+class SeatHold(models.Model):
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{str(self.flight)} (until: {self.expires_at})"
+
+
+class HeldSeat(models.Model):
+    hold = models.ForeignKey(
+        SeatHold, on_delete=models.CASCADE, related_name="seats"
+    )
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="held_seats"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+
+    class Meta:
+        unique_together = ("flight", "row", "seat")
+        ordering = ["row", "seat"]
+
+    def __str__(self) -> str:
+        return f"{str(self.flight)} (row: {self.row}, seat: {self.seat})"
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self) -> str:
+        return f"{self.key} (until: {self.expires_at})"
+
+
+class OrderRequest(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        CONFIRMED = "confirmed", "Confirmed"
+        REJECTED = "rejected", "Rejected"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests"
+    )
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="order_requests"
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="request"
+    )
+    errors = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["flight", "id"],
+                condition=models.Q(status="pending"),
+                name="order_request_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{str(self.flight)} ({self.status})"
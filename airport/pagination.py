@@ -1,6 +1,187 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over (ordering_field, id) in descending order.
+
+    The cursor holds the key of the last row of the page, so every page
+    is a range condition on an index instead of an OFFSET scan.
+    """
+
+    ordering_field = None
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request, view=None
+    ) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        field = self.ordering_field
+
+        if cursor is None:
+            reverse = False
+            ordering = (f"-{field}", "-id")
+        else:
+            value, pk, reverse = cursor
+            if reverse:
+                ordering = (field, "id")
+                queryset = queryset.filter(
+                    Q(**{f"{field}__gte": value}),
+                    Q(**{f"{field}__gt": value}) | Q(id__gt=pk),
+                )
+            else:
+                ordering = (f"-{field}", "-id")
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lte": value}),
+                    Q(**{f"{field}__lt": value}) | Q(id__lt=pk),
+                )
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        return self.page
+
+    def get_page_size(self, request) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request, model: type[Model]) -> tuple | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = parse.parse_qs(
+                b64decode(encoded.encode("ascii")).decode("ascii"),
+                keep_blank_values=True,
+            )
+            field = model._meta.get_field(self.ordering_field)
+            value = field.to_python(tokens["v"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (
+            TypeError, ValueError, KeyError, UnicodeError, ValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return value, pk, reverse
+
+    def encode_cursor(self, item, reverse: bool) -> str:
+        if isinstance(item, dict):
+            value, pk = item[self.ordering_field], item["id"]
+        else:
+            value, pk = getattr(item, self.ordering_field), item.id
+
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+
+        tokens = {"v": value, "i": pk}
+        if reverse:
+            tokens["r"] = "1"
+
+        encoded = b64encode(parse.urlencode(tokens).encode("ascii"))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class FlightPagination(KeysetPagination):
+    ordering_field = "departure_time"
+    page_size = 20
+    max_page_size = 100
+
+
+class OrderCursorPagination(KeysetPagination):
+    ordering_field = "created_at"
+    page_size = 10
+    max_page_size = 100
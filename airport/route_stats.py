@@ -0,0 +1,108 @@
+import bisect
+import math
+from typing import Sequence
+
+from django.db.models import QuerySet
+
+DEFAULT_BINS = 10
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """Linearly interpolated percentile of sorted values"""
+    position = (len(values) - 1) * rank / 100
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def bin_edges(low: float, high: float, bins: int) -> list[float]:
+    width = (high - low) / bins or 1
+    return [round(low + width * index, 3) for index in range(bins + 1)]
+
+
+def histogram(values: Sequence[float], edges: list[float]) -> list[int]:
+    """
+    Counts of sorted values per bin, found by binary search of the edges
+    instead of visiting the values. The last bin includes its upper edge.
+    """
+    positions = [bisect.bisect_left(values, edge) for edge in edges[:-1]]
+    positions.append(len(values))
+    return [
+        positions[index + 1] - positions[index]
+        for index in range(len(edges) - 1)
+    ]
+
+
+def summarize(
+    values: Sequence[float], edges: list[float], ranks: Sequence[float]
+) -> dict:
+    """Statistics of sorted values, null ones when there are none"""
+    if not values:
+        return {
+            "count": 0,
+            "min": None,
+            "max": None,
+            "mean": None,
+            "percentiles": {f"{rank:g}": None for rank in ranks},
+            "histogram": [0] * max(len(edges) - 1, 0),
+        }
+    return {
+        "count": len(values),
+        "min": values[0],
+        "max": values[-1],
+        "mean": round(math.fsum(values) / len(values), 3),
+        "percentiles": {
+            f"{rank:g}": round(percentile(values, rank), 3) for rank in ranks
+        },
+        "histogram": histogram(values, edges),
+    }
+
+
+def route_statistics(
+    routes: QuerySet,
+    bins: int = DEFAULT_BINS,
+    ranks: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """
+    Distance histograms and percentiles in kilometers of routes, overall
+    and per source airport.
+
+    Distances are read in one query as two flat columns sorted by source
+    and distance, so every source is a sorted slice of the distances
+    and its statistics are index lookups on that slice.
+    """
+    rows = routes.order_by("source_id", "distance_km").values_list(
+        "source_id", "distance_km"
+    )
+    columns = list(zip(*rows))
+    if not columns:
+        return {
+            "unit": "km",
+            **summarize([], [], ranks),
+            "edges": [],
+            "sources": [],
+        }
+
+    sources, distances = columns
+    overall = sorted(distances)
+    edges = bin_edges(overall[0], overall[-1], bins)
+
+    per_source = []
+    start = 0
+    while start < len(sources):
+        end = bisect.bisect_right(sources, sources[start], lo=start)
+        per_source.append(
+            {
+                "source": sources[start],
+                **summarize(distances[start:end], edges, ranks),
+            }
+        )
+        start = end
+
+    return {
+        "unit": "km",
+        **summarize(overall, edges, ranks),
+        "edges": edges,
+        "sources": per_source,
+    }
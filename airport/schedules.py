@@ -0,0 +1,128 @@
+import time as timer
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from airport import stamps
+from airport.models import Flight
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ScheduleImportResult(NamedTuple):
+    created: int
+    skipped: int
+    crew_links: int
+    seconds: float
+
+    @property
+    def flights_per_second(self) -> float:
+        return self.created / self.seconds if self.seconds else 0.0
+
+
+def expand_schedule(
+    weekdays: Iterable[int],
+    departure_time: time,
+    arrival_time: time,
+    valid_from: date,
+    valid_to: date,
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Yield departure and arrival of every flight of a weekly schedule
+    between valid_from and valid_to inclusive. Weekdays are ISO numbers
+    (1 is Monday), an arrival not later than the departure lands the
+    next day.
+    """
+    weekdays = set(weekdays)
+    duration = datetime.combine(date.min, arrival_time) - datetime.combine(
+        date.min, departure_time
+    )
+    if duration <= timedelta(0):
+        duration += timedelta(days=1)
+
+    day = valid_from
+    while day <= valid_to:
+        if day.isoweekday() in weekdays:
+            departure = timezone.make_aware(
+                datetime.combine(day, departure_time)
+            )
+            yield departure, departure + duration
+        day += timedelta(days=1)
+
+
+@transaction.atomic
+def import_schedules(
+    schedules: Iterable[dict], batch_size: int = DEFAULT_BATCH_SIZE
+) -> ScheduleImportResult:
+    """
+    Expand schedules into flights and insert them with their crew in
+    batches. Flights already existing for the same route, airplane and
+    departure time are skipped, so importing a timetable twice is safe.
+    """
+    started = timer.perf_counter()
+    flights, crews = [], []
+
+    for schedule in schedules:
+        for departure, arrival in expand_schedule(
+            schedule["weekdays"],
+            schedule["departure_time"],
+            schedule["arrival_time"],
+            schedule["valid_from"],
+            schedule["valid_to"],
+        ):
+            flights.append(
+                Flight(
+                    route_id=schedule["route"].id,
+                    airplane_id=schedule["airplane"].id,
+                    departure_time=departure,
+                    arrival_time=arrival,
+                )
+            )
+            # A crew member listed twice is linked once
+            crews.append(
+                list(dict.fromkeys(member.id for member in schedule["crew"]))
+            )
+
+    if not flights:
+        return ScheduleImportResult(0, 0, 0, timer.perf_counter() - started)
+
+    existing = set(
+        Flight.objects.filter(
+            route_id__in={flight.route_id for flight in flights},
+            departure_time__gte=min(f.departure_time for f in flights),
+            departure_time__lte=max(f.departure_time for f in flights),
+        ).values_list("route_id", "airplane_id", "departure_time")
+    )
+
+    new_flights, new_crews = [], []
+    for flight, crew in zip(flights, crews):
+        key = (flight.route_id, flight.airplane_id, flight.departure_time)
+        if key not in existing:
+            existing.add(key)
+            new_flights.append(flight)
+            new_crews.append(crew)
+
+    Flight.objects.bulk_create(new_flights, batch_size=batch_size)
+
+    # The flights are new and their crew ids unique, so every link is
+    # inserted and the count is exact
+    crew_links = Flight.crew.through.objects.bulk_create(
+        (
+            Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+            for flight, crew in zip(new_flights, new_crews)
+            for crew_id in crew
+        ),
+        batch_size=batch_size,
+    )
+
+    if new_flights:
+        stamps.bump(Flight)
+
+    return ScheduleImportResult(
+        created=len(new_flights),
+        skipped=len(flights) - len(new_flights),
+        crew_links=len(crew_links),
+        seconds=timer.perf_counter() - started,
+    )
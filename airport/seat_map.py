@@ -0,0 +1,133 @@
+from typing import Iterable, Iterator
+
+
+class SeatMap:
+    """
+    Packed seat occupancy of a flight.
+
+    Every seat of the airplane is one bit, seats are numbered row by row
+    starting from (1, 1) and bits are stored most significant bit first,
+    so the map of a 60x10 airplane takes 75 bytes.
+    """
+
+    def __init__(
+        self, rows: int, seats_in_row: int, data: bytes = b""
+    ) -> None:
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self.bits = bytearray(bytes(data)[:size].ljust(size, b"\x00"))
+
+    @classmethod
+    def from_seats(
+        cls, rows: int, seats_in_row: int, seats: Iterable[tuple]
+    ) -> "SeatMap":
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.take(row, seat)
+        return seat_map
+
+    def _position(self, row: int, seat: int) -> tuple:
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            raise IndexError(f"Seat ({row}, {seat}) is out of the map")
+
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 0x80 >> (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self.bits[byte] & mask)
+
+    def take(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self.bits[byte] |= mask
+
+    def release(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self.bits[byte] &= ~mask
+
+    def row_bits(self, row: int) -> list:
+        return [
+            self.is_taken(row, seat)
+            for seat in range(1, self.seats_in_row + 1)
+        ]
+
+    def taken_seats(self) -> Iterator[tuple]:
+        """Yield (row, seat) of every taken seat in row order"""
+        for byte_index, byte in enumerate(self.bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def row_runs(self) -> list:
+        """
+        Run-length form of the map: one list per row with alternating
+        lengths of free and taken seats, always starting with free seats.
+        """
+        runs = []
+        for row in range(1, self.rows + 1):
+            row_runs, current, length = [], False, 0
+            for taken in self.row_bits(row):
+                if taken != current:
+                    row_runs.append(length)
+                    current, length = taken, 0
+                length += 1
+            row_runs.append(length)
+            runs.append(row_runs)
+        return runs
+
+    def free_runs(self) -> list:
+        """(row, first seat, length) of every run of free seats in a row"""
+        runs, bits, seats_in_row, index = [], self.bits, self.seats_in_row, 0
+
+        for row in range(1, self.rows + 1):
+            start = None
+            for seat in range(1, seats_in_row + 1):
+                if bits[index >> 3] & (0x80 >> (index & 7)):
+                    if start is not None:
+                        runs.append((row, start, seat - start))
+                        start = None
+                elif start is None:
+                    start = seat
+                index += 1
+            if start is not None:
+                runs.append((row, start, seats_in_row + 1 - start))
+
+        return runs
+
+    def assign(self, size: int) -> list:
+        """
+        Pick free seats for a party of size: the tightest run of free
+        seats of a row that fits the whole party, so longer runs stay
+        available for larger parties. Otherwise the party is split over
+        the fewest runs, the longest first and the tightest fit for the
+        rest. Returns an empty list when fewer seats are free.
+        """
+        runs = self.free_runs()
+        if sum(length for _, _, length in runs) < size:
+            return []
+
+        runs.sort(key=lambda run: (-run[2], run[0], run[1]))
+        seats, left = [], size
+        while left:
+            fitting = [run for run in runs if run[2] >= left]
+            if fitting:
+                row, first, _ = min(
+                    fitting, key=lambda run: (run[2], run[0], run[1])
+                )
+                length = left
+            else:
+                row, first, length = runs.pop(0)
+            seats.extend((row, seat) for seat in range(first, first + length))
+            left -= length
+
+        return sorted(seats)
+
+    def count(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
@@ -1,6 +1,20 @@
+import base64
+
 from django.db import transaction
+from django.db.models import QuerySet
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from airport.booking import (
+    HoldLimitExceeded,
+    SeatsUnavailable,
+    book_seats,
+    hold_seats,
+)
+from airport.cancellation import select_tickets
+from airport.fast_lists import ValuesSerializer, column, datetime_column
+from airport.fieldsets import DynamicFieldsMixin
+from airport.images import ORIGINAL_SIZE, image_storage, schedule_variants
 from airport.models import (
     AirplaneType,
     Airplane,
@@ -9,17 +23,21 @@ from airport.models import (
     Route,
     Flight,
     Order,
-    Ticket
+    Ticket,
+    SeatHold,
+    HeldSeat,
+    OrderRequest,
 )
+from airport.route_stats import DEFAULT_BINS, DEFAULT_PERCENTILES
 
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+class AirplaneTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AirplaneType
         fields = ("id", "name")
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Airplane
         fields = (
@@ -39,22 +57,58 @@ class AirplaneRetrieveSerializer(AirplaneSerializer):
     )
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city")
+        fields = ("id", "name", "closest_big_city", "latitude", "longitude")
+
+    def validate(self, attrs: dict) -> dict:
+        coordinates = [
+            attrs.get(field, getattr(self.instance, field, None))
+            for field in ("latitude", "longitude")
+        ]
+        if coordinates.count(None) == 1:
+            raise serializers.ValidationError(
+                "Latitude and longitude must be set together"
+            )
+        return attrs
+
 
+class AirportListRetrieveSerializer(
+    DynamicFieldsMixin, serializers.ModelSerializer
+):
+    image = serializers.SerializerMethodField()
 
-class AirportListRetrieveSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "image")
+        fields = (
+            "id",
+            "name",
+            "closest_big_city",
+            "latitude",
+            "longitude",
+            "image",
+        )
+
+    @extend_schema_field(serializers.URLField(allow_null=True))
+    def get_image(self, airport: Airport) -> str | None:
+        """URL of the image variant of the image_size context"""
+        if not airport.image:
+            return None
+
+        url = image_storage().url(
+            airport.get_image_name(
+                self.context.get("image_size", ORIGINAL_SIZE)
+            )
+        )
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
 
 
 class AirportImageSerializer(serializers.ModelSerializer):
@@ -62,8 +116,41 @@ class AirportImageSerializer(serializers.ModelSerializer):
         model = Airport
         fields = ("id", "image")
 
+    def update(self, instance: Airport, validated_data: dict) -> Airport:
+        stale = list(instance.image_variants.values())
+        validated_data["image_variants"] = {}
+        airport = super().update(instance, validated_data)
+        schedule_variants(airport, stale)
+        return airport
+
+
+class AirportAutocompleteSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=128)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
 
-class RouteSerializer(serializers.ModelSerializer):
+class AirportMatchSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    closest_big_city = serializers.CharField()
+
+
+class NearestAirportsQuerySerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    radius = serializers.FloatField(
+        min_value=0, required=False, help_text="Kilometers"
+    )
+
+
+class NearbyAirportSerializer(AirportMatchSerializer):
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    distance = serializers.FloatField(help_text="Kilometers")
+
+
+class RouteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = (
@@ -76,6 +163,11 @@ class RouteSerializer(serializers.ModelSerializer):
 
 
 class RouteListSerializer(RouteSerializer):
+    expandable_fields = {
+        "source": lambda: AirportListRetrieveSerializer(read_only=True),
+        "destination": lambda: AirportListRetrieveSerializer(read_only=True),
+    }
+
     source = serializers.CharField(
         source="source.closest_big_city",
         read_only=True
@@ -86,15 +178,97 @@ class RouteListSerializer(RouteSerializer):
     )
 
 
+class RouteListValuesSerializer(ValuesSerializer):
+    """RouteListSerializer output built from values() rows"""
+
+    columns = (
+        "id",
+        "source__closest_big_city",
+        "destination__closest_big_city",
+        "distance",
+        "type_of_measurement",
+    )
+
+    def get_accessors(self) -> dict:
+        return {
+            "id": column("id"),
+            "source": column("source__closest_big_city"),
+            "destination": column("destination__closest_big_city"),
+            "distance": column("distance"),
+            "type_of_measurement": column("type_of_measurement"),
+        }
+
+
+class RouteStatisticsQuerySerializer(serializers.Serializer):
+    bins = serializers.IntegerField(
+        min_value=1, max_value=100, default=DEFAULT_BINS
+    )
+    percentiles = serializers.CharField(
+        default=",".join(str(rank) for rank in DEFAULT_PERCENTILES)
+    )
+
+    def validate_percentiles(self, value: str) -> list[float]:
+        try:
+            ranks = [float(rank) for rank in value.split(",")]
+        except ValueError:
+            raise serializers.ValidationError(
+                "Must be comma separated numbers"
+            )
+        if not all(0 <= rank <= 100 for rank in ranks):
+            raise serializers.ValidationError("Must be in range: (0, 100)")
+        return ranks
+
+
+class DistanceStatisticsSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    min = serializers.FloatField(allow_null=True)
+    max = serializers.FloatField(allow_null=True)
+    mean = serializers.FloatField(allow_null=True)
+    percentiles = serializers.DictField(
+        child=serializers.FloatField(allow_null=True)
+    )
+    histogram = serializers.ListField(child=serializers.IntegerField())
+
+
+class SourceStatisticsSerializer(DistanceStatisticsSerializer):
+    source = serializers.IntegerField()
+
+
+class RouteStatisticsSerializer(DistanceStatisticsSerializer):
+    unit = serializers.CharField()
+    edges = serializers.ListField(child=serializers.FloatField())
+    sources = SourceStatisticsSerializer(many=True)
+
+
 class RouteRetrieveSerializer(RouteSerializer):
     source = AirportListRetrieveSerializer(many=False, read_only=True)
     destination = AirportListRetrieveSerializer(many=False, read_only=True)
 
 
+class MemoizedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field looking up each value once, so a list of nested
+    items pointing to the same object costs one query
+    """
+
+    def to_internal_value(self, data):
+        instances = self.__dict__.setdefault("_instances", {})
+        key = str(data)
+        if key not in instances:
+            instances[key] = super().to_internal_value(data)
+        return instances[key]
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = MemoizedPrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        # seat uniqueness is checked for all tickets of an order at once
+        validators = []
 
     def validate(self, attrs) -> Ticket:
         data = super().validate(attrs=attrs)
@@ -106,7 +280,7 @@ class TicketSerializer(serializers.ModelSerializer):
         return data
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = (
@@ -119,7 +293,15 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
-class FlightListSerializer(serializers.ModelSerializer):
+class FlightListSerializer(
+    DynamicFieldsMixin, serializers.ModelSerializer
+):
+    expandable_fields = {
+        "route": lambda: RouteListSerializer(read_only=True),
+        "airplane": lambda: AirplaneRetrieveSerializer(read_only=True),
+        "crew": lambda: CrewSerializer(many=True, read_only=True),
+    }
+
     crew = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="full_name"
     )
@@ -145,6 +327,47 @@ class FlightListSerializer(serializers.ModelSerializer):
         )
 
 
+class FlightListValuesSerializer(ValuesSerializer):
+    """FlightListSerializer output built from values() rows"""
+
+    columns = (
+        "id",
+        "route__source__name",
+        "route__destination__name",
+        "airplane__name",
+        "departure_time",
+        "arrival_time",
+        "tickets_available",
+    )
+
+    def add_related(self, rows: list[dict]) -> None:
+        crew = {row["id"]: [] for row in rows}
+        members = (
+            Flight.crew.through.objects.filter(flight_id__in=crew)
+            .order_by("crew_id")
+            .values_list("flight_id", "crew__first_name", "crew__last_name")
+        )
+        for flight_id, first_name, last_name in members:
+            crew[flight_id].append(f"{first_name} {last_name}")
+
+        for row in rows:
+            row["crew"] = crew[row["id"]]
+
+    def get_accessors(self) -> dict:
+        return {
+            "id": column("id"),
+            "route": lambda row: (
+                f"{row['route__source__name']}"
+                f"-{row['route__destination__name']}"
+            ),
+            "airplane": column("airplane__name"),
+            "departure_time": datetime_column("departure_time"),
+            "arrival_time": datetime_column("arrival_time"),
+            "crew": column("crew"),
+            "tickets_available": column("tickets_available"),
+        }
+
+
 class TicketListSerializer(TicketSerializer):
     flight = FlightListSerializer(many=False, read_only=True)
 
@@ -156,6 +379,10 @@ class TicketSeatsSerializer(TicketSerializer):
 
 
 class FlightRetrieveSerializer(FlightSerializer):
+    expandable_fields = {
+        "crew": lambda: CrewSerializer(many=True, read_only=True),
+    }
+
     crew = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="full_name"
     )
@@ -163,9 +390,7 @@ class FlightRetrieveSerializer(FlightSerializer):
         source="route.source_destination", read_only=True
     )
     airplane = AirplaneRetrieveSerializer(many=False, read_only=True)
-    taken_places = TicketSeatsSerializer(
-        source="tickets", many=True, read_only=True
-    )
+    taken_places = serializers.SerializerMethodField()
 
     class Meta:
         model = Flight
@@ -179,6 +404,119 @@ class FlightRetrieveSerializer(FlightSerializer):
             "taken_places"
         )
 
+    @extend_schema_field(TicketSeatsSerializer(many=True))
+    def get_taken_places(self, flight: Flight) -> list[dict]:
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in flight.get_seat_map().taken_seats()
+        ]
+
+
+class FlightSeatMapSerializer(serializers.Serializer):
+    ENCODINGS = ("bitmap", "runs")
+
+    flight = serializers.IntegerField(source="id")
+    rows = serializers.IntegerField(source="airplane.rows")
+    seats_in_row = serializers.IntegerField(source="airplane.seats_in_row")
+    encoding = serializers.SerializerMethodField()
+    seats = serializers.SerializerMethodField()
+
+    def get_encoding(self, flight: Flight) -> str:
+        return self.context.get("encoding", "bitmap")
+
+    @extend_schema_field(serializers.JSONField())
+    def get_seats(self, flight: Flight) -> str | list:
+        seat_map = flight.get_seat_map()
+
+        if self.get_encoding(flight) == "runs":
+            return seat_map.row_runs()
+
+        return base64.b64encode(seat_map.to_bytes()).decode()
+
+
+class ConnectionSearchSerializer(serializers.Serializer):
+    source = serializers.PrimaryKeyRelatedField(queryset=Airport.objects.all())
+    destination = serializers.PrimaryKeyRelatedField(
+        queryset=Airport.objects.all()
+    )
+    departure = serializers.DateTimeField(required=False)
+    max_connections = serializers.IntegerField(
+        min_value=0, max_value=3, default=1
+    )
+    min_connection = serializers.IntegerField(
+        min_value=0, max_value=24 * 60, default=45
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs["source"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                "Source and destination must be different airports"
+            )
+        return attrs
+
+
+class ConnectionLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    connections = serializers.IntegerField()
+    legs = ConnectionLegSerializer(many=True)
+
+    def to_representation(self, legs: list) -> dict:
+        return super().to_representation(
+            {
+                "departure_time": legs[0].departure_time,
+                "arrival_time": legs[-1].arrival_time,
+                "connections": len(legs) - 1,
+                "legs": legs,
+            }
+        )
+
+
+class FlightScheduleSerializer(serializers.Serializer):
+    MAX_VALIDITY_DAYS = 366
+
+    route = serializers.PrimaryKeyRelatedField(queryset=Route.objects.all())
+    airplane = serializers.PrimaryKeyRelatedField(
+        queryset=Airplane.objects.all()
+    )
+    crew = serializers.PrimaryKeyRelatedField(
+        queryset=Crew.objects.all(), many=True
+    )
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=7),
+        allow_empty=False,
+        help_text="ISO weekdays of the flights, 1 is Monday",
+    )
+    departure_time = serializers.TimeField()
+    arrival_time = serializers.TimeField()
+    valid_from = serializers.DateField()
+    valid_to = serializers.DateField()
+
+    def validate(self, attrs: dict) -> dict:
+        days = (attrs["valid_to"] - attrs["valid_from"]).days
+        if not (0 <= days < self.MAX_VALIDITY_DAYS):
+            raise serializers.ValidationError(
+                f"valid_to must be within {self.MAX_VALIDITY_DAYS} days "
+                f"after valid_from"
+            )
+        return attrs
+
+
+class ScheduleImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    skipped = serializers.IntegerField()
+    crew_links = serializers.IntegerField()
+    seconds = serializers.FloatField()
+    flights_per_second = serializers.FloatField()
+
 
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
@@ -187,14 +525,156 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "tickets", "created_at")
 
+    def validate_tickets(self, tickets: list[dict]) -> list[dict]:
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in tickets
+        ]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError(
+                "The fields flight, row, seat must make a unique set."
+            )
+        return tickets
+
     @transaction.atomic
     def create(self, validated_data: dict):
         tickets_data = validated_data.pop("tickets")
         order = Order.objects.create(**validated_data)
-        for ticket_data in tickets_data:
-            Ticket.objects.create(order=order, **ticket_data)
+
+        try:
+            book_seats(
+                order,
+                [
+                    Ticket(order=order, **ticket_data)
+                    for ticket_data in tickets_data
+                ],
+            )
+        except SeatsUnavailable as error:
+            raise serializers.ValidationError({"tickets": error.messages})
+
         return order
 
 
 class OrderRetrieveSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class TicketPlaceSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+    flight = serializers.IntegerField()
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    tickets = TicketPlaceSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = OrderRequest
+        fields = (
+            "id",
+            "status",
+            "tickets",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+class SeatAssignmentSerializer(serializers.Serializer):
+    party_size = serializers.IntegerField(min_value=1, write_only=True)
+    flight = serializers.IntegerField(read_only=True)
+    adjacent = serializers.BooleanField(read_only=True)
+    tickets = TicketPlaceSerializer(many=True, read_only=True)
+
+    def to_representation(self, assignment: tuple) -> dict:
+        flight, seats = assignment
+        rows = {row for row, _ in seats}
+        return super().to_representation(
+            {
+                "flight": flight.id,
+                "adjacent": len(rows) == 1
+                and seats[-1][1] - seats[0][1] == len(seats) - 1,
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id}
+                    for row, seat in seats
+                ],
+            }
+        )
+
+
+class TicketCancellationSerializer(serializers.Serializer):
+    flights = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    orders = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    row_from = serializers.IntegerField(min_value=1, required=False)
+    row_to = serializers.IntegerField(min_value=1, required=False)
+    seat_from = serializers.IntegerField(min_value=1, required=False)
+    seat_to = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs.get("flights") and not attrs.get("orders"):
+            raise serializers.ValidationError(
+                "Select tickets by flights, orders or both"
+            )
+        return attrs
+
+    def get_tickets(self) -> QuerySet:
+        return select_tickets(**self.validated_data)
+
+
+class FlightCancellationSerializer(serializers.Serializer):
+    flights = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+
+
+class CancellationResultSerializer(serializers.Serializer):
+    flights = serializers.IntegerField()
+    orders = serializers.IntegerField()
+    tickets = serializers.IntegerField()
+
+
+class HeldSeatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HeldSeat
+        fields = ("row", "seat")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "flight", "seats", "created_at", "expires_at")
+        read_only_fields = ("created_at", "expires_at")
+
+    def validate(self, attrs: dict) -> dict:
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seats"]]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError(
+                {"seats": "The fields row, seat must make a unique set."}
+            )
+        for row, seat in seats:
+            Ticket.validate_ticket(row, seat, attrs["flight"])
+        return attrs
+
+    def create(self, validated_data: dict) -> SeatHold:
+        seats = [
+            (seat["row"], seat["seat"]) for seat in validated_data["seats"]
+        ]
+        try:
+            return hold_seats(
+                validated_data["user"], validated_data["flight"], seats
+            )
+        except SeatsUnavailable as error:
+            raise serializers.ValidationError({"seats": error.messages})
+        except HoldLimitExceeded as error:
+            raise serializers.ValidationError({"seats": str(error)})
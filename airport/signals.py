@@ -0,0 +1,120 @@
+from django.apps import apps
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from airport import stamps
+from airport.autocomplete import airport_index
+from airport.geo import airport_tree
+from airport.models import (
+    Airplane,
+    Airport,
+    ChangeStamp,
+    Flight,
+    HeldSeat,
+    IdempotencyKey,
+    OrderRequest,
+    SeatHold,
+    Ticket,
+)
+
+# Bookkeeping models no cached response depends on
+UNSTAMPED_MODELS = (
+    ChangeStamp, SeatHold, HeldSeat, IdempotencyKey, OrderRequest
+)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance: Ticket, **kwargs) -> None:
+    instance._previous_seat = None
+    if instance.pk:
+        instance._previous_seat = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("flight_id", "row", "seat")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(
+    sender, instance: Ticket, created: bool, **kwargs
+) -> None:
+    previous = getattr(instance, "_previous_seat", None)
+    current = (instance.flight_id, instance.row, instance.seat)
+
+    if previous == current:
+        return
+
+    if previous and previous[0] != instance.flight_id:
+        Flight.update_seat_map(previous[0], released=[previous[1:]])
+        previous = None
+
+    Flight.update_seat_map(
+        instance.flight_id,
+        taken=[current[1:]],
+        released=[previous[1:]] if previous else (),
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance: Ticket, **kwargs) -> None:
+    Flight.update_seat_map(
+        instance.flight_id, released=[(instance.row, instance.seat)]
+    )
+
+
+@receiver(pre_save, sender=Flight)
+def remember_flight_airplane(sender, instance: Flight, **kwargs) -> None:
+    instance._previous_airplane_id = None
+    if instance.pk:
+        instance._previous_airplane_id = (
+            Flight.objects.filter(pk=instance.pk)
+            .values_list("airplane_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Flight)
+def rebuild_flight_seat_map(
+    sender, instance: Flight, created: bool, **kwargs
+) -> None:
+    previous = getattr(instance, "_previous_airplane_id", None)
+    if not created and previous != instance.airplane_id:
+        Flight.rebuild_seat_maps([instance.pk])
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_airplane_seat_maps(
+    sender, instance: Airplane, created: bool, **kwargs
+) -> None:
+    if not created:
+        Flight.rebuild_seat_maps(
+            instance.flights.values_list("id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def reset_airport_indexes(sender, **kwargs) -> None:
+    airport_index.reset()
+    airport_tree.reset()
+
+
+def bump_model_stamp(sender, **kwargs) -> None:
+    stamps.bump(sender)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def bump_flight_crew_stamp(sender, action: str, **kwargs) -> None:
+    if action.startswith("post_"):
+        stamps.bump(Flight)
+
+
+for model in apps.get_app_config("airport").get_models():
+    if model not in UNSTAMPED_MODELS:
+        post_save.connect(bump_model_stamp, sender=model)
+        post_delete.connect(bump_model_stamp, sender=model)
@@ -0,0 +1,6 @@
+from django.db import connection, models
+
+
+def table(model: type[models.Model]) -> str:
+    """Quoted table name of a model for raw SQL"""
+    return connection.ops.quote_name(model._meta.db_table)
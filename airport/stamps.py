@@ -0,0 +1,55 @@
+from django.db import connection, models, transaction
+
+from airport.models import ChangeStamp
+from airport.sql import table
+
+
+def label_of(model: type[models.Model] | str) -> str:
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def bump(*models: type[models.Model] | str) -> None:
+    """
+    Advance the generation of the given models once the current
+    transaction commits, so readers never see a new generation
+    before the data it describes
+    """
+    labels = sorted({label_of(model) for model in models})
+    transaction.on_commit(lambda: _bump_now(labels))
+
+
+def _bump_now(labels: list[str]) -> None:
+    changes = table(ChangeStamp)
+    values = ", ".join(["(%s, 1, NOW())"] * len(labels))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {changes} (label, generation, changed_at) "
+            f"VALUES {values} ON CONFLICT (label) DO UPDATE "
+            f"SET generation = {changes}.generation + 1, changed_at = NOW()",
+            labels,
+        )
+
+
+def get_stamps(*models: type[models.Model] | str) -> dict[str, tuple]:
+    """Return {label: (generation, changed_at)} of the given models"""
+    labels = [label_of(model) for model in models]
+    stamps = dict.fromkeys(labels, (0, None))
+    stamps.update(
+        (label, (generation, changed_at))
+        for label, generation, changed_at in ChangeStamp.objects.filter(
+            label__in=labels
+        ).values_list("label", "generation", "changed_at")
+    )
+    return stamps
+
+
+def generation_key(*models: type[models.Model] | str) -> str:
+    """Key that changes whenever any of the given models changes"""
+    stamps = get_stamps(*models)
+    return ".".join(
+        f"{generation}-{changed_at.timestamp() if changed_at else 0}"
+        for generation, changed_at in (
+            stamps[label_of(model)] for model in models
+        )
+    )
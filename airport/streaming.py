@@ -0,0 +1,60 @@
+import json
+from typing import Iterator
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_VALUES = ("1", "true")
+
+
+def stream_json_array(
+    queryset: QuerySet, serializer, chunk_size: int
+) -> Iterator[str]:
+    """
+    Serialize rows one by one into a JSON array, reading them from a
+    server-side cursor chunk by chunk
+    """
+    encoder = JSONEncoder(
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        separators=(",", ":") if api_settings.COMPACT_JSON else None,
+    )
+    separator_needed, rows = False, []
+
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        rows.append(encoder.encode(serializer.to_representation(instance)))
+
+        if len(rows) == chunk_size:
+            yield ("," if separator_needed else "[") + ",".join(rows)
+            separator_needed, rows = True, []
+
+    if rows:
+        yield ("," if separator_needed else "[") + ",".join(rows)
+        separator_needed = True
+
+    yield "]" if separator_needed else "[]"
+
+
+class StreamingListMixin:
+    """
+    List action streaming an unpaginated JSON array on ?stream=true,
+    so time to first byte and memory do not grow with the result
+    """
+
+    stream_query_param = "stream"
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) not in (
+            STREAM_VALUES
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            stream_json_array(
+                queryset, self.get_serializer(), self.stream_chunk_size
+            ),
+            content_type="application/json",
+        )
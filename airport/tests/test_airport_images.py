@@ -0,0 +1,153 @@
+import tempfile
+import threading
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.images import IMAGE_VARIANTS, VariantPool, image_storage
+from airport.models import Airport
+
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+def image_upload_url(airport_id: int) -> str:
+    return reverse("airport:airport-upload-image", args=[airport_id])
+
+
+def jpeg_file(size: tuple[int, int] = (2000, 1200)) -> BytesIO:
+    image = BytesIO()
+    Image.new("RGB", size, (30, 120, 200)).save(image, format="JPEG")
+    image.name = "airport.jpg"
+    image.seek(0)
+    return image
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_VARIANT_WORKERS=0)
+class AirportImageVariantTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "12345", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.airport = Airport.objects.create(
+            name="Heathrow", closest_big_city="London"
+        )
+
+    def upload(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                image_upload_url(self.airport.id),
+                {"image": jpeg_file()},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.airport.refresh_from_db()
+
+    def test_upload_builds_variants(self) -> None:
+        self.upload()
+
+        self.assertEqual(set(self.airport.image_variants), set(IMAGE_VARIANTS))
+        storage = image_storage()
+        for size, (box, image_format, _) in IMAGE_VARIANTS.items():
+            with storage.open(self.airport.image_variants[size]) as file:
+                variant = Image.open(file)
+                self.assertEqual(variant.format, image_format)
+                self.assertLessEqual(variant.width, box[0])
+                self.assertLessEqual(variant.height, box[1])
+
+        self.assertLess(
+            storage.size(self.airport.image_variants["thumbnail"]),
+            storage.size(self.airport.image.name) / 10,
+        )
+
+    def test_new_upload_replaces_variants(self) -> None:
+        self.upload()
+        stale = list(self.airport.image_variants.values())
+
+        self.upload()
+
+        self.assertFalse(any(image_storage().exists(name) for name in stale))
+        self.assertTrue(
+            all(
+                image_storage().exists(name)
+                for name in self.airport.image_variants.values()
+            )
+        )
+
+    def test_list_links_thumbnails_and_retrieve_originals(self) -> None:
+        self.upload()
+
+        listed = self.client.get(AIRPORT_URL).data[0]["image"]
+        retrieved = self.client.get(
+            reverse("airport:airport-detail", args=[self.airport.id])
+        ).data["image"]
+        webp = self.client.get(AIRPORT_URL, {"image_size": "webp"}).data[0][
+            "image"
+        ]
+
+        self.assertTrue(listed.endswith("-thumbnail.jpg"))
+        self.assertTrue(retrieved.endswith(self.airport.image.name))
+        self.assertTrue(webp.endswith("-webp.webp"))
+
+    def test_original_until_variants_exist(self) -> None:
+        self.client.post(
+            image_upload_url(self.airport.id),
+            {"image": jpeg_file()},
+            format="multipart",
+        )
+        self.airport.refresh_from_db()
+
+        listed = self.client.get(AIRPORT_URL).data[0]["image"]
+
+        self.assertEqual(self.airport.image_variants, {})
+        self.assertTrue(listed.endswith(self.airport.image.name))
+
+    def test_invalid_image_size(self) -> None:
+        response = self.client.get(AIRPORT_URL, {"image_size": "huge"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_build_command(self) -> None:
+        self.client.post(
+            image_upload_url(self.airport.id),
+            {"image": jpeg_file()},
+            format="multipart",
+        )
+
+        call_command("build_image_variants", stdout=StringIO())
+
+        self.airport.refresh_from_db()
+        self.assertEqual(set(self.airport.image_variants), set(IMAGE_VARIANTS))
+
+
+class VariantPoolTests(SimpleTestCase):
+    @override_settings(IMAGE_VARIANT_WORKERS=1)
+    def test_tasks_run_off_the_request_thread(self) -> None:
+        done = threading.Event()
+        threads = []
+
+        def task() -> None:
+            threads.append(threading.current_thread())
+            done.set()
+
+        VariantPool().submit(task)
+
+        self.assertTrue(done.wait(5))
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    @override_settings(IMAGE_VARIANT_WORKERS=0)
+    def test_failing_inline_task_is_logged(self) -> None:
+        def task() -> None:
+            raise OSError("Disk full")
+
+        with self.assertLogs("airport.images", "ERROR") as logs:
+            VariantPool().submit(task)
+
+        self.assertIn("Disk full", logs.output[0])
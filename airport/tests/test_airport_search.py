@@ -0,0 +1,160 @@
+import random
+import string
+import time
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.autocomplete import AirportIndex
+from airport.models import Airport, Route
+
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+ROUTE_URL = reverse("airport:route-list")
+
+
+def has_trigram_indexes() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+class AirportIndexTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.index = AirportIndex(
+            [
+                (1, "London Heathrow", "London"),
+                (2, "Gatwick", "London"),
+                (3, "Londrina Airport", "Londrina"),
+                (4, "Zürich Airport", "Zürich"),
+                (5, "East London", "East London"),
+            ]
+        )
+
+    def names(self, query: str, limit: int = 10) -> list[str]:
+        return [
+            airport["name"] for airport in self.index.search(query, limit)
+        ]
+
+    def test_ranks_name_prefix_then_words_then_city(self) -> None:
+        self.assertEqual(
+            self.names("lon"),
+            ["London Heathrow", "Londrina Airport", "East London", "Gatwick"],
+        )
+
+    def test_matches_phrases_and_ignores_case_and_accents(self) -> None:
+        self.assertEqual(self.names("LONDON hea"), ["London Heathrow"])
+        self.assertEqual(self.names("zur"), ["Zürich Airport"])
+        self.assertEqual(
+            self.names("airport"), ["Londrina Airport", "Zürich Airport"]
+        )
+
+    def test_limit_and_no_match(self) -> None:
+        self.assertEqual(len(self.names("lon", limit=2)), 2)
+        self.assertEqual(self.names("paris"), [])
+        self.assertEqual(self.names("  "), [])
+
+    def test_search_is_fast_on_many_airports(self) -> None:
+        rnd = random.Random(1)
+
+        def word() -> str:
+            return "".join(
+                rnd.choice(string.ascii_lowercase)
+                for _ in range(rnd.randint(4, 9))
+            ).title()
+
+        index = AirportIndex(
+            (pk, f"{word()} {word()}", word()) for pk in range(10000)
+        )
+        queries = [word()[:3] for _ in range(200)]
+
+        started = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        seconds = (time.perf_counter() - started) / len(queries)
+
+        self.assertLess(seconds, 0.001)
+
+
+class AirportSearchApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.heathrow = Airport.objects.create(
+            name="Heathrow", closest_big_city="London"
+        )
+        self.orly = Airport.objects.create(
+            name="Orly", closest_big_city="Paris"
+        )
+
+    def test_autocomplete(self) -> None:
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "lon"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "id": self.heathrow.id,
+                    "name": "Heathrow",
+                    "closest_big_city": "London",
+                }
+            ],
+        )
+
+    def test_autocomplete_follows_airport_changes(self) -> None:
+        self.client.get(AUTOCOMPLETE_URL, {"q": "lon"})
+        gatwick = Airport.objects.create(
+            name="Gatwick", closest_big_city="London"
+        )
+        self.heathrow.delete()
+
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "lon"})
+
+        self.assertEqual(
+            [match["id"] for match in response.data], [gatwick.id]
+        )
+
+    def test_autocomplete_requires_query(self) -> None:
+        response = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_routes_by_city(self) -> None:
+        route = Route.objects.create(
+            source=self.orly, destination=self.heathrow, distance=350
+        )
+        Route.objects.create(
+            source=self.heathrow, destination=self.orly, distance=350
+        )
+
+        response = self.client.get(
+            ROUTE_URL, {"source": "paris", "destination": "heath"}
+        )
+
+        self.assertEqual(
+            [result["id"] for result in response.data],
+            [route.id],
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "Trigram indexes need Postgres"
+    )
+    def test_route_filter_uses_trigram_indexes(self) -> None:
+        if not has_trigram_indexes():
+            self.skipTest("pg_trgm extension is not available")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = Airport.objects.filter(name__icontains="heath").explain()
+
+        self.assertIn("airport_name_trgm_idx", plan)
@@ -0,0 +1,233 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.booking import book_seats, hold_seats
+from airport.models import (
+    Airplane,
+    Flight,
+    HeldSeat,
+    Order,
+    OrderRequest,
+    SeatHold,
+    Ticket,
+)
+from airport.tests.test_flight_api import create_flight, flight_detail_url
+
+FLIGHT_CANCEL_URL = reverse("airport:flight-cancel")
+TICKET_CANCEL_URL = reverse("airport:order-cancel-tickets")
+
+
+def deletes(context: CaptureQueriesContext) -> list[str]:
+    return [
+        query["sql"]
+        for query in context.captured_queries
+        if "DELETE" in query["sql"]
+    ]
+
+
+class CancellationApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "12345", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.client.force_authenticate(self.admin)
+        self.flight = create_flight()
+        self.other_flight = Flight.objects.create(
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time="2023-11-02T08:00:00Z",
+            arrival_time="2023-11-02T10:00:00Z",
+        )
+
+    def order(self, *seats: tuple) -> Order:
+        order = Order.objects.create(user=self.user)
+        book_seats(
+            order,
+            [
+                Ticket(order=order, flight=flight, row=row, seat=seat)
+                for flight, row, seat in seats
+            ],
+        )
+        return order
+
+    def test_cancel_requires_admin(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(
+            TICKET_CANCEL_URL, {"flights": [self.flight.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cancel_tickets_requires_flights_or_orders(self) -> None:
+        response = self.client.post(
+            TICKET_CANCEL_URL, {"row_from": 1}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancel_tickets_of_rows(self) -> None:
+        emptied = self.order((self.flight, 1, 1), (self.flight, 2, 1))
+        kept = self.order((self.flight, 3, 1), (self.other_flight, 1, 1))
+        request = OrderRequest.objects.create(
+            user=self.user,
+            flight=self.other_flight,
+            tickets=[],
+            status=OrderRequest.Status.CONFIRMED,
+            order=emptied,
+        )
+
+        response = self.client.post(
+            TICKET_CANCEL_URL,
+            {"flights": [self.flight.id], "row_from": 1, "row_to": 3},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, {"flights": 0, "orders": 1, "tickets": 3}
+        )
+        self.assertFalse(Order.objects.filter(pk=emptied.pk).exists())
+        self.assertEqual(kept.tickets.get().flight, self.other_flight)
+        request.refresh_from_db()
+        self.assertIsNone(request.order)
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+        self.assertEqual(list(self.flight.get_seat_map().taken_seats()), [])
+        self.other_flight.refresh_from_db()
+        self.assertEqual(self.other_flight.tickets_sold, 1)
+
+    def test_cancel_tickets_of_seats_of_order(self) -> None:
+        order = self.order(*((self.flight, 1, seat) for seat in range(1, 5)))
+
+        response = self.client.post(
+            TICKET_CANCEL_URL,
+            {"orders": [order.id], "seat_from": 2, "seat_to": 3},
+            format="json",
+        )
+
+        self.assertEqual(response.data["tickets"], 2)
+        self.assertEqual(
+            sorted(order.tickets.values_list("seat", flat=True)), [1, 4]
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            list(self.flight.get_seat_map().taken_seats()), [(1, 1), (1, 4)]
+        )
+
+    def test_destroy_order(self) -> None:
+        self.client.force_authenticate(self.admin)
+        order = self.order((self.flight, 1, 1))
+        Order.objects.filter(pk=order.pk).update(user=self.admin)
+
+        response = self.client.delete(
+            reverse("airport:order-detail", args=[order.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Order.objects.exists())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_cancel_flights(self) -> None:
+        only_flight = self.order((self.flight, 1, 1))
+        shared = self.order((self.flight, 1, 2), (self.other_flight, 1, 2))
+        hold_seats(self.user, self.flight, [(5, 5)])
+        OrderRequest.objects.create(
+            user=self.user, flight=self.flight, tickets=[]
+        )
+
+        response = self.client.post(
+            FLIGHT_CANCEL_URL, {"flights": [self.flight.id]}, format="json"
+        )
+
+        self.assertEqual(
+            response.data, {"flights": 1, "orders": 1, "tickets": 2}
+        )
+        self.assertFalse(Flight.objects.filter(pk=self.flight.pk).exists())
+        self.assertFalse(Order.objects.filter(pk=only_flight.pk).exists())
+        self.assertEqual(shared.tickets.get().flight, self.other_flight)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertFalse(HeldSeat.objects.exists())
+        self.assertFalse(OrderRequest.objects.exists())
+        self.assertFalse(
+            Flight.crew.through.objects.filter(
+                flight_id=self.flight.id
+            ).exists()
+        )
+
+    def test_destroy_sold_out_flight_in_one_statement(self) -> None:
+        airplane = Airplane.objects.create(
+            name="Airplane V",
+            rows=60,
+            seats_in_row=10,
+            airplane_type=self.flight.airplane.airplane_type,
+        )
+        Flight.objects.filter(pk=self.flight.pk).update(airplane=airplane)
+        self.flight.refresh_from_db()
+        for row in range(1, 61):
+            self.order(*((self.flight, row, seat) for seat in range(1, 11)))
+        self.assertEqual(Ticket.objects.count(), 600)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(flight_detail_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(deletes(context)), 1)
+        self.assertLessEqual(len(context.captured_queries), 6)
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(Order.objects.exists())
+
+    def test_cancel_command(self) -> None:
+        self.order(*((self.flight, row, 1) for row in range(1, 5)))
+        out = StringIO()
+
+        call_command(
+            "cancel_tickets",
+            "--flight",
+            str(self.flight.id),
+            "--rows",
+            "2-3",
+            stdout=out,
+        )
+
+        self.assertIn("2 tickets", out.getvalue())
+        self.assertEqual(
+            sorted(Ticket.objects.values_list("row", flat=True)), [1, 4]
+        )
+
+        call_command(
+            "cancel_tickets",
+            "--flight",
+            str(self.flight.id),
+            "--whole-flights",
+            stdout=out,
+        )
+
+        self.assertFalse(Flight.objects.filter(pk=self.flight.pk).exists())
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_cancel_keeps_live_holds_of_other_flights(self) -> None:
+        hold_seats(self.user, self.other_flight, [(1, 1)])
+        SeatHold.objects.update(expires_at=timezone.now() + timedelta(1))
+
+        self.client.post(
+            FLIGHT_CANCEL_URL, {"flights": [self.flight.id]}, format="json"
+        )
+
+        self.assertEqual(HeldSeat.objects.count(), 1)
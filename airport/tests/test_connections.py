@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import connections
+from airport.models import Airplane, Airport, Flight, Route
+
+CONNECTIONS_URL = reverse("airport:flight-connections")
+
+
+class ConnectionSearchApiTests(TestCase):
+    def setUp(self) -> None:
+        # Stamps of tests sharing a transaction can repeat, drop the
+        # index and results of the previous test
+        connections._index = (None, None)
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "12345",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.airports = [
+            Airport.objects.create(name=name, closest_big_city=name)
+            for name in ("Kyiv", "Warsaw", "Berlin", "London")
+        ]
+        self.airplane = Airplane.objects.create(
+            name="Airplane", rows=10, seats_in_row=6
+        )
+
+    def add_flight(
+        self,
+        source: int,
+        destination: int,
+        departure: str,
+        arrival: str,
+        day: int = 1,
+    ) -> Flight:
+        route, _ = Route.objects.get_or_create(
+            source=self.airports[source],
+            destination=self.airports[destination],
+            defaults={"distance": 100},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return Flight.objects.create(
+                route=route,
+                airplane=self.airplane,
+                departure_time=f"2023-11-{day:02}T{departure}:00Z",
+                arrival_time=f"2023-11-{day:02}T{arrival}:00Z",
+            )
+
+    def search(self, **params) -> list:
+        response = self.client.get(
+            CONNECTIONS_URL,
+            {
+                "source": self.airports[0].id,
+                "destination": self.airports[3].id,
+                "departure": "2023-11-01T00:00:00Z",
+                **params,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_search_earliest_arrival_per_connection_count(self) -> None:
+        direct = self.add_flight(0, 3, "08:00", "14:00")
+        first = self.add_flight(0, 1, "06:00", "07:30")
+        too_tight = self.add_flight(1, 3, "07:45", "09:45")
+        second = self.add_flight(1, 3, "08:30", "10:30")
+
+        itineraries = self.search(max_connections=1)
+
+        self.assertEqual(
+            [[leg["flight"] for leg in it["legs"]] for it in itineraries],
+            [[direct.id], [first.id, second.id]],
+        )
+        self.assertEqual(itineraries[1]["connections"], 1)
+        self.assertNotIn(
+            too_tight.id,
+            [leg["flight"] for it in itineraries for leg in it["legs"]],
+        )
+
+    def test_search_respects_max_connections(self) -> None:
+        self.add_flight(0, 1, "06:00", "07:00")
+        self.add_flight(1, 2, "08:00", "09:00")
+        last = self.add_flight(2, 3, "10:00", "11:00")
+
+        self.assertEqual(self.search(max_connections=1), [])
+        self.assertEqual(
+            self.search(max_connections=2)[0]["legs"][-1]["flight"], last.id
+        )
+
+    def test_search_keeps_connections_after_a_long_layover(self) -> None:
+        first = self.add_flight(0, 1, "06:00", "08:00")
+        self.add_flight(0, 1, "18:00", "20:00")
+        last = self.add_flight(1, 3, "19:00", "21:00", day=2)
+
+        itineraries = self.search(max_connections=1)
+
+        self.assertEqual(
+            [[leg["flight"] for leg in it["legs"]] for it in itineraries],
+            [[first.id, last.id]],
+        )
+
+    def test_search_sees_new_flights(self) -> None:
+        self.assertEqual(self.search(), [])
+
+        flight = self.add_flight(0, 3, "08:00", "14:00")
+
+        self.assertEqual(self.search()[0]["legs"][0]["flight"], flight.id)
+
+    def test_search_same_airports_invalid(self) -> None:
+        response = self.client.get(
+            CONNECTIONS_URL,
+            {
+                "source": self.airports[0].id,
+                "destination": self.airports[0].id,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,169 @@
+import csv
+import tracemalloc
+import zipfile
+from io import BytesIO, StringIO
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.exports import export_response
+from airport.models import Airplane, Flight, Order, Ticket
+from airport.tests.test_flight_api import create_flight
+
+EXPORT_URL = reverse("airport:order-export")
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def manifest_url(flight_id: int) -> str:
+    return reverse("airport:flight-manifest", args=[flight_id])
+
+
+def read_csv(response) -> list[list[str]]:
+    content = b"".join(response.streaming_content).decode()
+    return list(csv.reader(StringIO(content)))
+
+
+def read_xlsx(response) -> list[list[str]]:
+    content = b"".join(response.streaming_content)
+    with zipfile.ZipFile(BytesIO(content)) as workbook:
+        sheet = ElementTree.fromstring(
+            workbook.read("xl/worksheets/sheet1.xml")
+        )
+    return [
+        [
+            "".join(cell.itertext())
+            for cell in row.iter(f"{SHEET_NS}c")
+        ]
+        for row in sheet.iter(f"{SHEET_NS}row")
+    ]
+
+
+class ExportTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345", first_name="Ann", last_name="Lee"
+        )
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "12345", is_staff=True
+        )
+        self.flight = create_flight()
+        self.order = Order.objects.create(user=self.user)
+        for seat in (2, 1):
+            Ticket.objects.create(
+                order=self.order, flight=self.flight, row=3, seat=seat
+            )
+        other = Order.objects.create(user=self.admin)
+        Ticket.objects.create(order=other, flight=self.flight, row=1, seat=1)
+
+    def test_export_orders_as_csv(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(EXPORT_URL)
+        rows = read_csv(response)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="orders.csv"', response["Content-Disposition"])
+        self.assertEqual(rows[0][:3], ["order", "ordered_at", "ticket"])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            [row[4:6] + row[8:] for row in rows[1:]],
+            [
+                ["Airport A", "Airport B", "3", "1"],
+                ["Airport A", "Airport B", "3", "2"],
+            ],
+        )
+
+    def test_export_orders_as_xlsx(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        rows = read_xlsx(
+            self.client.get(EXPORT_URL, {"file_format": "xlsx"})
+        )
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][-2:], ["row", "seat"])
+        self.assertEqual(rows[1][0], str(self.order.id))
+        self.assertEqual(rows[2][-2:], ["3", "2"])
+
+    def test_export_with_unknown_format(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(EXPORT_URL, {"file_format": "pdf"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_manifest_is_for_admins(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(manifest_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_manifest_lists_passengers_by_seat(self) -> None:
+        self.client.force_authenticate(self.admin)
+
+        rows = read_csv(self.client.get(manifest_url(self.flight.id)))
+
+        self.assertEqual(
+            [row[:2] + row[5:] for row in rows[1:]],
+            [
+                ["1", "1", "admin@test.com", "", ""],
+                ["3", "1", "test@test.com", "Ann", "Lee"],
+                ["3", "2", "test@test.com", "Ann", "Lee"],
+            ],
+        )
+
+
+class ExportMemoryTests(TestCase):
+    chunk_size = 200
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        flight = create_flight()
+        Airplane.objects.filter(pk=flight.airplane_id).update(
+            rows=100, seats_in_row=50
+        )
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user("a@test.com", "1")
+        )
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight=flight, row=row, seat=seat)
+            for row in range(1, 101)
+            for seat in range(1, 51)
+        )
+        cls.flight = flight
+
+    def peak_memory(self, rows: int, file_format: str) -> int:
+        tickets = Ticket.objects.filter(flight=self.flight).values_list(
+            "id", "row", "seat", "order__created_at"
+        )[:rows]
+        tracemalloc.start()
+        response = export_response(
+            tickets,
+            ["ticket", "row", "seat", "ordered_at"],
+            "manifest",
+            file_format,
+            chunk_size=self.chunk_size,
+        )
+        parts = 0
+        for _ in response.streaming_content:
+            parts += 1
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertGreater(parts, rows // self.chunk_size)
+        return peak
+
+    def test_memory_does_not_grow_with_tickets(self) -> None:
+        self.assertEqual(Flight.objects.get().tickets.count(), 5000)
+
+        for file_format in ("csv", "xlsx"):
+            small = self.peak_memory(500, file_format)
+            large = self.peak_memory(5000, file_format)
+
+            self.assertLess(large, small * 2, file_format)
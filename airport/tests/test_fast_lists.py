@@ -0,0 +1,161 @@
+import json
+import os
+import time
+
+from django.core.cache import cache
+from django.db.models import F, Prefetch
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight, Route
+from airport.serializers import (
+    FlightListSerializer,
+    FlightListValuesSerializer,
+    RouteListSerializer,
+    RouteListValuesSerializer,
+)
+from airport.tests.test_query_budget import REPORT_ENV, seed_dataset
+
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+
+
+class FastListParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.data = seed_dataset(flights=60)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data["user"])
+
+    def get_both(self, url: str, params: dict | None = None) -> tuple:
+        with override_settings(FAST_LIST_SERIALIZERS=False):
+            regular = self.client.get(url, params)
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            fast = self.client.get(url, params)
+        cache.clear()
+        return regular, fast
+
+    def test_flight_list_is_identical(self) -> None:
+        regular, fast = self.get_both(FLIGHT_URL, {"page_size": 100})
+
+        self.assertEqual(regular.status_code, 200)
+        self.assertEqual(len(fast.data["results"]), 60)
+        self.assertEqual(regular.content, fast.content)
+
+    def test_flight_list_next_page_is_identical(self) -> None:
+        first = self.client.get(FLIGHT_URL, {"page_size": 25})
+        regular, fast = self.get_both(first.data["next"])
+
+        self.assertEqual(regular.content, fast.content)
+
+    def test_filtered_flight_list_is_identical(self) -> None:
+        regular, fast = self.get_both(
+            FLIGHT_URL, {"departure_date": "2023-11-10"}
+        )
+
+        self.assertEqual(regular.content, fast.content)
+
+    def test_route_list_is_identical(self) -> None:
+        regular, fast = self.get_both(ROUTE_URL)
+
+        self.assertEqual(len(fast.data), Route.objects.count())
+        self.assertEqual(regular.content, fast.content)
+
+    def test_filtered_route_list_is_identical(self) -> None:
+        regular, fast = self.get_both(ROUTE_URL, {"source": "Airport 1"})
+
+        self.assertEqual(regular.content, fast.content)
+
+    @override_settings(FAST_LIST_SERIALIZERS=True)
+    def test_fields_and_expand_use_model_serializer(self) -> None:
+        response = self.client.get(
+            FLIGHT_URL, {"fields": "id,airplane", "expand": "airplane"}
+        )
+
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "airplane"}
+        )
+        self.assertIn("rows", response.data["results"][0]["airplane"])
+
+
+class FastListBenchmarkTests(TestCase):
+    """
+    Serialization time of a large flight and route list with the model
+    serializers and the values() serializers. Timings are too noisy to
+    assert on, set QUERY_BUDGET_REPORT to a file path to add them to
+    its JSON report.
+    """
+
+    rounds = 5
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        seed_dataset(flights=500)
+
+    def best_of(self, serialize) -> float:
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def compare(self, name: str, regular, fast) -> None:
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(regular()), renderer.render(fast()))
+
+        regular_seconds = self.best_of(regular)
+        fast_seconds = self.best_of(fast)
+
+        path = os.environ.get(REPORT_ENV)
+        if path:
+            existing = {}
+            if os.path.exists(path):
+                with open(path) as report:
+                    existing = json.load(report)
+            existing[f"{name}-fast-serializer"] = {
+                "seconds": round(regular_seconds, 6),
+                "fast_seconds": round(fast_seconds, 6),
+                "speedup": round(regular_seconds / fast_seconds, 2),
+            }
+            with open(path, "w") as report:
+                json.dump(existing, report, indent=2, sort_keys=True)
+
+    def test_flight_list_timing(self) -> None:
+        queryset = (
+            Flight.objects.select_related(
+                "route__source", "route__destination", "airplane"
+            )
+            .prefetch_related(
+                Prefetch("crew", queryset=Crew.objects.order_by("id"))
+            )
+            .annotate(
+                tickets_available=(
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                    - F("tickets_sold")
+                )
+            )
+        )
+        fast = FlightListValuesSerializer()
+
+        self.compare(
+            "flight-list",
+            lambda: FlightListSerializer(queryset.all(), many=True).data,
+            lambda: fast.serialize(fast.get_rows(queryset.all())),
+        )
+
+    def test_route_list_timing(self) -> None:
+        queryset = Route.objects.select_related("source", "destination")
+        fast = RouteListValuesSerializer()
+
+        self.compare(
+            "route-list",
+            lambda: RouteListSerializer(queryset.all(), many=True).data,
+            lambda: fast.serialize(fast.get_rows(queryset.all())),
+        )
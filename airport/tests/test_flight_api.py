@@ -1,10 +1,24 @@
+import base64
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from airport.models import (
+    ChangeStamp,
     Flight,
     Airport,
     Route,
@@ -62,6 +76,10 @@ def flight_detail_url(flight_id: int):
     return reverse("airport:flight-detail", args=[flight_id])
 
 
+def flight_seat_map_url(flight_id: int):
+    return reverse("airport:flight-seat-map", args=[flight_id])
+
+
 def remove_tickets_available(data: list[dict]) -> None:
     for instance in data:
         instance.pop("tickets_available")
@@ -104,6 +122,7 @@ class UnauthenticatedFlightApiTests(TestCase):
 
 class AuthenticatedFlightApiTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.com",
@@ -121,13 +140,13 @@ class AuthenticatedFlightApiTests(TestCase):
 
         response = self.client.get(FLIGHT_URL)
 
-        remove_tickets_available(response.data)
+        remove_tickets_available(response.data["results"])
 
-        flights = Flight.objects.order_by("id")
+        flights = Flight.objects.order_by("-departure_time", "-id")
         serializer = FlightListSerializer(flights, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_filter_flights_by_departure_date(self) -> None:
         flight_1 = create_flight(departure_time="2023-11-01T08:00:00Z")
@@ -137,15 +156,16 @@ class AuthenticatedFlightApiTests(TestCase):
             FLIGHT_URL, {"departure_date": "2023-11-01"}
         )
 
-        remove_tickets_available(response.data)
+        results = response.data["results"]
+        remove_tickets_available(results)
 
         serializer_1 = FlightListSerializer(flight_1)
         serializer_2 = FlightListSerializer(flight_2)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertIn(serializer_1.data, response.data)
-        self.assertNotIn(serializer_2.data, response.data)
+        self.assertEqual(len(results), 1)
+        self.assertIn(serializer_1.data, results)
+        self.assertNotIn(serializer_2.data, results)
 
     def test_filter_flights_by_arrival_date(self) -> None:
         flight_1 = create_flight(arrival_time="2023-11-01T10:00:00Z")
@@ -153,15 +173,41 @@ class AuthenticatedFlightApiTests(TestCase):
 
         response = self.client.get(FLIGHT_URL, {"arrival_date": "2023-11-02"})
 
-        remove_tickets_available(response.data)
+        results = response.data["results"]
+        remove_tickets_available(results)
 
         serializer_1 = FlightListSerializer(flight_1)
         serializer_2 = FlightListSerializer(flight_2)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertNotIn(serializer_1.data, response.data)
-        self.assertIn(serializer_2.data, response.data)
+        self.assertEqual(len(results), 1)
+        self.assertNotIn(serializer_1.data, results)
+        self.assertIn(serializer_2.data, results)
+
+    def test_filter_flights_by_departure_range(self) -> None:
+        create_flight(departure_time="2023-11-01T05:59:00Z")
+        flight_2 = create_flight(departure_time="2023-11-01T06:00:00Z")
+        flight_3 = create_flight(departure_time="2023-11-01T23:59:00Z")
+        create_flight(departure_time="2023-11-02T00:00:00Z")
+
+        response = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_from": "2023-11-01T06:00:00Z",
+                "departure_to": "2023-11-02",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]],
+            [flight_3.id, flight_2.id],
+        )
+
+    def test_filter_flights_by_invalid_date(self) -> None:
+        response = self.client.get(FLIGHT_URL, {"departure_date": "soon"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_filter_flights_by_flight_id(self) -> None:
         flight_1 = create_flight()
@@ -173,15 +219,103 @@ class AuthenticatedFlightApiTests(TestCase):
 
         response = self.client.get(FLIGHT_URL, {"flight": flight_1.id})
 
-        remove_tickets_available(response.data)
+        results = response.data["results"]
+        remove_tickets_available(results)
 
         serializer_1 = FlightListSerializer(flight_1)
         serializer_2 = FlightListSerializer(flight_2)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertIn(serializer_1.data, response.data)
-        self.assertNotIn(serializer_2.data, response.data)
+        self.assertEqual(len(results), 1)
+        self.assertIn(serializer_1.data, results)
+        self.assertNotIn(serializer_2.data, results)
+
+    def test_list_flights_by_cursor(self) -> None:
+        for day in range(1, 6):
+            create_flight(departure_time=f"2023-11-0{day}T08:00:00Z")
+        create_flight(departure_time="2023-11-03T08:00:00Z")
+        expected = list(
+            Flight.objects.order_by("-departure_time", "-id")
+            .values_list("id", flat=True)
+        )
+
+        ids, url = [], FLIGHT_URL + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            ids.extend(flight["id"] for flight in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(ids, expected)
+
+        response = self.client.get(response.data["previous"])
+
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]],
+            expected[2:4],
+        )
+
+    def test_invalid_flight_cursor(self) -> None:
+        create_flight(departure_time="2023-11-01T08:00:00Z")
+
+        for cursor in ("%%%", "v=garbage&i=1", "v=&i=1", "v=2023-11-01"):
+            with self.subTest(cursor):
+                encoded = base64.b64encode(cursor.encode()).decode()
+                response = self.client.get(FLIGHT_URL, {"cursor": encoded})
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_stream_flights(self) -> None:
+        create_flight(departure_time="2023-11-01T08:00:00Z")
+        create_flight(departure_time="2023-11-02T08:00:00Z")
+
+        response = self.client.get(FLIGHT_URL, {"stream": "true"})
+        data = json.loads(b"".join(response.streaming_content))
+
+        paginated = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            data, json.loads(json.dumps(paginated.data["results"]))
+        )
+
+    def test_stream_empty_flights(self) -> None:
+        response = self.client.get(FLIGHT_URL, {"stream": "1"})
+
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+    def test_list_flights_sparse_fields(self) -> None:
+        create_flight()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                FLIGHT_URL, {"fields": "id,departure_time"}
+            )
+
+        self.assertEqual(
+            list(response.data["results"][0]), ["id", "departure_time"]
+        )
+        flight_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "airport_flight" in query["sql"]
+        ]
+        self.assertEqual(len(flight_queries), 1)
+        self.assertNotIn("JOIN", flight_queries[0])
+
+    def test_list_flights_expanded(self) -> None:
+        flight = create_flight()
+
+        response = self.client.get(
+            FLIGHT_URL, {"expand": "airplane,crew", "fields": "airplane,crew"}
+        )
+        result = response.data["results"][0]
+
+        self.assertEqual(result["airplane"]["id"], flight.airplane_id)
+        self.assertEqual(result["airplane"]["airplane_type"], "Type A")
+        self.assertEqual(result["crew"][0]["full_name"], "Bob Core")
 
     def test_retrieve_flight_detail(self) -> None:
         flight = create_flight()
@@ -191,6 +325,7 @@ class AuthenticatedFlightApiTests(TestCase):
 
         response = self.client.get(flight_detail_url(flight.id))
 
+        flight.refresh_from_db()
         serializer = FlightRetrieveSerializer(flight)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -198,6 +333,220 @@ class AuthenticatedFlightApiTests(TestCase):
         self.assertEqual(len(response.data["taken_places"]), 2)
         self.assertEqual(response.data, serializer.data)
 
+    def test_retrieve_flight_seat_map(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+        Ticket.objects.create(row=2, seat=6, flight=flight, order=order)
+
+        response = self.client.get(flight_seat_map_url(flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], 10)
+        self.assertEqual(response.data["seats_in_row"], 6)
+        self.assertEqual(
+            base64.b64decode(response.data["seats"]),
+            bytes([0b01000000, 0b00010000]) + bytes(6),
+        )
+
+        response = self.client.get(
+            flight_seat_map_url(flight.id), {"encoding": "runs"}
+        )
+
+        self.assertEqual(response.data["seats"][0], [1, 1, 4])
+        self.assertEqual(response.data["seats"][1], [5, 1])
+        self.assertEqual(response.data["seats"][2], [6])
+
+    def test_seat_map_follows_ticket_changes(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=order
+        )
+        Ticket.objects.create(row=3, seat=3, flight=flight, order=order)
+
+        ticket.row = 4
+        ticket.save()
+        Ticket.objects.filter(row=3).delete()
+        flight.refresh_from_db()
+
+        self.assertEqual(list(flight.get_seat_map().taken_seats()), [(4, 1)])
+
+    def test_seat_map_rebuilt_only_on_airplane_change(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Flight.objects.update(tickets_sold=0)
+        flight.refresh_from_db()
+
+        flight.arrival_time = "2023-11-01T11:00:00Z"
+        with CaptureQueriesContext(connection) as queries:
+            flight.save()
+
+        self.assertFalse(
+            any("airport_ticket" in query["sql"] for query in queries)
+        )
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_sold, 0)
+
+        flight.airplane = Airplane.objects.create(
+            name="Small", rows=2, seats_in_row=2
+        )
+        flight.save()
+        flight.refresh_from_db()
+
+        self.assertEqual(flight.tickets_sold, 1)
+        self.assertEqual(list(flight.get_seat_map().taken_seats()), [(1, 1)])
+
+    def test_tickets_available_follows_sold_tickets(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        ticket = Ticket.objects.create(
+            row=1, seat=2, flight=flight, order=order
+        )
+        ticket.delete()
+        Ticket.objects.create(row=5, seat=5, flight=flight, order=order)
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            response.data["results"][0]["tickets_available"], 58
+        )
+
+    def test_reconcile_tickets_command(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Flight.objects.update(tickets_sold=0, seat_map=b"")
+
+        call_command("reconcile_tickets", "--seat-maps", stdout=StringIO())
+        flight.refresh_from_db()
+
+        self.assertEqual(flight.tickets_sold, 1)
+        self.assertEqual(list(flight.get_seat_map().taken_seats()), [(1, 1)])
+
+    def test_cached_flight_list_follows_reconcile(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Flight.objects.update(tickets_sold=5)
+
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).data["results"][0][
+                "tickets_available"
+            ],
+            55,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "reconcile_tickets", "--seat-maps", stdout=StringIO()
+            )
+
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).data["results"][0][
+                "tickets_available"
+            ],
+            59,
+        )
+
+    def test_cached_responses_keep_their_scheme(self) -> None:
+        Airport.objects.create(
+            name="Heathrow",
+            closest_big_city="London",
+            image="uploads/airports/heathrow.jpg",
+        )
+        url = reverse("airport:airport-list")
+
+        http = self.client.get(url).data[0]["image"]
+        https = self.client.get(url, secure=True).data[0]["image"]
+
+        self.assertTrue(http.startswith("http://"))
+        self.assertTrue(https.startswith("https://"))
+
+    def test_cached_flight_list_follows_ticket_sales(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).data["results"][0][
+                "tickets_available"
+            ],
+            60,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).data["results"][0][
+                "tickets_available"
+            ],
+            59,
+        )
+
+    def test_conditional_flight_list(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+
+        response = self.client.get(FLIGHT_URL)
+        etag = response["ETag"]
+
+        response = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        response = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        ChangeStamp.objects.update(
+            changed_at=F("changed_at") - timedelta(seconds=1)
+        )
+        response = self.client.get(FLIGHT_URL)
+        response = self.client.get(
+            FLIGHT_URL, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_no_last_modified_within_the_second_of_a_change(self) -> None:
+        flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        moment = timezone.now().replace(microsecond=100000)
+
+        def sell(seat: int, at: timedelta) -> None:
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.create(
+                    row=1, seat=seat, flight=flight, order=order
+                )
+            ChangeStamp.objects.update(changed_at=moment + at)
+
+        def get(at: timedelta, **headers):
+            with mock.patch(
+                "airport.caching.timezone.now", return_value=moment + at
+            ):
+                return self.client.get(FLIGHT_URL, **headers)
+
+        sell(1, timedelta())
+        self.assertNotIn("Last-Modified", get(timedelta(milliseconds=200)))
+
+        sell(2, timedelta(milliseconds=500))
+        response = get(
+            timedelta(milliseconds=600),
+            HTTP_IF_MODIFIED_SINCE=http_date(moment.timestamp()),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["tickets_available"], 58)
+        self.assertIn("Last-Modified", get(timedelta(seconds=2)))
+
     def test_create_flight_forbidden(self) -> None:
         payload = get_payload()
 
@@ -226,6 +575,7 @@ class AuthenticatedFlightApiTests(TestCase):
 
 class AdminFlightApiTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "admin@admin.com", "12345", is_staff=True
@@ -256,3 +606,31 @@ class AdminFlightApiTests(TestCase):
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class FlightQueryPlanTests(TestCase):
+    def setUp(self) -> None:
+        self.flight = create_flight()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+
+    def test_departure_range_uses_departure_index(self) -> None:
+        plan = (
+            Flight.objects.filter(
+                departure_time__gte="2023-11-01T00:00:00Z",
+                departure_time__lt="2023-11-02T00:00:00Z",
+            )
+            .order_by("-departure_time", "-id")[:20]
+            .explain()
+        )
+
+        self.assertIn("flight_departure_id_idx", plan)
+
+    def test_route_departures_use_route_index(self) -> None:
+        plan = Flight.objects.filter(
+            route=self.flight.route,
+            departure_time__gte="2023-11-01T00:00:00Z",
+        ).explain()
+
+        self.assertIn("flight_route_departure_idx", plan)
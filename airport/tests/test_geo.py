@@ -0,0 +1,194 @@
+import random
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.geo import (
+    AirportTree,
+    check_route_distances,
+    fill_route_distances,
+    great_circle_km,
+)
+from airport.models import Airport, Route
+
+NEAREST_URL = reverse("airport:airport-nearest")
+AIRPORT_URL = reverse("airport:airport-list")
+
+HEATHROW = (51.47, -0.4543)
+JFK = (40.6413, -73.7781)
+
+
+class AirportTreeTests(SimpleTestCase):
+    def test_great_circle_km(self) -> None:
+        self.assertAlmostEqual(great_circle_km(HEATHROW, JFK), 5540, delta=1)
+        self.assertEqual(great_circle_km(JFK, JFK), 0)
+
+    def test_nearest_crosses_the_antimeridian(self) -> None:
+        tree = AirportTree(
+            [
+                (1, "Fiji", "Suva", -18.04, 178.56),
+                (2, "Samoa", "Apia", -13.83, -171.99),
+                (3, "Tonga", "Nukualofa", -21.24, -175.15),
+                (4, "Sydney", "Sydney", -33.94, 151.18),
+            ]
+        )
+
+        nearest = tree.nearest(-20, 179.9, limit=3)
+
+        self.assertEqual([airport["id"] for airport in nearest], [1, 3, 2])
+        self.assertLess(nearest[0]["distance"], nearest[1]["distance"])
+        self.assertEqual(
+            [airport["id"] for airport in tree.nearest(-20, 179.9, 3, 600)],
+            [1, 3],
+        )
+
+    def test_matches_brute_force_and_is_fast(self) -> None:
+        rnd = random.Random(7)
+        airports = [
+            (pk, "", "", rnd.uniform(-90, 90), rnd.uniform(-180, 180))
+            for pk in range(20000)
+        ]
+        tree = AirportTree(airports)
+        points = [
+            (rnd.uniform(-90, 90), rnd.uniform(-180, 180)) for _ in range(200)
+        ]
+
+        for point in points[:20]:
+            expected = sorted(
+                airports,
+                key=lambda airport: great_circle_km(point, airport[3:]),
+            )[:5]
+            self.assertEqual(
+                [airport["id"] for airport in tree.nearest(*point, limit=5)],
+                [airport[0] for airport in expected],
+            )
+
+        started = time.perf_counter()
+        for point in points:
+            tree.nearest(*point)
+        seconds = (time.perf_counter() - started) / len(points)
+
+        self.assertLess(seconds, 0.002)
+
+
+class NearestAirportApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.heathrow = Airport.objects.create(
+            name="Heathrow",
+            closest_big_city="London",
+            latitude=HEATHROW[0],
+            longitude=HEATHROW[1],
+        )
+        self.jfk = Airport.objects.create(
+            name="JFK",
+            closest_big_city="New York",
+            latitude=JFK[0],
+            longitude=JFK[1],
+        )
+        Airport.objects.create(name="Unknown", closest_big_city="Nowhere")
+
+    def test_nearest(self) -> None:
+        response = self.client.get(
+            NEAREST_URL, {"latitude": 51.5, "longitude": -0.12}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["id"] for airport in response.data],
+            [self.heathrow.id, self.jfk.id],
+        )
+        self.assertAlmostEqual(response.data[0]["distance"], 23, delta=1)
+
+    def test_nearest_follows_airport_changes(self) -> None:
+        self.client.get(NEAREST_URL, {"latitude": 51.5, "longitude": -0.12})
+        self.heathrow.delete()
+
+        response = self.client.get(
+            NEAREST_URL, {"latitude": 51.5, "longitude": -0.12, "radius": 100}
+        )
+
+        self.assertEqual(response.data, [])
+
+    def test_nearest_validates_point(self) -> None:
+        response = self.client.get(
+            NEAREST_URL, {"latitude": 91, "longitude": 0}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_coordinates_are_set_together(self) -> None:
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "12345", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.post(
+            AIRPORT_URL,
+            {"name": "Orly", "closest_big_city": "Paris", "latitude": 48.7},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RouteDistanceTests(TestCase):
+    def setUp(self) -> None:
+        self.heathrow = Airport.objects.create(
+            name="Heathrow",
+            closest_big_city="London",
+            latitude=HEATHROW[0],
+            longitude=HEATHROW[1],
+        )
+        self.jfk = Airport.objects.create(
+            name="JFK",
+            closest_big_city="New York",
+            latitude=JFK[0],
+            longitude=JFK[1],
+        )
+        self.unknown = Airport.objects.create(
+            name="Unknown", closest_big_city="Nowhere"
+        )
+        self.kilometers = Route.objects.create(
+            source=self.heathrow, destination=self.jfk, distance=5000
+        )
+        self.miles = Route.objects.create(
+            source=self.jfk,
+            destination=self.heathrow,
+            distance=3442,
+            type_of_measurement="ml",
+        )
+        self.skipped = Route.objects.create(
+            source=self.heathrow, destination=self.unknown, distance=10
+        )
+
+    def test_check_and_fill(self) -> None:
+        expected = round(great_circle_km(HEATHROW, JFK))
+
+        [mismatch] = check_route_distances(tolerance=1)
+        self.assertEqual(mismatch.route, self.kilometers.id)
+        self.assertEqual(mismatch.computed, expected)
+
+        self.assertEqual(fill_route_distances(), 1)
+
+        self.kilometers.refresh_from_db()
+        self.assertEqual(self.kilometers.distance, expected)
+        self.assertEqual(self.kilometers.distance_km, expected)
+        self.assertEqual(Route.objects.get(pk=self.skipped.pk).distance, 10)
+        self.assertEqual(check_route_distances(tolerance=0), [])
+
+    def test_command(self) -> None:
+        with self.assertRaisesMessage(CommandError, "1 routes"):
+            call_command("route_distances", stdout=StringIO())
+
+        call_command("route_distances", "--fill", stdout=StringIO())
+        call_command("route_distances", stdout=StringIO())
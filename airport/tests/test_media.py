@@ -0,0 +1,126 @@
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from airport.media import parse_range
+
+MEDIA_ROOT = tempfile.mkdtemp()
+IMAGE_NAME = (
+    "uploads/airports/heathrow-0b0f4a1e-3c4d-4e5f-8a9b-0c1d2e3f4a5b.jpg"
+)
+CONTENT = bytes(range(100))
+
+
+def media_url(name: str) -> str:
+    return reverse("media", args=[name])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SERVING="django")
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        os.makedirs(
+            os.path.join(MEDIA_ROOT, "uploads/airports"), exist_ok=True
+        )
+        for name in (IMAGE_NAME, "readme.txt"):
+            with open(os.path.join(MEDIA_ROOT, name), "wb") as file:
+                file.write(CONTENT)
+
+    def get(self, name: str = IMAGE_NAME, **headers):
+        response = self.client.get(media_url(name), headers=headers)
+        content = b"".join(getattr(response, "streaming_content", []))
+        response.close()
+        return response, content
+
+    def test_serves_file_with_immutable_cache_headers(self) -> None:
+        response, content = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, CONTENT)
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+    def test_names_without_uuid_are_revalidated(self) -> None:
+        response, _ = self.get("readme.txt")
+
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    def test_conditional_requests(self) -> None:
+        response, _ = self.get()
+
+        by_etag, content = self.get(If_None_Match=response["ETag"])
+        by_date, _ = self.get(If_Modified_Since=response["Last-Modified"])
+        stale, _ = self.get(If_Modified_Since=http_date(0))
+
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(content, b"")
+        self.assertEqual(by_etag["ETag"], response["ETag"])
+        self.assertIn("immutable", by_etag["Cache-Control"])
+        self.assertEqual(by_date.status_code, 304)
+        self.assertEqual(stale.status_code, 200)
+
+    def test_byte_ranges(self) -> None:
+        response, content = self.get(Range="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(content, CONTENT[10:20])
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+
+        response, content = self.get(Range="bytes=-5")
+        self.assertEqual(content, CONTENT[-5:])
+
+        response, _ = self.get(Range="bytes=100-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */100")
+
+    def test_if_range_mismatch_sends_whole_file(self) -> None:
+        response, content = self.get(Range="bytes=0-9", If_Range='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, CONTENT)
+
+    def test_missing_and_outside_files(self) -> None:
+        self.assertEqual(self.get("uploads/missing.jpg")[0].status_code, 404)
+        self.assertEqual(self.get("uploads")[0].status_code, 404)
+        self.assertEqual(self.get("../etc/passwd")[0].status_code, 404)
+
+    @override_settings(
+        MEDIA_SERVING="x-accel-redirect",
+        MEDIA_ACCEL_PREFIX="/protected-media/",
+    )
+    def test_x_accel_redirect(self) -> None:
+        response, _ = self.get()
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{IMAGE_NAME}"
+        )
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_SERVING="x-sendfile")
+    def test_x_sendfile(self) -> None:
+        response, _ = self.get()
+
+        self.assertEqual(
+            response["X-Sendfile"], os.path.join(MEDIA_ROOT, IMAGE_NAME)
+        )
+
+    def test_parse_range(self) -> None:
+        self.assertEqual(parse_range("bytes=0-", 10), (0, 9))
+        self.assertEqual(parse_range("bytes=5-50", 10), (5, 9))
+        self.assertEqual(parse_range("bytes=-50", 10), (0, 9))
+        self.assertIsNone(parse_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(parse_range("items=0-1", 10))
+        self.assertIsNone(parse_range("bytes=5-2", 10))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=-0", 10)
@@ -0,0 +1,293 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, IdempotencyKey, Order, Ticket
+from airport.tests.test_flight_api import create_flight
+from airport.views import OrderViewSet
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class AuthenticatedOrderApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = create_flight()
+
+    def test_create_order(self) -> None:
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().tickets.count(), 2)
+
+    def test_create_order_takes_seats_in_batch(self) -> None:
+        payload = {
+            "tickets": [
+                {"row": 2, "seat": seat, "flight": self.flight.id}
+                for seat in range(1, 7)
+            ]
+        }
+
+        with self.assertNumQueries(13):
+            response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(flight.tickets_sold, 6)
+        self.assertEqual(
+            list(flight.get_seat_map().taken_seats()),
+            [(2, seat) for seat in range(1, 7)],
+        )
+
+    def test_create_order_with_taken_seat(self) -> None:
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=self.flight, row=1, seat=1)
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already taken", str(response.data["tickets"]))
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_order_with_repeated_seat(self) -> None:
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_with_seat_out_of_airplane(self) -> None:
+        payload = {
+            "tickets": [{"row": 11, "seat": 1, "flight": self.flight.id}]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def book(self, *seats: tuple) -> Order:
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight=self.flight, row=row, seat=seat)
+            for row, seat in seats
+        )
+        return order
+
+    def test_list_orders_with_flight_availability(self) -> None:
+        self.book((1, 1), (1, 2))
+        Flight.rebuild_seat_maps([self.flight.id])
+
+        response = self.client.get(ORDER_URL)
+
+        tickets = response.data["results"][0]["tickets"]
+        self.assertEqual(len(tickets), 2)
+        self.assertEqual(tickets[0]["flight"]["id"], self.flight.id)
+        self.assertEqual(tickets[0]["flight"]["tickets_available"], 58)
+        self.assertEqual(tickets[0]["flight"]["crew"], ["Bob Core"])
+
+    def test_retrieve_order_with_flight_availability(self) -> None:
+        order = self.book((3, 1))
+        Flight.rebuild_seat_maps([self.flight.id])
+
+        response = self.client.get(
+            reverse("airport:order-detail", args=[order.id])
+        )
+
+        flight = response.data["tickets"][0]["flight"]
+        self.assertEqual(flight["tickets_available"], 59)
+        self.assertEqual(flight["route"], "Airport A-Airport B")
+
+    def test_order_list_queries_do_not_grow_with_tickets(self) -> None:
+        other_flight = create_flight(
+            source_airport_name="Airport D",
+            destination_airport_name="Airport E",
+        )
+        self.book((1, 1))
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(ORDER_URL)
+
+        for row in range(2, 6):
+            self.book((row, 1), (row, 2))
+            Ticket.objects.create(
+                order=self.book(), flight=other_flight, row=row, seat=1
+            )
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(ORDER_URL)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_order_list_shares_flights_across_tickets(self) -> None:
+        self.book((1, 1), (1, 2))
+        self.book((2, 1))
+        view = OrderViewSet(
+            action="list", request=SimpleNamespace(user=self.user)
+        )
+
+        flights = {
+            id(ticket.flight)
+            for order in view.get_queryset()
+            for ticket in order.tickets.all()
+        }
+
+        self.assertEqual(len(flights), 1)
+
+    def test_list_orders_by_cursor(self) -> None:
+        orders = [Order.objects.create(user=self.user) for _ in range(5)]
+        expected = [order.id for order in reversed(orders)]
+
+        ids, url = [], ORDER_URL + "?pagination=cursor&page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            ids.extend(order["id"] for order in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(ids, expected)
+
+    def test_list_orders_by_page_number(self) -> None:
+        Order.objects.create(user=self.user)
+
+        response = self.client.get(ORDER_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+
+class IdempotentOrderApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "12345",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = create_flight()
+        self.payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def post(self, payload: dict, key: str = "order-1"):
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_repeated_request_replays_response(self) -> None:
+        first = self.post(self.payload)
+
+        with self.assertNumQueries(1):
+            repeat = self.post(self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repeat.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repeat.data, first.data)
+        self.assertEqual(repeat["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_other_request(self) -> None:
+        self.post(self.payload)
+        self.payload["tickets"][0]["seat"] = 2
+
+        response = self.post(self.payload)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_key_of_failed_request_can_be_retried(self) -> None:
+        self.payload["tickets"][0]["row"] = 11
+        self.assertEqual(
+            self.post(self.payload).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.payload["tickets"][0]["row"] = 1
+
+        response = self.post(self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_request_dying_midway_leaves_no_key(self) -> None:
+        with mock.patch(
+            "airport.idempotency.status.is_success", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.post(self.payload)
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertFalse(Order.objects.exists())
+        response = self.post(self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_expired_key_runs_request_again(self) -> None:
+        self.post(self.payload)
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        Order.objects.all().delete()
+
+        response = self.post(self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_per_user(self) -> None:
+        self.post(self.payload)
+        other = get_user_model().objects.create_user("o@test.com", "12345")
+        self.client.force_authenticate(other)
+        self.payload["tickets"][0]["seat"] = 2
+
+        response = self.post(self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class OrderQueryPlanTests(TestCase):
+    def test_order_cursor_uses_user_created_index(self) -> None:
+        user = get_user_model().objects.create_user("test@test.com", "12345")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+
+        plan = (
+            Order.objects.filter(
+                user=user, created_at__lt=timezone.now()
+            )
+            .order_by("-created_at", "-id")[:10]
+            .explain()
+        )
+
+        self.assertIn("order_user_created_id_idx", plan)
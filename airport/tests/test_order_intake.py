@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.booking import hold_seats
+from airport.intake import process_batch
+from airport.models import Flight, Order, OrderRequest
+from airport.tests.test_flight_api import create_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def request_url(request_id: int) -> str:
+    return reverse("airport:orderrequest-detail", args=[request_id])
+
+
+@override_settings(ORDER_INTAKE="queued")
+class QueuedOrderIntakeTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "12345"
+        )
+        self.flight = create_flight()
+
+    def order(self, *seats: tuple, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_order_is_queued(self) -> None:
+        response = self.order((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertTrue(
+            response["Location"].endswith(request_url(response.data["id"]))
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_invalid_order_is_not_queued(self) -> None:
+        response = self.order((11, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def test_worker_confirms_queued_order(self) -> None:
+        queued = self.order((1, 1), (1, 2)).data
+
+        result = process_batch()
+        response = self.client.get(request_url(queued["id"]))
+
+        self.assertEqual(result.confirmed, 1)
+        self.assertEqual(response.data["status"], "confirmed")
+        order = Order.objects.get(pk=response.data["order"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(order.tickets.count(), 2)
+        self.assertEqual(Flight.objects.get().tickets_sold, 2)
+
+    def test_batch_rejects_later_request_for_same_seat(self) -> None:
+        first = self.order((1, 1)).data
+        second = self.order((1, 1), (1, 2), user=self.other).data
+
+        result = process_batch()
+
+        self.assertEqual((result.confirmed, result.rejected), (1, 1))
+        self.assertEqual(
+            OrderRequest.objects.get(pk=first["id"]).status, "confirmed"
+        )
+        rejected = OrderRequest.objects.get(pk=second["id"])
+        self.assertEqual(rejected.status, "rejected")
+        self.assertIn("already taken", rejected.errors[0])
+        self.assertIsNone(rejected.order)
+
+    def test_batch_respects_holds_of_other_users(self) -> None:
+        hold_seats(self.other, self.flight, [(1, 1)])
+        queued = self.order((1, 1)).data
+
+        process_batch()
+
+        self.assertEqual(
+            OrderRequest.objects.get(pk=queued["id"]).status, "rejected"
+        )
+
+    def test_batch_rejects_seats_outside_new_airplane(self) -> None:
+        outside = self.order((1, 1), (self.flight.airplane.rows, 1)).data
+        inside = self.order((1, 2), user=self.other).data
+        airplane = self.flight.airplane
+        airplane.rows -= 1
+        airplane.save()
+
+        result = process_batch()
+
+        self.assertEqual((result.confirmed, result.rejected), (1, 1))
+        rejected = OrderRequest.objects.get(pk=outside["id"])
+        self.assertEqual(rejected.status, "rejected")
+        self.assertIn("Row must be in range", rejected.errors[0])
+        self.assertEqual(
+            OrderRequest.objects.get(pk=inside["id"]).status, "confirmed"
+        )
+
+    def test_batch_queries_do_not_grow_with_requests(self) -> None:
+        for seat in range(1, 3):
+            self.order((1, seat))
+        with CaptureQueriesContext(connection) as small:
+            process_batch()
+
+        for seat in range(1, 7):
+            self.order((2, seat))
+        with CaptureQueriesContext(connection) as large:
+            process_batch()
+
+        self.assertEqual(len(small), len(large))
+
+    def test_requests_of_other_users_are_hidden(self) -> None:
+        queued = self.order((1, 1), user=self.other).data
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(request_url(queued["id"]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_worker_command_drains_queue(self) -> None:
+        self.order((1, 1))
+        self.order((1, 2), user=self.other)
+        out = StringIO()
+
+        call_command("process_order_requests", once=True, stdout=out)
+
+        self.assertIn("Confirmed 2 and rejected 0", out.getvalue())
+        self.assertFalse(
+            OrderRequest.objects.filter(status="pending").exists()
+        )
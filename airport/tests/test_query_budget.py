@@ -0,0 +1,653 @@
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    OrderRequest,
+    Route,
+    Ticket,
+)
+
+REPORT_ENV = "QUERY_BUDGET_REPORT"
+PASSWORD = "12345"
+
+
+def seed_dataset(
+    airports: int = 20,
+    routes: int = 60,
+    flights: int = 300,
+    orders: int = 40,
+    seed: int = 42,
+) -> dict:
+    """Create a realistic catalog of flights with sold tickets"""
+    rnd = random.Random(seed)
+    user = get_user_model().objects.create_user("seed@test.com", PASSWORD)
+
+    airplane_types = AirplaneType.objects.bulk_create(
+        AirplaneType(name=name) for name in ("Boeing", "Airbus", "Embraer")
+    )
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Airplane {index}",
+            rows=rnd.choice((20, 30, 60)),
+            seats_in_row=rnd.choice((4, 6, 10)),
+            airplane_type=rnd.choice(airplane_types),
+        )
+        for index in range(10)
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"First {index}", last_name=f"Last {index}")
+        for index in range(30)
+    )
+    airport_objects = Airport.objects.bulk_create(
+        Airport(
+            name=f"Airport {index}",
+            closest_big_city=f"City {index}",
+            latitude=index * 4 - 40,
+            longitude=index * 9 - 90,
+        )
+        for index in range(airports)
+    )
+    route_objects = Route.objects.bulk_create(
+        Route(
+            source=source,
+            destination=destination,
+            distance=rnd.randrange(200, 5000),
+        )
+        for source, destination in (
+            rnd.sample(airport_objects, 2) for _ in range(routes)
+        )
+    )
+
+    start = datetime(2023, 11, 1, tzinfo=timezone.utc)
+    flight_objects = Flight.objects.bulk_create(
+        Flight(
+            route=rnd.choice(route_objects),
+            airplane=rnd.choice(airplanes),
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=rnd.randrange(1, 12)),
+        )
+        for departure in (
+            start + timedelta(minutes=rnd.randrange(60 * 24 * 30))
+            for _ in range(flights)
+        )
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight=flight, crew=member)
+        for flight in flight_objects
+        for member in rnd.sample(crew, 3)
+    )
+
+    order_objects = Order.objects.bulk_create(
+        Order(user=user) for _ in range(orders)
+    )
+    tickets = []
+    for order in order_objects:
+        flight = rnd.choice(flight_objects)
+        for seat in range(1, 4):
+            tickets.append(
+                Ticket(
+                    order=order,
+                    flight=flight,
+                    row=order.id % flight.airplane.rows + 1,
+                    seat=seat,
+                )
+            )
+    Ticket.objects.bulk_create(tickets, ignore_conflicts=True)
+    Flight.rebuild_seat_maps(flight.id for flight in flight_objects)
+
+    return {
+        "user": user,
+        "airplane_type": airplane_types[0],
+        "airplane": airplanes[0],
+        "crew": crew[0],
+        "airport": airport_objects[0],
+        "route": route_objects[0],
+        "flight": flight_objects[0],
+        "order": order_objects[0],
+        "airports": airport_objects,
+    }
+
+
+def png_file() -> BytesIO:
+    image = BytesIO()
+    Image.new("RGB", (64, 64)).save(image, format="PNG")
+    image.name = "airport.png"
+    image.seek(0)
+    return image
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class QueryBudgetTests(TestCase):
+    """
+    Query count, wall time and peak memory of every API action on a
+    seeded dataset, failing when an action exceeds its query budget.
+
+    Set QUERY_BUDGET_REPORT to a file path to get a JSON report.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.data = seed_dataset()
+        cls.admin = get_user_model().objects.create_user(
+            "admin@test.com", PASSWORD, is_staff=True
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.report = {}
+
+    def measure(
+        self,
+        name: str,
+        budget: int,
+        method: str,
+        url: str,
+        data: dict | None = None,
+        user=None,
+        format: str = "json",
+        expected_status: int = 200,
+        **extra,
+    ) -> dict:
+        self.client.force_authenticate(user or self.data["user"])
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(
+                url, data, format=format, **extra
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.report[name] = {
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "queries": len(queries),
+            "budget": budget,
+            "seconds": round(elapsed, 6),
+            "peak_memory_kib": round(peak / 1024, 1),
+        }
+
+        with self.subTest(name):
+            statements = [query["sql"] for query in queries.captured_queries]
+            self.assertEqual(response.status_code, expected_status)
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                f"{name} exceeded its query budget:\n"
+                + "\n".join(statements),
+            )
+
+        self.response = response
+        return getattr(response, "data", None)
+
+    def tearDown(self) -> None:
+        path = os.environ.get(REPORT_ENV)
+        if path and self.report:
+            existing = {}
+            if os.path.exists(path):
+                with open(path) as report:
+                    existing = json.load(report)
+            existing.update(self.report)
+            with open(path, "w") as report:
+                json.dump(existing, report, indent=2, sort_keys=True)
+
+    def check_catalog(
+        self, basename: str, instance, payload: dict, budgets: dict
+    ) -> None:
+        list_url = reverse(f"airport:{basename}-list")
+        detail_url = reverse(f"airport:{basename}-detail", args=[instance.id])
+
+        self.measure(f"{basename}-list", budgets["list"], "get", list_url)
+        self.measure(f"{basename}-list-cached", 1, "get", list_url)
+        self.measure(
+            f"{basename}-retrieve", budgets["retrieve"], "get", detail_url
+        )
+        self.measure(f"{basename}-retrieve-cached", 1, "get", detail_url)
+        created = self.measure(
+            f"{basename}-create",
+            budgets["create"],
+            "post",
+            list_url,
+            payload,
+            user=self.admin,
+            expected_status=201,
+        )
+        created_url = reverse(
+            f"airport:{basename}-detail", args=[created["id"]]
+        )
+        self.measure(
+            f"{basename}-update",
+            budgets["update"],
+            "put",
+            created_url,
+            payload,
+            user=self.admin,
+        )
+        self.measure(
+            f"{basename}-partial-update",
+            budgets["update"],
+            "patch",
+            created_url,
+            payload,
+            user=self.admin,
+        )
+        self.measure(
+            f"{basename}-destroy",
+            budgets["destroy"],
+            "delete",
+            created_url,
+            user=self.admin,
+            expected_status=204,
+        )
+
+    def test_airplane_type_budget(self) -> None:
+        self.check_catalog(
+            "airplanetype",
+            self.data["airplane_type"],
+            {"name": "Bombardier"},
+            {"list": 2, "retrieve": 2, "create": 1, "update": 2, "destroy": 3},
+        )
+
+    def test_airplane_budget(self) -> None:
+        self.check_catalog(
+            "airplane",
+            self.data["airplane"],
+            {
+                "name": "Airplane X",
+                "rows": 10,
+                "seats_in_row": 4,
+                "airplane_type": self.data["airplane_type"].id,
+            },
+            {"list": 2, "retrieve": 2, "create": 2, "update": 4, "destroy": 3},
+        )
+
+    def test_crew_budget(self) -> None:
+        self.check_catalog(
+            "crew",
+            self.data["crew"],
+            {"first_name": "Ann", "last_name": "Smith"},
+            {"list": 2, "retrieve": 2, "create": 1, "update": 2, "destroy": 3},
+        )
+
+    def test_airport_budget(self) -> None:
+        self.check_catalog(
+            "airport",
+            self.data["airport"],
+            {"name": "Airport X", "closest_big_city": "City X"},
+            {"list": 2, "retrieve": 2, "create": 1, "update": 2, "destroy": 4},
+        )
+        self.measure(
+            "airport-upload-image",
+            2,
+            "post",
+            reverse(
+                "airport:airport-upload-image",
+                args=[self.data["airport"].id],
+            ),
+            {"image": png_file()},
+            user=self.admin,
+            format="multipart",
+        )
+
+    def test_route_budget(self) -> None:
+        self.check_catalog(
+            "route",
+            self.data["route"],
+            {
+                "source": self.data["airports"][1].id,
+                "destination": self.data["airports"][2].id,
+                "distance": 700,
+            },
+            {"list": 2, "retrieve": 2, "create": 3, "update": 4, "destroy": 3},
+        )
+
+    def test_flight_budget(self) -> None:
+        flight = self.data["flight"]
+        self.check_catalog(
+            "flight",
+            flight,
+            {
+                "route": self.data["route"].id,
+                "airplane": self.data["airplane"].id,
+                "departure_time": "2023-12-01T08:00:00Z",
+                "arrival_time": "2023-12-01T10:00:00Z",
+                "crew": [self.data["crew"].id],
+            },
+            {
+                "list": 3,
+                "retrieve": 3,
+                "create": 8,
+                "update": 11,
+                "destroy": 5,
+            },
+        )
+        list_url = reverse("airport:flight-list")
+        self.measure("flight-list-poll", 3, "get", list_url)
+        self.measure(
+            "flight-list-not-modified",
+            1,
+            "get",
+            list_url,
+            expected_status=304,
+            HTTP_IF_NONE_MATCH=self.response["ETag"],
+        )
+        self.measure(
+            "flight-list-filtered",
+            3,
+            "get",
+            reverse("airport:flight-list"),
+            {"departure_date": "2023-11-10", "page_size": 100},
+        )
+        self.measure(
+            "flight-seat-map",
+            2,
+            "get",
+            reverse("airport:flight-seat-map", args=[flight.id]),
+        )
+        self.measure(
+            "flight-assign-seats",
+            2,
+            "get",
+            reverse("airport:flight-assign-seats", args=[flight.id]),
+            {"party_size": 3},
+        )
+        self.measure(
+            "flight-assign-seats-order",
+            16,
+            "post",
+            reverse("airport:flight-assign-seats", args=[flight.id]),
+            {"party_size": 3},
+            expected_status=201,
+        )
+        self.measure(
+            "flight-manifest",
+            2,
+            "get",
+            reverse("airport:flight-manifest", args=[flight.id]),
+            user=self.admin,
+        )
+        self.measure(
+            "flight-connections",
+            4,
+            "get",
+            reverse("airport:flight-connections"),
+            {
+                "source": flight.route.source_id,
+                "destination": self.data["airports"][-1].id,
+                "departure": "2023-11-05T00:00:00Z",
+                "max_connections": 2,
+            },
+        )
+
+    def test_flight_bulk_budget(self) -> None:
+        schedule = {
+            "route": self.data["route"].id,
+            "airplane": self.data["airplane"].id,
+            "crew": [self.data["crew"].id],
+            "weekdays": [1, 3, 5],
+            "departure_time": "22:00:00",
+            "arrival_time": "01:30:00",
+            "valid_from": "2024-04-01",
+            "valid_to": "2024-06-30",
+        }
+
+        created = self.measure(
+            "flight-import-schedule",
+            8,
+            "post",
+            reverse("airport:flight-import-schedule"),
+            [schedule],
+            user=self.admin,
+            expected_status=201,
+        )
+        self.assertEqual(created["created"], 39)
+        self.measure(
+            "flight-cancel",
+            3,
+            "post",
+            reverse("airport:flight-cancel"),
+            {
+                "flights": list(
+                    Flight.objects.order_by("id").values_list(
+                        "id", flat=True
+                    )[:20]
+                )
+            },
+            user=self.admin,
+        )
+
+    def test_order_budget(self) -> None:
+        list_url = reverse("airport:order-list")
+        flight = self.data["flight"]
+
+        self.measure("order-list", 5, "get", list_url)
+        self.measure(
+            "order-list-cursor", 4, "get", list_url, {"pagination": "cursor"}
+        )
+        self.measure(
+            "order-retrieve",
+            4,
+            "get",
+            reverse("airport:order-detail", args=[self.data["order"].id]),
+        )
+        self.measure(
+            "order-create",
+            13,
+            "post",
+            list_url,
+            {
+                "tickets": [
+                    {"row": flight.airplane.rows, "seat": seat,
+                     "flight": flight.id}
+                    for seat in range(1, 4)
+                ]
+            },
+            expected_status=201,
+        )
+
+    def test_user_budget(self) -> None:
+        self.client.force_authenticate(None)
+        self.measure(
+            "user-create",
+            2,
+            "post",
+            reverse("user:create"),
+            {"email": "new@test.com", "password": PASSWORD},
+            expected_status=201,
+        )
+        tokens = self.measure(
+            "user-token-obtain-pair",
+            1,
+            "post",
+            reverse("user:token_obtain_pair"),
+            {"email": "new@test.com", "password": PASSWORD},
+        )
+        self.measure(
+            "user-token-refresh",
+            0,
+            "post",
+            reverse("user:token_refresh"),
+            {"refresh": tokens["refresh"]},
+        )
+        self.measure(
+            "user-token-verify",
+            0,
+            "post",
+            reverse("user:token_verify"),
+            {"token": tokens["access"]},
+        )
+        self.measure("user-manage", 0, "get", reverse("user:manage"))
+        self.measure(
+            "user-manage-update",
+            0,
+            "patch",
+            reverse("user:manage"),
+            {"password": "54321"},
+            expected_status=403,
+        )
+
+    def test_order_actions_budget(self) -> None:
+        order = Order.objects.create(user=self.admin)
+        flight = self.data["flight"]
+        Ticket.objects.create(
+            order=order, flight=flight, row=flight.airplane.rows, seat=1
+        )
+        detail_url = reverse("airport:order-detail", args=[order.id])
+
+        self.measure(
+            "order-export", 1, "get", reverse("airport:order-export")
+        )
+        self.measure(
+            "order-partial-update",
+            3,
+            "patch",
+            detail_url,
+            {},
+            user=self.admin,
+        )
+        self.measure(
+            "order-destroy",
+            6,
+            "delete",
+            detail_url,
+            user=self.admin,
+            expected_status=204,
+        )
+        self.measure(
+            "order-cancel-tickets",
+            4,
+            "post",
+            reverse("airport:order-cancel-tickets"),
+            {"flights": [flight.id], "row_from": 1, "row_to": 5},
+            user=self.admin,
+        )
+
+    @override_settings(ORDER_INTAKE="queued")
+    def test_order_request_budget(self) -> None:
+        flight = self.data["flight"]
+
+        queued = self.measure(
+            "order-create-queued",
+            2,
+            "post",
+            reverse("airport:order-list"),
+            {
+                "tickets": [
+                    {"row": flight.airplane.rows, "seat": seat,
+                     "flight": flight.id}
+                    for seat in range(1, 4)
+                ]
+            },
+            expected_status=202,
+        )
+        self.measure(
+            "orderrequest-list", 1, "get", reverse("airport:orderrequest-list")
+        )
+        self.measure(
+            "orderrequest-retrieve",
+            1,
+            "get",
+            reverse("airport:orderrequest-detail", args=[queued["id"]]),
+        )
+        self.assertTrue(OrderRequest.objects.filter(pk=queued["id"]).exists())
+
+    def test_seat_hold_budget(self) -> None:
+        flight = self.data["flight"]
+        list_url = reverse("airport:seathold-list")
+
+        hold = self.measure(
+            "seathold-create",
+            11,
+            "post",
+            list_url,
+            {
+                "flight": flight.id,
+                "seats": [
+                    {"row": flight.airplane.rows, "seat": seat}
+                    for seat in range(1, 3)
+                ],
+            },
+            expected_status=201,
+        )
+        self.measure("seathold-list", 2, "get", list_url)
+        self.measure(
+            "seathold-retrieve",
+            2,
+            "get",
+            reverse("airport:seathold-detail", args=[hold["id"]]),
+        )
+        self.measure(
+            "seathold-confirm",
+            20,
+            "post",
+            reverse("airport:seathold-confirm", args=[hold["id"]]),
+            expected_status=201,
+        )
+        second = self.measure(
+            "seathold-create-second",
+            11,
+            "post",
+            list_url,
+            {
+                "flight": flight.id,
+                "seats": [{"row": flight.airplane.rows, "seat": 4}],
+            },
+            expected_status=201,
+        )
+        self.measure(
+            "seathold-destroy",
+            4,
+            "delete",
+            reverse("airport:seathold-detail", args=[second["id"]]),
+            expected_status=204,
+        )
+
+    def test_search_budget(self) -> None:
+        airports_url = reverse("airport:airport-autocomplete")
+        nearest_url = reverse("airport:airport-nearest")
+        statistics_url = reverse("airport:route-statistics")
+
+        matches = self.measure(
+            "airport-autocomplete", 2, "get", airports_url, {"q": "cit"}
+        )
+        self.assertEqual(len(matches), 10)
+        self.measure(
+            "airport-autocomplete-warm", 1, "get", airports_url, {"q": "air"}
+        )
+        nearest = self.measure(
+            "airport-nearest",
+            2,
+            "get",
+            nearest_url,
+            {"latitude": 0, "longitude": 0},
+        )
+        self.assertEqual(len(nearest), 10)
+        self.measure("route-statistics", 2, "get", statistics_url)
+        self.measure("route-statistics-cached", 1, "get", statistics_url)
@@ -0,0 +1,159 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Route
+from airport.route_stats import bin_edges, histogram, percentile
+from airport.serializers import RouteStatisticsSerializer
+
+ROUTE_URL = reverse("airport:route-list")
+STATISTICS_URL = reverse("airport:route-statistics")
+
+
+class RouteStatsFunctionTests(SimpleTestCase):
+    def test_percentile_interpolates(self) -> None:
+        values = [10, 20, 30, 40]
+
+        self.assertEqual(percentile(values, 0), 10)
+        self.assertEqual(percentile(values, 50), 25)
+        self.assertEqual(percentile(values, 100), 40)
+        self.assertEqual(percentile([7], 90), 7)
+
+    def test_histogram_counts_sorted_values(self) -> None:
+        values = [0, 1, 2, 5, 5, 9, 10]
+        edges = bin_edges(0, 10, 5)
+
+        self.assertEqual(edges, [0, 2, 4, 6, 8, 10])
+        self.assertEqual(histogram(values, edges), [2, 1, 2, 0, 2])
+
+
+class RouteDistanceTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.paris, self.london, self.rome = Airport.objects.bulk_create(
+            Airport(name=name, closest_big_city=name)
+            for name in ("Paris", "London", "Rome")
+        )
+
+    def route(self, source, destination, distance, unit="km") -> Route:
+        return Route.objects.create(
+            source=source,
+            destination=destination,
+            distance=distance,
+            type_of_measurement=unit,
+        )
+
+    def test_distance_km_follows_unit(self) -> None:
+        route = self.route(self.paris, self.london, 100, "ml")
+        self.assertEqual(route.distance_km, 160.934)
+
+        route.type_of_measurement = "km"
+        route.save()
+        route.refresh_from_db()
+        self.assertEqual(route.distance_km, 100)
+
+        [bulk] = Route.objects.bulk_create(
+            [
+                Route(
+                    source=self.rome,
+                    destination=self.paris,
+                    distance=10,
+                    type_of_measurement="ml",
+                )
+            ]
+        )
+        self.assertEqual(Route.objects.get(pk=bulk.pk).distance_km, 16.093)
+
+    def test_filter_and_order_by_canonical_distance(self) -> None:
+        near = self.route(self.paris, self.london, 340)
+        far = self.route(self.paris, self.rome, 700, "ml")
+        self.route(self.london, self.rome, 1400)
+
+        response = self.client.get(
+            ROUTE_URL,
+            {"max_distance": 1200, "ordering": "-distance"},
+        )
+
+        self.assertEqual(
+            [route["id"] for route in response.data], [far.id, near.id]
+        )
+        self.assertEqual(response.data[0]["distance"], 700)
+        self.assertEqual(response.data[0]["type_of_measurement"], "ml")
+
+    def test_invalid_distance_filter(self) -> None:
+        response = self.client.get(ROUTE_URL, {"min_distance": "far"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_statistics(self) -> None:
+        self.route(self.paris, self.london, 100)
+        self.route(self.paris, self.rome, 300)
+        self.route(self.london, self.rome, 100, "ml")
+
+        response = self.client.get(
+            STATISTICS_URL, {"bins": 2, "percentiles": "50,100"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(response.data["edges"], [100, 200, 300])
+        self.assertEqual(response.data["histogram"], [2, 1])
+        self.assertEqual(
+            response.data["percentiles"], {"50": 160.934, "100": 300}
+        )
+        self.assertEqual(
+            response.data["sources"],
+            [
+                {
+                    "source": self.paris.id,
+                    "count": 2,
+                    "min": 100,
+                    "max": 300,
+                    "mean": 200,
+                    "percentiles": {"50": 200, "100": 300},
+                    "histogram": [1, 1],
+                },
+                {
+                    "source": self.london.id,
+                    "count": 1,
+                    "min": 160.934,
+                    "max": 160.934,
+                    "mean": 160.934,
+                    "percentiles": {"50": 160.934, "100": 160.934},
+                    "histogram": [1, 0],
+                },
+            ],
+        )
+
+    def test_statistics_of_no_routes(self) -> None:
+        response = self.client.get(
+            STATISTICS_URL, {"source": "nowhere", "percentiles": "50,99"}
+        )
+
+        self.assertEqual(
+            response.data,
+            {
+                "unit": "km",
+                "count": 0,
+                "min": None,
+                "max": None,
+                "mean": None,
+                "percentiles": {"50": None, "99": None},
+                "histogram": [],
+                "edges": [],
+                "sources": [],
+            },
+        )
+        serializer = RouteStatisticsSerializer(data=response.data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_statistics_rejects_invalid_percentiles(self) -> None:
+        response = self.client.get(STATISTICS_URL, {"percentiles": "50,x"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
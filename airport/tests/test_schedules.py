@@ -0,0 +1,110 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight
+from airport.tests.test_flight_api import create_flight
+
+IMPORT_SCHEDULE_URL = reverse("airport:flight-import-schedule")
+
+
+class ScheduleImportTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@admin.com", "12345", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        flight = create_flight()
+        self.crew = [
+            flight.crew.get(),
+            Crew.objects.create(first_name="Ann", last_name="Lee"),
+        ]
+        self.schedule = {
+            "route": flight.route_id,
+            "airplane": flight.airplane_id,
+            "crew": [member.id for member in self.crew],
+            "weekdays": [1, 3, 5],
+            "departure_time": "22:00",
+            "arrival_time": "01:30",
+            "valid_from": "2024-04-01",
+            "valid_to": "2024-04-14",
+        }
+
+    def test_import_schedule(self) -> None:
+        response = self.client.post(
+            IMPORT_SCHEDULE_URL, [self.schedule], format="json"
+        )
+
+        flights = Flight.objects.filter(departure_time__year=2024)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 6)
+        self.assertEqual(response.data["crew_links"], 12)
+        self.assertEqual(flights.count(), 6)
+        self.assertEqual(
+            {flight.departure_time.isoweekday() for flight in flights},
+            {1, 3, 5},
+        )
+        first_flight = flights.order_by("departure_time").first()
+        self.assertEqual(
+            first_flight.arrival_time.isoformat(),
+            "2024-04-02T01:30:00+00:00",
+        )
+        self.assertEqual(flights.first().crew.count(), 2)
+
+    def test_import_schedule_is_idempotent(self) -> None:
+        self.client.post(IMPORT_SCHEDULE_URL, [self.schedule], format="json")
+        self.schedule["valid_to"] = "2024-04-21"
+
+        response = self.client.post(
+            IMPORT_SCHEDULE_URL, [self.schedule], format="json"
+        )
+
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["skipped"], 6)
+        self.assertEqual(
+            Flight.objects.filter(departure_time__year=2024).count(), 9
+        )
+
+    def test_crew_links_count_inserted_rows(self) -> None:
+        self.schedule["crew"].append(self.crew[0].id)
+
+        response = self.client.post(
+            IMPORT_SCHEDULE_URL, [self.schedule], format="json"
+        )
+
+        flights = Flight.objects.filter(departure_time__year=2024)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["crew_links"], 12)
+        self.assertEqual(
+            Flight.crew.through.objects.filter(flight__in=flights).count(),
+            12,
+        )
+
+    def test_import_schedule_forbidden(self) -> None:
+        user = get_user_model().objects.create_user("test@test.com", "12345")
+        self.client.force_authenticate(user)
+
+        response = self.client.post(
+            IMPORT_SCHEDULE_URL, [self.schedule], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_schedule_command(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as file:
+            json.dump([self.schedule], file)
+            file.flush()
+            out = StringIO()
+
+            call_command("import_schedule", file.name, stdout=out)
+
+        self.assertIn("Created 6 flights", out.getvalue())
@@ -0,0 +1,168 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.seat_map import SeatMap
+from airport.tests.test_flight_api import create_flight
+from airport.tests.test_seat_holds import HOLD_URL
+
+
+def assign_url(flight_id: int) -> str:
+    return reverse("airport:flight-assign-seats", args=[flight_id])
+
+
+class SeatMapAssignTests(SimpleTestCase):
+    def test_free_runs(self) -> None:
+        seat_map = SeatMap.from_seats(2, 4, [(1, 2), (2, 1), (2, 4)])
+
+        self.assertEqual(
+            seat_map.free_runs(), [(1, 1, 1), (1, 3, 2), (2, 2, 2)]
+        )
+
+    def test_assign_tightest_adjacent_run(self) -> None:
+        seat_map = SeatMap.from_seats(3, 6, [(1, 4), (2, 3)])
+
+        self.assertEqual(seat_map.assign(2), [(1, 5), (1, 6)])
+        self.assertEqual(seat_map.assign(3), [(1, 1), (1, 2), (1, 3)])
+        self.assertEqual(seat_map.assign(5), [(3, s) for s in range(1, 6)])
+
+    def test_assign_split_over_fewest_runs(self) -> None:
+        seat_map = SeatMap.from_seats(
+            3, 4, [(1, 3), (2, 2), (2, 3), (3, 1), (3, 4)]
+        )
+
+        self.assertEqual(
+            seat_map.assign(4), [(1, 1), (1, 2), (3, 2), (3, 3)]
+        )
+        self.assertEqual(
+            seat_map.assign(5), [(1, 1), (1, 2), (1, 4), (3, 2), (3, 3)]
+        )
+
+    def test_assign_not_enough_seats(self) -> None:
+        seat_map = SeatMap.from_seats(1, 3, [(1, 2)])
+
+        self.assertEqual(seat_map.assign(3), [])
+
+    def test_assign_is_fast_on_largest_airplane(self) -> None:
+        seat_map = SeatMap(60, 10)
+        rnd = random.Random(1)
+        for _ in range(450):
+            seat_map.take(rnd.randint(1, 60), rnd.randint(1, 10))
+
+        runs = 200
+        started = time.perf_counter()
+        for _ in range(runs):
+            seat_map.assign(4)
+        seconds = (time.perf_counter() - started) / runs
+
+        self.assertLess(seconds, 0.001)
+
+
+class SeatAssignmentApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = create_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2, 3, 5, 6):
+            Ticket.objects.create(
+                order=order, flight=self.flight, row=1, seat=seat
+            )
+
+    def test_assign_requires_authentication(self) -> None:
+        self.client.force_authenticate(None)
+
+        response = self.client.get(
+            assign_url(self.flight.id), {"party_size": 2}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_assignment(self) -> None:
+        response = self.client.get(
+            assign_url(self.flight.id), {"party_size": 3}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "flight": self.flight.id,
+                "adjacent": True,
+                "tickets": [
+                    {"row": 2, "seat": seat, "flight": self.flight.id}
+                    for seat in (1, 2, 3)
+                ],
+            },
+        )
+
+    def test_assignment_skips_held_seats(self) -> None:
+        self.client.post(
+            HOLD_URL,
+            {"flight": self.flight.id, "seats": [{"row": 2, "seat": 1}]},
+            format="json",
+        )
+
+        response = self.client.get(
+            assign_url(self.flight.id), {"party_size": 6}
+        )
+
+        self.assertEqual(response.data["tickets"][0]["row"], 3)
+
+    def test_assignment_can_be_ordered(self) -> None:
+        tickets = self.client.get(
+            assign_url(self.flight.id), {"party_size": 2}
+        ).data["tickets"]
+
+        response = self.client.post(
+            reverse("airport:order-list"), {"tickets": tickets}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_post_orders_assigned_seats(self) -> None:
+        response = self.client.post(
+            assign_url(self.flight.id), {"party_size": 2}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data["id"])
+        self.assertEqual(
+            sorted(order.tickets.values_list("row", "seat")),
+            [(2, 1), (2, 2)],
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 7)
+
+    def test_split_assignment(self) -> None:
+        response = self.client.get(
+            assign_url(self.flight.id), {"party_size": 7}
+        )
+
+        self.assertFalse(response.data["adjacent"])
+        self.assertEqual(len(response.data["tickets"]), 7)
+
+    def test_not_enough_seats(self) -> None:
+        response = self.client.post(
+            assign_url(self.flight.id), {"party_size": 56}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("party_size", response.data)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_invalid_party_size(self) -> None:
+        response = self.client.get(
+            assign_url(self.flight.id), {"party_size": 0}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
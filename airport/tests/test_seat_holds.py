@@ -0,0 +1,192 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, HeldSeat, Order, SeatHold, Ticket
+from airport.tests.test_flight_api import create_flight
+
+HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def confirm_url(hold_id: int) -> str:
+    return reverse("airport:seathold-confirm", args=[hold_id])
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = create_flight()
+
+    def hold(self, *seats: tuple, user=None) -> dict:
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            HOLD_URL,
+            {
+                "flight": self.flight.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+            },
+            format="json",
+        )
+
+    def test_hold_seats(self) -> None:
+        response = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data["seats"],
+            [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}],
+        )
+        self.assertGreater(
+            SeatHold.objects.get().expires_at, timezone.now()
+        )
+
+    def test_hold_seat_held_by_other_user(self) -> None:
+        self.hold((1, 1), user=self.other)
+
+        response = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already taken", str(response.data["seats"]))
+        self.assertEqual(HeldSeat.objects.count(), 1)
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=2, SEAT_HOLD_MAX_PER_FLIGHT=2)
+    def test_hold_limits(self) -> None:
+        too_many_seats = self.hold((1, 1), (1, 2), (1, 3))
+        self.hold((1, 1))
+        self.hold((1, 2))
+        third_hold = self.hold((1, 3))
+        other_user = self.hold((1, 3), user=self.other)
+
+        self.assertEqual(
+            too_many_seats.status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(third_hold.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat holds", str(third_hold.data["seats"]))
+        self.assertEqual(other_user.status_code, status.HTTP_201_CREATED)
+
+        SeatHold.objects.filter(user=self.user).update(
+            expires_at=timezone.now()
+        )
+        self.assertEqual(
+            self.hold((1, 4)).status_code, status.HTTP_201_CREATED
+        )
+
+    def test_hold_seat_out_of_airplane(self) -> None:
+        response = self.hold((11, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_is_released_lazily(self) -> None:
+        self.hold((1, 1), user=self.other)
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        response = self.hold((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_order_respects_holds_of_other_users(self) -> None:
+        self.hold((1, 1), user=self.other)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_order_consumes_own_hold(self) -> None:
+        self.hold((1, 1))
+
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(HeldSeat.objects.exists())
+
+    def test_confirm_hold(self) -> None:
+        hold = self.hold((2, 1), (2, 2)).data
+
+        response = self.client.post(confirm_url(hold["id"]))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(flight.tickets_sold, 2)
+
+    def test_confirm_expired_hold(self) -> None:
+        hold = self.hold((2, 1)).data
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.post(confirm_url(hold["id"]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_hold_of_other_user_is_hidden(self) -> None:
+        hold = self.hold((1, 1), user=self.other).data
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.client.get(HOLD_URL).data, [])
+        response = self.client.post(confirm_url(hold["id"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StressBookingTests(TransactionTestCase):
+    def test_parallel_buyers_never_share_a_seat(self) -> None:
+        flight = create_flight()
+
+        for mode in ("holds", "orders", "queued"):
+            out = StringIO()
+            call_command(
+                "stress_booking",
+                flight.id,
+                buyers=40,
+                workers=8,
+                seats=3,
+                mode=mode,
+                seed=1,
+                keep=True,
+                stdout=out,
+            )
+
+            self.assertIn("conflict rate", out.getvalue())
+
+        seats = list(Ticket.objects.values_list("row", "seat"))
+        self.assertEqual(len(seats), len(set(seats)))
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_sold, len(seats))
+        self.assertEqual(
+            sorted(flight.get_seat_map().taken_seats()), sorted(seats)
+        )
+
+    def test_rejects_no_buyers(self) -> None:
+        flight = create_flight()
+
+        with self.assertRaisesMessage(CommandError, "--buyers"):
+            call_command("stress_booking", flight.id, buyers=0)
@@ -8,7 +8,9 @@ from airport.views import (
     AirportViewSet,
     RouteViewSet,
     FlightViewSet,
-    OrderViewSet
+    OrderViewSet,
+    OrderRequestViewSet,
+    SeatHoldViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -19,6 +21,8 @@ router.register("airports", AirportViewSet)
 router.register("routs", RouteViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
+router.register("order-requests", OrderRequestViewSet)
+router.register("holds", SeatHoldViewSet)
 
 urlpatterns = [path("", include(router.urls))]
 
@@ -1,13 +1,42 @@
+from datetime import datetime, time, timedelta
 from typing import Type
 
-from django.db.models import F, Count, QuerySet
+from django.db.models import Prefetch, Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework import viewsets, status
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from airport.autocomplete import airport_index
+from airport.booking import (
+    HoldExpired,
+    NotEnoughSeats,
+    SeatsUnavailable,
+    assign_seats,
+    book_assigned_seats,
+    confirm_hold,
+)
+from airport.caching import CachedReadMixin, cache_response
+from airport.cancellation import cancel_flights, cancel_orders, cancel_tickets
+from airport.connections import search_connections
+from airport.exports import EXPORT_FORMATS, export_response
+from airport.fast_lists import FastListMixin
+from airport.fieldsets import SparseQuerysetMixin
+from airport.geo import airport_tree
+from airport.idempotency import IDEMPOTENCY_HEADER, IdempotentCreateMixin
+from airport.images import IMAGE_SIZES, ORIGINAL_SIZE
+from airport.intake import QueuedOrderIntakeMixin
 from airport.models import (
     AirplaneType,
     Airplane,
@@ -15,9 +44,19 @@ from airport.models import (
     Airport,
     Route,
     Flight,
-    Order
+    FlightQuerySet,
+    Order,
+    Ticket,
+    SeatHold,
+    OrderRequest,
 )
-from airport.pagination import OrderPagination
+from airport.pagination import (
+    OrderPagination,
+    FlightPagination,
+    OrderCursorPagination,
+)
+from airport.route_stats import route_statistics
+from airport.schedules import import_schedules
 from airport.serializers import (
     AirplaneTypeSerializer,
     AirplaneSerializer,
@@ -28,24 +67,114 @@ from airport.serializers import (
     OrderSerializer,
     AirplaneRetrieveSerializer,
     RouteListSerializer,
+    RouteListValuesSerializer,
     RouteRetrieveSerializer,
     FlightListSerializer,
+    FlightListValuesSerializer,
     FlightRetrieveSerializer,
     OrderRetrieveSerializer,
     AirportImageSerializer,
     AirportListRetrieveSerializer,
+    FlightSeatMapSerializer,
+    ConnectionSearchSerializer,
+    ItinerarySerializer,
+    FlightScheduleSerializer,
+    ScheduleImportResultSerializer,
+    SeatHoldSerializer,
+    OrderRequestSerializer,
+    SeatAssignmentSerializer,
+    AirportAutocompleteSerializer,
+    AirportMatchSerializer,
+    NearestAirportsQuerySerializer,
+    NearbyAirportSerializer,
+    RouteStatisticsQuerySerializer,
+    RouteStatisticsSerializer,
+    TicketCancellationSerializer,
+    FlightCancellationSerializer,
+    CancellationResultSerializer,
 )
+from airport.streaming import STREAM_VALUES, StreamingListMixin
 from user.permissions import IsAdminOrIfAuthenticatedReadAndCreateOnly
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+STREAM_PARAMETER = OpenApiParameter(
+    "stream",
+    type=OpenApiTypes.STR,
+    enum=STREAM_VALUES,
+    description="Stream the whole unpaginated list (ex. ?stream=true)",
+)
+
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Comma separated fields to return (ex. ?fields=id,route)",
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Comma separated fields to return as nested objects "
+                    "(ex. ?expand=airplane)",
+    ),
+]
+
+
+EXPORT_FORMAT_PARAMETER = OpenApiParameter(
+    "file_format",
+    type=OpenApiTypes.STR,
+    enum=list(EXPORT_FORMATS),
+    description="Format of the exported file (ex. ?file_format=xlsx)",
+)
+
+
+def get_export_format(request) -> str:
+    file_format = request.query_params.get("file_format", "csv")
+
+    if file_format not in EXPORT_FORMATS:
+        raise ValidationError(
+            {"file_format": f"Must be one of: {', '.join(EXPORT_FORMATS)}"}
+        )
+
+    return file_format
+
+
+def parse_moment(name: str, value: str) -> datetime:
+    """Parse a date or datetime query param into an aware datetime"""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+
+    if moment is None:
+        raise ValidationError(
+            {name: "Must be a date or datetime (ex. 2023-11-01)"}
+        )
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+
+    return moment
+
+
+class AirplaneTypeViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    cache_models = (AirplaneType,)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    SparseQuerysetMixin, CachedReadMixin, viewsets.ModelViewSet
+):
     queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
+    cache_models = (Airplane, AirplaneType)
+    field_relations = {
+        "airplane_type": {"select_related": ("airplane_type",)},
+    }
 
     def get_serializer_class(self) -> Type:
         if self.action == "retrieve":
@@ -54,14 +183,48 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return AirplaneSerializer
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+@extend_schema_view(list=extend_schema(parameters=[STREAM_PARAMETER]))
+class CrewViewSet(
+    StreamingListMixin, CachedReadMixin, viewsets.ModelViewSet
+):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
+    cache_models = (Crew,)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+IMAGE_SIZE_PARAMETER = OpenApiParameter(
+    "image_size",
+    type=OpenApiTypes.STR,
+    enum=IMAGE_SIZES,
+    description="Image variant to link, thumbnail by default in lists and "
+                "original otherwise (ex. ?image_size=webp)",
+)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[STREAM_PARAMETER, IMAGE_SIZE_PARAMETER]),
+    retrieve=extend_schema(parameters=[IMAGE_SIZE_PARAMETER]),
+)
+class AirportViewSet(
+    StreamingListMixin, CachedReadMixin, viewsets.ModelViewSet
+):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    cache_models = (Airport,)
+
+    def get_serializer_context(self) -> dict:
+        context = super().get_serializer_context()
+
+        if self.action in ("list", "retrieve"):
+            default = "thumbnail" if self.action == "list" else ORIGINAL_SIZE
+            image_size = self.request.query_params.get("image_size", default)
+            if image_size not in IMAGE_SIZES:
+                raise ValidationError(
+                    {"image_size": f"Must be one of: {', '.join(IMAGE_SIZES)}"}
+                )
+            context["image_size"] = image_size
+
+        return context
 
     def get_serializer_class(self) -> Type:
         if self.action in ("list", "retrieve"):
@@ -72,6 +235,53 @@ class AirportViewSet(viewsets.ModelViewSet):
 
         return AirportSerializer
 
+    @extend_schema(
+        parameters=[AirportAutocompleteSerializer],
+        responses={200: AirportMatchSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False)
+    def autocomplete(self, request) -> Response:
+        """
+        Endpoint for airports with a name or closest big city word
+        starting with q, best matches first (ex. ?q=lon)
+        """
+        search = AirportAutocompleteSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+
+        matches = airport_index.get().search(
+            search.validated_data["q"], search.validated_data["limit"]
+        )
+
+        return Response(
+            AirportMatchSerializer(matches, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        parameters=[NearestAirportsQuerySerializer],
+        responses={200: NearbyAirportSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False)
+    def nearest(self, request) -> Response:
+        """
+        Endpoint for the airports closest to a point by great-circle
+        distance in kilometers (ex. ?latitude=51.5&longitude=-0.1)
+        """
+        point = NearestAirportsQuerySerializer(data=request.query_params)
+        point.is_valid(raise_exception=True)
+
+        airports = airport_tree.get().nearest(
+            point.validated_data["latitude"],
+            point.validated_data["longitude"],
+            point.validated_data["limit"],
+            point.validated_data.get("radius"),
+        )
+
+        return Response(
+            NearbyAirportSerializer(airports, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
     @action(
         methods=["POST"],
         detail=True,
@@ -88,25 +298,62 @@ class AirportViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
-    queryset = Route.objects.select_related("source", "destination")
+class RouteViewSet(
+    StreamingListMixin,
+    SparseQuerysetMixin,
+    CachedReadMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    fast_list_serializer_class = RouteListValuesSerializer
+    cache_models = (Route, Airport)
+    field_relations = {
+        "source": {"select_related": ("source",)},
+        "destination": {"select_related": ("destination",)},
+    }
+
+    @staticmethod
+    def matching_airports(text: str) -> QuerySet:
+        """Ids of airports with name or closest big city containing text"""
+        return Airport.objects.filter(
+            Q(name__icontains=text) | Q(closest_big_city__icontains=text)
+        ).values("id")
 
     def get_queryset(self) -> QuerySet:
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
+        params = self.request.query_params
+        source = params.get("source")
+        destination = params.get("destination")
 
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         if source:
-            queryset = queryset.filter(source__name__icontains=source)
+            queryset = queryset.filter(
+                source__in=self.matching_airports(source)
+            )
 
         if destination:
             queryset = queryset.filter(
-                destination__name__icontains=destination
+                destination__in=self.matching_airports(destination)
             )
 
-        return queryset.distinct()
+        for param, lookup in (
+            ("min_distance", "distance_km__gte"),
+            ("max_distance", "distance_km__lte"),
+        ):
+            if params.get(param):
+                try:
+                    queryset = queryset.filter(
+                        **{lookup: float(params[param])}
+                    )
+                except ValueError:
+                    raise ValidationError({param: "Must be a number"})
+
+        if params.get("ordering") in ("distance", "-distance"):
+            queryset = queryset.order_by(f"{params['ordering']}_km", "id")
+
+        return queryset
 
     def get_serializer_class(self) -> Type:
         if self.action == "list":
@@ -122,44 +369,134 @@ class RouteViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "source",
                 type=OpenApiTypes.STR,
-                description="Filter by source (ex. ?source=paris)",
+                description="Filter by source airport name or city "
+                            "(ex. ?source=paris)",
             ),
             OpenApiParameter(
                 "destination",
                 type=OpenApiTypes.STR,
-                description="Filter by destination (ex. ?destination=london)",
+                description="Filter by destination airport name or city "
+                            "(ex. ?destination=london)",
+            ),
+            OpenApiParameter(
+                "min_distance",
+                type=OpenApiTypes.FLOAT,
+                description="Filter by distance from, in kilometers "
+                            "whatever the unit of the route "
+                            "(ex. ?min_distance=500)",
+            ),
+            OpenApiParameter(
+                "max_distance",
+                type=OpenApiTypes.FLOAT,
+                description="Filter by distance to, in kilometers "
+                            "(ex. ?max_distance=2000)",
+            ),
+            OpenApiParameter(
+                "ordering",
+                type=OpenApiTypes.STR,
+                enum=["distance", "-distance"],
+                description="Sort by distance in kilometers "
+                            "(ex. ?ordering=-distance)",
             ),
+            STREAM_PARAMETER,
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs) -> Route:
         return super().list(request, *args, **kwargs)
 
-
-class FlightViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Flight.objects
-        .prefetch_related("crew", "airplane", "route")
-        .annotate(
-            tickets_available=(
-                F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets")
-            )
-        )
+    @extend_schema(
+        parameters=[RouteStatisticsQuerySerializer],
+        responses={200: RouteStatisticsSerializer},
     )
-    serializer_class = FlightSerializer
+    @action(methods=["GET"], detail=False)
+    @cache_response
+    def statistics(self, request) -> Response:
+        """
+        Endpoint for distance histograms and percentiles in kilometers
+        of routes, overall and per source airport, taking the route
+        filters (ex. ?source=paris&bins=20&percentiles=50,95)
+        """
+        query = RouteStatisticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        statistics = route_statistics(
+            self.get_queryset(),
+            query.validated_data["bins"],
+            query.validated_data["percentiles"],
+        )
+        return Response(statistics, status=status.HTTP_200_OK)
 
-    def get_queryset(self) -> QuerySet:
-        departure = self.request.query_params.get("departure_date")
-        arrival = self.request.query_params.get("arrival_date")
-        flight_id = self.request.query_params.get("flight")
 
-        queryset = self.queryset
+class FlightViewSet(
+    StreamingListMixin,
+    SparseQuerysetMixin,
+    CachedReadMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Flight.objects.all()
+    serializer_class = FlightSerializer
+    fast_list_serializer_class = FlightListValuesSerializer
+    pagination_class = FlightPagination
+    cache_models = (
+        Flight, Route, Airport, Airplane, AirplaneType, Crew, Ticket
+    )
+    field_relations = {
+        "route": {
+            "select_related": ("route__source", "route__destination"),
+        },
+        "airplane": {"select_related": ("airplane__airplane_type",)},
+        "crew": {
+            "prefetch_related": (
+                Prefetch("crew", queryset=Crew.objects.order_by("id")),
+            ),
+        },
+        "tickets_available": {
+            "annotate": {
+                "tickets_available": FlightQuerySet.tickets_available(),
+            },
+        },
+        "taken_places": {"select_related": ("airplane",)},
+    }
 
-        if departure:
-            queryset = queryset.filter(departure_time__date=departure)
+    def get_queryset(self) -> QuerySet:
+        params = self.request.query_params
+        flight_id = params.get("flight")
+
+        queryset = super().get_queryset()
+
+        if self.action in ("seat_map", "assign_seats"):
+            queryset = Flight.objects.select_related("airplane")
+
+        if self.action == "manifest":
+            queryset = Flight.objects.all()
+
+        for field in ("departure", "arrival"):
+            if params.get(f"{field}_date"):
+                start = parse_moment(
+                    f"{field}_date", params[f"{field}_date"]
+                )
+                queryset = queryset.filter(
+                    **{
+                        f"{field}_time__gte": start,
+                        f"{field}_time__lt": start + timedelta(days=1),
+                    }
+                )
+
+        if params.get("departure_from"):
+            queryset = queryset.filter(
+                departure_time__gte=parse_moment(
+                    "departure_from", params["departure_from"]
+                )
+            )
 
-        if arrival:
-            queryset = queryset.filter(arrival_time__date=arrival)
+        if params.get("departure_to"):
+            queryset = queryset.filter(
+                departure_time__lt=parse_moment(
+                    "departure_to", params["departure_to"]
+                )
+            )
 
         if flight_id:
             queryset = queryset.filter(id=int(flight_id))
@@ -173,52 +510,464 @@ class FlightViewSet(viewsets.ModelViewSet):
         if self.action == "retrieve":
             return FlightRetrieveSerializer
 
+        if self.action == "seat_map":
+            return FlightSeatMapSerializer
+
+        if self.action == "assign_seats":
+            return SeatAssignmentSerializer
+
+        if self.action == "connections":
+            return ItinerarySerializer
+
         return FlightSerializer
 
     @extend_schema(
         parameters=[
             OpenApiParameter(
-                "departure date",
+                "departure_date",
                 type=OpenApiTypes.DATE,
                 description="Filter by departure date "
                             "(ex. ?departure_date=2023-11-01)",
             ),
             OpenApiParameter(
-                "arrival date",
+                "arrival_date",
                 type=OpenApiTypes.DATE,
                 description="Filter by arrival date "
                             "(ex. ?arrival_date=2023-11-01)",
             ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.DATETIME,
+                description="Filter by departure time from, inclusive "
+                            "(ex. ?departure_from=2023-11-01T06:00)",
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.DATETIME,
+                description="Filter by departure time to, exclusive "
+                            "(ex. ?departure_to=2023-11-02)",
+            ),
             OpenApiParameter(
                 "flight",
                 type=OpenApiTypes.INT,
                 description="Filter by flight id (ex. ?flight=1)",
             ),
+            STREAM_PARAMETER,
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs) -> Flight:
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=FlightSeatMapSerializer.ENCODINGS,
+                description="Seat map encoding: base64 packed bitmap "
+                            "or per-row run lengths (ex. ?encoding=runs)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    @cache_response
+    def seat_map(self, request, pk=None) -> Response:
+        """Endpoint for retrieving seat occupancy of specific flight"""
+        encoding = request.query_params.get("encoding", "bitmap")
+
+        if encoding not in FlightSeatMapSerializer.ENCODINGS:
+            encodings = ", ".join(FlightSeatMapSerializer.ENCODINGS)
+            return Response(
+                {"encoding": f"Must be one of: {encodings}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(
+            self.get_object(),
+            context={**self.get_serializer_context(), "encoding": encoding},
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        methods=["GET"],
+        parameters=[
+            OpenApiParameter(
+                "party_size",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Number of seats to assign (ex. ?party_size=3)",
+            ),
+        ],
+    )
+    @extend_schema(
+        methods=["POST"],
+        request=SeatAssignmentSerializer,
+        responses={201: OrderSerializer},
+    )
+    @action(
+        methods=["GET", "POST"],
+        detail=True,
+        url_path="assign-seats",
+        permission_classes=[IsAuthenticated],
+    )
+    def assign_seats(self, request, pk=None) -> Response:
+        """
+        Endpoint for assigning the best seats of specific flight to a
+        party: adjacent seats of a row when possible, else the tightest
+        split. GET returns tickets ready to be ordered, POST orders them.
+        """
+        ordering = request.method == "POST"
+        serializer = self.get_serializer(
+            data=request.data if ordering else request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        party_size = serializer.validated_data["party_size"]
+        flight = self.get_object()
+
+        try:
+            if ordering:
+                order = book_assigned_seats(request.user, flight, party_size)
+            else:
+                seats = assign_seats(flight, party_size)
+        except NotEnoughSeats as error:
+            raise ValidationError({"party_size": str(error)})
+        except SeatsUnavailable as error:
+            raise ValidationError({"tickets": error.messages})
+
+        if ordering:
+            return Response(
+                OrderSerializer(order).data, status=status.HTTP_201_CREATED
+            )
+        return Response(
+            self.get_serializer((flight, seats)).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        parameters=[EXPORT_FORMAT_PARAMETER],
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+    )
+    def manifest(self, request, pk=None) -> StreamingHttpResponse:
+        """Endpoint for downloading passengers of specific flight"""
+        file_format = get_export_format(request)
+        flight = self.get_object()
+
+        tickets = (
+            Ticket.objects.filter(flight=flight)
+            .order_by("row", "seat")
+            .values_list(
+                "row",
+                "seat",
+                "id",
+                "order_id",
+                "order__created_at",
+                "order__user__email",
+                "order__user__first_name",
+                "order__user__last_name",
+            )
+        )
+        return export_response(
+            tickets,
+            [
+                "row",
+                "seat",
+                "ticket",
+                "order",
+                "ordered_at",
+                "email",
+                "first_name",
+                "last_name",
+            ],
+            f"flight-{flight.id}-manifest",
+            file_format,
+        )
+
+    @extend_schema(parameters=[ConnectionSearchSerializer])
+    @action(methods=["GET"], detail=False)
+    def connections(self, request) -> Response:
+        """
+        Endpoint for searching earliest arriving itineraries between
+        two airports with up to max_connections connections
+        (ex. ?source=1&destination=4&max_connections=2)
+        """
+        search = ConnectionSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        data = search.validated_data
+
+        departure = data.get("departure") or timezone.now().replace(
+            second=0, microsecond=0
+        )
+        itineraries = search_connections(
+            data["source"].id,
+            data["destination"].id,
+            departure,
+            data["max_connections"],
+            timedelta(minutes=data["min_connection"]),
+        )
+
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def perform_destroy(self, instance: Flight) -> None:
+        cancel_flights([instance.pk])
 
-class OrderViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        request=FlightCancellationSerializer,
+        responses={200: CancellationResultSerializer},
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        permission_classes=[IsAdminUser],
+    )
+    def cancel(self, request) -> Response:
+        """
+        Endpoint for deleting flights in bulk with their tickets, and
+        the orders left without tickets
+        """
+        serializer = FlightCancellationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = cancel_flights(serializer.validated_data["flights"])
+
+        return Response(
+            CancellationResultSerializer(result).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        request=FlightScheduleSerializer(many=True),
+        responses={201: ScheduleImportResultSerializer},
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import-schedule",
+        permission_classes=[IsAdminUser],
+    )
+    def import_schedule(self, request) -> Response:
+        """
+        Endpoint for creating flights in bulk from weekly schedules,
+        flights that already exist are skipped
+        """
+        serializer = FlightScheduleSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        result = import_schedules(serializer.validated_data)
+
+        return Response(
+            ScheduleImportResultSerializer(result).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class OrderViewSet(
+    IdempotentCreateMixin, QueuedOrderIntakeMixin, viewsets.ModelViewSet
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    order_request_serializer_class = OrderRequestSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadAndCreateOnly,)
 
+    @property
+    def paginator(self) -> BasePagination:
+        """Use keyset pagination on ?pagination=cursor and its next pages"""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params if self.request else {}
+
+            if (
+                OrderCursorPagination.cursor_query_param in params
+                or params.get("pagination") == "cursor"
+            ):
+                self._paginator = OrderCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+
+        return self._paginator
+
     def get_serializer_class(self) -> Type:
-        if self.action == "retrieve":
+        if self.action in ("list", "retrieve"):
             return OrderRetrieveSerializer
 
         return OrderSerializer
 
     def get_queryset(self) -> QuerySet:
-        return Order.objects.filter(user=self.request.user).prefetch_related(
-            "tickets__flight__crew",
-            "tickets__flight__airplane",
-            "tickets__flight__route__source",
-            "tickets__flight__route__destination"
+        queryset = Order.objects.filter(user=self.request.user)
+
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets__flight",
+                    queryset=Flight.objects.select_related(
+                        "route__source", "route__destination", "airplane"
+                    ).with_tickets_available(),
+                ),
+                Prefetch(
+                    "tickets__flight__crew",
+                    queryset=Crew.objects.order_by("id"),
+                ),
+            )
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "pagination",
+                type=OpenApiTypes.STR,
+                enum=["cursor"],
+                description="Paginate by cursor instead of page number "
+                            "(ex. ?pagination=cursor)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs) -> Order:
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        responses={
+            201: OrderSerializer,
+            202: OrderRequestSerializer,
+        },
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Unique key of the order, repeating a request "
+                            "with the same key returns the first response",
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs) -> Order:
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer) -> None:
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance: Order) -> None:
+        cancel_orders([instance.pk])
+
+    @extend_schema(
+        request=TicketCancellationSerializer,
+        responses={200: CancellationResultSerializer},
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="cancel-tickets",
+        permission_classes=[IsAdminUser],
+    )
+    def cancel_tickets(self, request) -> Response:
+        """
+        Endpoint for deleting tickets of flights or orders in bulk,
+        optionally within row and seat ranges, and the orders left
+        without tickets
+        """
+        serializer = TicketCancellationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = cancel_tickets(serializer.get_tickets())
+
+        return Response(
+            CancellationResultSerializer(result).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        parameters=[EXPORT_FORMAT_PARAMETER],
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request) -> StreamingHttpResponse:
+        """Endpoint for downloading the order history of the user"""
+        file_format = get_export_format(request)
+
+        tickets = (
+            Ticket.objects.filter(order__user=request.user)
+            .order_by("-order__created_at", "order_id", "row", "seat")
+            .values_list(
+                "order_id",
+                "order__created_at",
+                "id",
+                "flight_id",
+                "flight__route__source__name",
+                "flight__route__destination__name",
+                "flight__departure_time",
+                "flight__arrival_time",
+                "row",
+                "seat",
+            )
+        )
+        return export_response(
+            tickets,
+            [
+                "order",
+                "ordered_at",
+                "ticket",
+                "flight",
+                "source",
+                "destination",
+                "departure_time",
+                "arrival_time",
+                "row",
+                "seat",
+            ],
+            "orders",
+            file_format,
         )
 
+
+class OrderRequestViewSet(viewsets.ReadOnlyModelViewSet):
+    """Queued orders of the user, polled until confirmed or rejected"""
+
+    queryset = OrderRequest.objects.all()
+    serializer_class = OrderRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self) -> QuerySet:
+        return OrderRequest.objects.filter(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Seats reserved by the user for SEAT_HOLD_TTL seconds"""
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self) -> QuerySet:
+        return SeatHold.objects.filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        ).prefetch_related("seats")
+
     def perform_create(self, serializer) -> None:
         serializer.save(user=self.request.user)
+
+    @extend_schema(request=None, responses={201: OrderSerializer})
+    @action(methods=["POST"], detail=True)
+    def confirm(self, request, pk=None) -> Response:
+        """Endpoint for buying the held seats as an order"""
+        try:
+            order = confirm_hold(self.get_object())
+        except HoldExpired as error:
+            raise ValidationError(str(error))
+        except SeatsUnavailable as error:
+            raise ValidationError({"seats": error.messages})
+
+        return Response(
+            OrderSerializer(order).data, status=status.HTTP_201_CREATED
+        )
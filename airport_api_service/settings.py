@@ -178,6 +178,41 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Seconds to keep cached read responses of the airport API,
+# 0 disables the response cache
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+# Serialize flight and route lists from values() rows instead of
+# model instances, the output is the same
+FAST_LIST_SERIALIZERS = bool(os.getenv("FAST_LIST_SERIALIZERS", ""))
+
+# Seconds a seat hold keeps its seats before they can be sold to others
+SEAT_HOLD_TTL = 60 * 10
+
+# Seats one hold may reserve, and live holds a user may keep on a flight,
+# so no single account can block the sales of a flight
+SEAT_HOLD_MAX_SEATS = 9
+SEAT_HOLD_MAX_PER_FLIGHT = 2
+
+# Seconds an Idempotency-Key of an order keeps its stored response
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+# "sync" creates orders in the request, "queued" queues them for the
+# process_order_requests worker to commit in batches
+ORDER_INTAKE = os.getenv("ORDER_INTAKE", "sync")
+
+# Threads resizing uploaded airport images after the response is sent,
+# 0 resizes them in the request once the upload is committed
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+
+# How media files are sent: "django" streams them from the worker,
+# "x-accel-redirect" (nginx) and "x-sendfile" (Apache, lighttpd) hand
+# them off to the front server
+MEDIA_SERVING = os.getenv("MEDIA_SERVING", "django")
+
+# Internal nginx location aliasing MEDIA_ROOT for X-Accel-Redirect
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),